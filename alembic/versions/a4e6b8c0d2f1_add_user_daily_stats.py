@@ -0,0 +1,70 @@
+"""
+Add user_daily_stats rollup table and backfill it from the record tables
+
+Revision ID: a4e6b8c0d2f1
+Revises: f2c8e1a9b3d4
+Create Date: 2025-08-15 11:20:00.000000
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e6b8c0d2f1'
+down_revision: Union[str, None] = 'f2c8e1a9b3d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_daily_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('meal_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('meal_calories', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('exercise_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('exercise_minutes', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('exercise_calories', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('body_record_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('weight_sum', sa.Float(), server_default='0', nullable=False),
+    sa.Column('diary_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_user_daily_stats_user_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'date', name=op.f('pk_user_daily_stats'))
+    )
+    op.execute(
+        """
+        INSERT INTO user_daily_stats (user_id, date, meal_count, meal_calories, exercise_count,
+                                      exercise_minutes, exercise_calories, body_record_count,
+                                      weight_sum, diary_count)
+        SELECT user_id, date, sum(meal_count), sum(meal_calories), sum(exercise_count),
+               sum(exercise_minutes), sum(exercise_calories), sum(body_record_count),
+               sum(weight_sum), sum(diary_count)
+        FROM (
+            SELECT user_id, date, count(*) AS meal_count, coalesce(sum(calories), 0) AS meal_calories,
+                   0 AS exercise_count, 0 AS exercise_minutes, 0 AS exercise_calories,
+                   0 AS body_record_count, 0::float AS weight_sum, 0 AS diary_count
+            FROM meals GROUP BY user_id, date
+            UNION ALL
+            SELECT user_id, date, 0, 0, count(*), coalesce(sum(duration_min), 0), coalesce(sum(calories), 0),
+                   0, 0::float, 0
+            FROM exercises GROUP BY user_id, date
+            UNION ALL
+            SELECT user_id, date, 0, 0, 0, 0, 0, count(*), sum(weight), 0
+            FROM body_records GROUP BY user_id, date
+            UNION ALL
+            SELECT user_id, date, 0, 0, 0, 0, 0, 0, 0::float, count(*)
+            FROM diaries GROUP BY user_id, date
+        ) AS per_table
+        GROUP BY user_id, date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_daily_stats')
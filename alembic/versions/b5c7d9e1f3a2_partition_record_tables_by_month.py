@@ -0,0 +1,109 @@
+"""
+Partition body_records, meals, exercises and goal_progress by month on date
+
+Each table is rebuilt as a RANGE (date) partitioned table with one partition per
+month from its earliest row (at most MONTHS_BACK months back) through a few months
+ahead, plus a default partition that takes anything older or further ahead. The
+primary key becomes (id, date) because a partitioned table's unique constraints
+must include the partition key; ids still come from the existing sequences.
+Rows are copied in one statement per table, so run this in a maintenance window.
+
+Revision ID: b5c7d9e1f3a2
+Revises: a4e6b8c0d2f1
+Create Date: 2025-08-16 09:30:00.000000
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5c7d9e1f3a2'
+down_revision: Union[str, None] = 'a4e6b8c0d2f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# table -> (foreign key column, referenced table, indexed columns)
+TABLES = {
+    'body_records': ('user_id', 'users', ('date', 'user_id')),
+    'meals': ('user_id', 'users', ('date', 'meal_type', 'user_id')),
+    'exercises': ('user_id', 'users', ('date', 'user_id')),
+    'goal_progress': ('goal_id', 'goals', ('date', 'goal_id')),
+}
+
+# Created ahead of today so new writes do not land in the default partition;
+# the records.maintain_partitions beat task keeps this window moving.
+MONTHS_AHEAD = 3
+
+# Floor for the first monthly partition, so a stray ancient date does not create
+# hundreds of partitions; older rows stay in the default partition.
+MONTHS_BACK = 60
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _rebuild(table: str, source: str, *, partitioned: bool) -> None:
+    """Create ``table`` shaped like ``source`` with the original keys and indexes, then copy the rows."""
+    fk_column, referred, indexed = TABLES[table]
+    partition_clause = ' PARTITION BY RANGE (date)' if partitioned else ''
+    op.execute(f'CREATE TABLE {table} (LIKE {source} INCLUDING DEFAULTS INCLUDING CONSTRAINTS){partition_clause}')
+    pk_columns = 'id, date' if partitioned else 'id'
+    op.execute(f'ALTER TABLE {table} ADD CONSTRAINT pk_{table} PRIMARY KEY ({pk_columns})')
+    op.execute(
+        f'ALTER TABLE {table} ADD CONSTRAINT fk_{table}_{fk_column}_{referred} '
+        f'FOREIGN KEY ({fk_column}) REFERENCES {referred} (id) ON DELETE CASCADE'
+    )
+    for column in indexed:
+        op.create_index(f'ix_{table}_{column}', table, [column], unique=False)
+
+    if partitioned:
+        bind = op.get_bind()
+        lowest = bind.execute(sa.text(f'SELECT min(date) FROM {source}')).scalar()
+        this_month = date.today().replace(day=1)
+        floor = _add_months(this_month, -MONTHS_BACK)
+        month = max(min(lowest or this_month, this_month).replace(day=1), floor)
+        # Rows dated further ahead go to the default partition until maintenance reaches their month
+        last = _add_months(this_month, MONTHS_AHEAD)
+        while month <= last:
+            upper = _add_months(month, 1)
+            op.execute(
+                f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month}') TO ('{upper}')"
+            )
+            month = upper
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+    op.execute(f'INSERT INTO {table} SELECT * FROM {source}')
+    # Hand the id sequence to the new table before the old one (its owner) is dropped
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+    op.execute(f'DROP TABLE {source}')
+
+
+def _set_aside(table: str, suffix: str) -> str:
+    """Rename ``table`` and free its key and index names for the replacement."""
+    _, _, indexed = TABLES[table]
+    source = f'{table}_{suffix}'
+    op.execute(f'ALTER TABLE {table} RENAME TO {source}')
+    op.execute(f'ALTER TABLE {source} DROP CONSTRAINT pk_{table}')
+    for column in indexed:
+        op.execute(f'DROP INDEX ix_{table}_{column}')
+    return source
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        _rebuild(table, _set_aside(table, 'unpartitioned'), partitioned=True)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        _rebuild(table, _set_aside(table, 'partitioned'), partitioned=False)
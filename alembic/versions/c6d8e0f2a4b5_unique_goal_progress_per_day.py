@@ -0,0 +1,41 @@
+"""
+Keep one goal_progress row per (goal_id, date) and enforce it with a unique constraint
+
+Existing duplicates are collapsed to the most recently updated row.
+
+Revision ID: c6d8e0f2a4b5
+Revises: b5c7d9e1f3a2
+Create Date: 2025-08-17 10:05:00.000000
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6d8e0f2a4b5'
+down_revision: Union[str, None] = 'b5c7d9e1f3a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        DELETE FROM goal_progress gp
+        USING (
+            SELECT id, date,
+                   row_number() OVER (PARTITION BY goal_id, date ORDER BY updated_at DESC, id DESC) AS rn
+            FROM goal_progress
+        ) ranked
+        WHERE gp.id = ranked.id AND gp.date = ranked.date AND ranked.rn > 1
+        """
+    )
+    op.create_unique_constraint(op.f('uq_goal_progress_goal_id'), 'goal_progress', ['goal_id', 'date'])
+
+
+def downgrade() -> None:
+    op.drop_constraint(op.f('uq_goal_progress_goal_id'), 'goal_progress', type_='unique')
@@ -0,0 +1,28 @@
+"""
+Add (tag_id, article_id) index on article_tags for tag filtering
+
+Revision ID: d1f4a2b7c9e0
+Revises: 247f20b35a43
+Create Date: 2025-08-12 09:10:00.000000
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1f4a2b7c9e0'
+down_revision: Union[str, None] = '247f20b35a43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_article_tags_tag_id_article_id', 'article_tags', ['tag_id', 'article_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_article_tags_tag_id_article_id', table_name='article_tags')
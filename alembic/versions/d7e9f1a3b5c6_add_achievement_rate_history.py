@@ -0,0 +1,38 @@
+"""
+Add achievement_rate_history for daily per-window achievement-rate snapshots
+
+Revision ID: d7e9f1a3b5c6
+Revises: c6d8e0f2a4b5
+Create Date: 2025-08-18 09:40:00.000000
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7e9f1a3b5c6'
+down_revision: Union[str, None] = 'c6d8e0f2a4b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('achievement_rate_history',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('window_days', sa.SmallInteger(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('rate', sa.Float(), nullable=False),
+    sa.Column('completed_goals', sa.Integer(), nullable=False),
+    sa.Column('total_goals', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_achievement_rate_history_user_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'window_days', 'date', name=op.f('pk_achievement_rate_history'))
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('achievement_rate_history')
@@ -0,0 +1,29 @@
+"""
+Add generated excerpt column to articles
+
+Revision ID: e7b3c5d8a1f2
+Revises: d1f4a2b7c9e0
+Create Date: 2025-08-13 10:30:00.000000
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3c5d8a1f2'
+down_revision: Union[str, None] = 'd1f4a2b7c9e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('articles', sa.Column('excerpt', sa.Text(), sa.Computed('left(content, 280)', persisted=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('articles', 'excerpt')
@@ -0,0 +1,42 @@
+"""
+Add task_outbox for Celery tasks dispatched after the writing transaction commits
+
+Revision ID: e8f0a2b4c6d7
+Revises: d7e9f1a3b5c6
+Create Date: 2025-08-19 10:15:00.000000
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8f0a2b4c6d7'
+down_revision: Union[str, None] = 'd7e9f1a3b5c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('task_outbox',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('task_name', sa.String(length=255), nullable=False),
+    sa.Column('args', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('kwargs', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('dedupe_key', sa.String(length=255), nullable=True),
+    sa.Column('available_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_task_outbox')),
+    sa.UniqueConstraint('dedupe_key', name=op.f('uq_task_outbox_dedupe_key'))
+    )
+    op.create_index('ix_task_outbox_available_at_id', 'task_outbox', ['available_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_outbox_available_at_id', table_name='task_outbox')
+    op.drop_table('task_outbox')
@@ -0,0 +1,34 @@
+"""
+Add (published_at DESC NULLS LAST, id DESC) index for keyset paging of the article feed
+
+Revision ID: f2c8e1a9b3d4
+Revises: e7b3c5d8a1f2
+Create Date: 2025-08-14 08:45:00.000000
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8e1a9b3d4'
+down_revision: Union[str, None] = 'e7b3c5d8a1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_articles_published_at_id',
+        'articles',
+        [sa.text('published_at DESC NULLS LAST'), sa.text('id DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_articles_published_at_id', table_name='articles')
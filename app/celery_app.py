@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from celery import Celery
 from celery.schedules import crontab
+from kombu import Exchange, Queue
 from app.config import settings
 
 
@@ -18,16 +19,103 @@ def ping() -> str:
 
 
 # Import tasks to register them
-from app.tasks import stats_tasks, article_tasks
+from app.tasks import stats_tasks, article_tasks, record_tasks, outbox_tasks
+
+
+# Queues: user-triggered work must not wait behind the nightly jobs, so each
+# kind has its own queue and workers (see docker-compose.yml)
+# The outbox relay sits with interactive work: its latency is the dispatch latency.
+# So do the short article cache refreshes, which must run on schedule rather
+# than behind a nightly chord, or the listings they keep warm expire.
+INTERACTIVE_TASKS = (
+    "stats.compute_achievement_rate",
+    "outbox.relay",
+    "articles.warm_articles_cache",
+    "articles.refresh_article_facets",
+)
+BATCH_TASKS = (
+    "stats.compute_achievement_rate_all_users",
+    "stats.compute_achievement_rate_chunk",
+    "stats.finish_achievement_rate_run",
+    "stats.rebuild_goal_counters_chunk",
+    "records.rebuild_activity_bitmaps_chunk",
+)
+MAINTENANCE_TASKS = (
+    "stats.rebuild_goal_counters",
+    "records.rebuild_daily_stats",
+    "records.rebuild_activity_bitmaps",
+    "records.maintain_partitions",
+    "records.archive_cold_records",
+)
+
+celery_app.conf.task_queues = tuple(
+    Queue(name, Exchange(name), routing_key=name) for name in ("interactive", "batch", "maintenance")
+)
+celery_app.conf.task_default_queue = "interactive"
+celery_app.conf.task_routes = {
+    **{name: {"queue": "interactive", "routing_key": "interactive"} for name in INTERACTIVE_TASKS},
+    **{name: {"queue": "batch", "routing_key": "batch"} for name in BATCH_TASKS},
+    **{name: {"queue": "maintenance", "routing_key": "maintenance"} for name in MAINTENANCE_TASKS},
+}
+# Long batch/maintenance tasks are idempotent: ack only once done, so a task
+# on a worker that dies is redelivered instead of lost. The Redis broker
+# redelivers anything unacked after the visibility timeout (default one hour),
+# so it is raised above the longest task and those tasks are killed before it.
+celery_app.conf.task_reject_on_worker_lost = True
+celery_app.conf.broker_transport_options = {"visibility_timeout": settings.celery_visibility_timeout_seconds}
+LATE_ACK_TIME_LIMIT = settings.celery_visibility_timeout_seconds - 300
+celery_app.conf.task_annotations = {
+    **{name: {"acks_late": False, "ignore_result": True} for name in INTERACTIVE_TASKS},
+    **{
+        name: {
+            "acks_late": True,
+            "time_limit": LATE_ACK_TIME_LIMIT,
+            # Nobody reads these results; only the chord needs its chunks' results
+            "ignore_result": name != "stats.compute_achievement_rate_chunk",
+        }
+        for name in BATCH_TASKS + MAINTENANCE_TASKS
+    },
+}
 
 
 # Celery Beat schedule
 celery_app.conf.timezone = "UTC"
 celery_app.conf.beat_schedule = {
+    "relay-task-outbox": {
+        "task": "outbox.relay",
+        "schedule": settings.outbox_relay_interval_seconds,
+    },
     "warm-articles-cache": {
         "task": "articles.warm_articles_cache",
+        "schedule": float(settings.articles_warm_interval_seconds),
+        # A run still queued when the next is due is superseded by it
+        "options": {"expires": float(settings.articles_warm_interval_seconds)},
+    },
+    "refresh-article-facets": {
+        "task": "articles.refresh_article_facets",
         "schedule": crontab(minute="*/15"),
     },
+    "maintain-record-partitions": {
+        "task": "records.maintain_partitions",
+        "schedule": crontab(minute=15, hour=1),
+    },
+    "repair-daily-stats": {
+        "task": "records.rebuild_daily_stats",
+        "schedule": crontab(minute=30, hour=2),
+        "kwargs": {"days": 7},
+    },
+    "rebuild-activity-bitmaps": {
+        "task": "records.rebuild_activity_bitmaps",
+        "schedule": crontab(minute=45, hour=2),
+    },
+    "rebuild-goal-counters": {
+        "task": "stats.rebuild_goal_counters",
+        "schedule": crontab(minute=50, hour=2),
+    },
+    "archive-cold-records": {
+        "task": "records.archive_cold_records",
+        "schedule": crontab(minute=30, hour=3, day_of_week="sun"),
+    },
     "compute-achievement-rate-daily": {
         "task": "stats.compute_achievement_rate_all_users",
         "schedule": crontab(minute=0, hour=3),
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import re
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+# Tables range-partitioned by month on ``date`` (migration b5c7d9e1f3a2). Each has
+# monthly partitions named <table>_pYYYY_MM plus a <table>_default catch-all.
+PARTITIONED_TABLES = ("body_records", "meals", "exercises", "goal_progress")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def list_month_partitions(session: Session, table: str) -> dict[date, str]:
+    """Attached monthly partitions of ``table`` keyed by the month they hold."""
+    rows = session.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table"
+        ),
+        {"table": table},
+    ).scalars()
+    pattern = re.compile(rf"^{re.escape(table)}_p(\d{{4}})_(\d{{2}})$")
+    months = {}
+    for name in rows:
+        match = pattern.match(name)
+        if match:
+            months[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return months
+
+
+def create_month_partition(session: Session, table: str, month: date) -> str:
+    """
+    Create and attach the partition for ``month``. Rows for that month that
+    already landed in the default partition are moved into it first, since
+    ATTACH refuses a range the default partition still holds rows for.
+    """
+    name = partition_name(table, month)
+    lower, upper = month, add_months(month, 1)
+    session.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    session.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {default_partition_name(table)} "
+            f"WHERE date >= :lower AND date < :upper RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        {"lower": lower, "upper": upper},
+    )
+    session.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')"))
+    return name
+
+
+def detach_month_partition(session: Session, table: str, month: date) -> str:
+    """Detach a month's partition; it stays behind as a plain table for archiving or dropping."""
+    name = partition_name(table, month)
+    session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+    return name
+
+
+def maintain_partitions(
+    session: Session,
+    *,
+    today: date | None = None,
+    months_ahead: int = 3,
+    retention_months: int = 0,
+) -> dict[str, list[str]]:
+    """
+    Make sure every table has partitions from the current month through
+    ``months_ahead`` months ahead, and detach those older than
+    ``retention_months`` (0 keeps everything). Returns created and detached names.
+    """
+    current = month_start(today or date.today())
+    wanted = [add_months(current, i) for i in range(months_ahead + 1)]
+    result: dict[str, list[str]] = {"created": [], "detached": []}
+    for table in PARTITIONED_TABLES:
+        existing = list_month_partitions(session, table)
+        for month in wanted:
+            if month not in existing:
+                result["created"].append(create_month_partition(session, table, month))
+        if retention_months > 0:
+            cutoff = add_months(current, -retention_months)
+            for month in sorted(m for m in existing if m < cutoff):
+                result["detached"].append(detach_month_partition(session, table, month))
+    return result
@@ -8,7 +8,15 @@ from sqlalchemy.orm import sessionmaker, scoped_session, Session
 from app.config import settings
 
 
-engine = create_engine(settings.database_url, pool_pre_ping=True, future=True)
+# The dashboard's thread pool (app.services.dashboard_service) holds up to
+# RECORDS_DASHBOARD_WORKERS connections besides the request threads' own
+engine = create_engine(
+    settings.database_url,
+    pool_pre_ping=True,
+    pool_size=settings.database_pool_size,
+    max_overflow=settings.database_max_overflow + settings.records_dashboard_workers,
+    future=True,
+)
 SessionLocal = scoped_session(
     sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False, future=True)
 )
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.db.session import get_db_session
 from app.models.user import User
+from app.services.sparse_fields import parse_fields
 
 
 bearer_scheme = HTTPBearer(auto_error=False)
@@ -42,3 +44,13 @@ def get_current_user(
     return user
 
 
+def sparse_fields(model: type[BaseModel]):
+    """Dependency parsing the ``fields`` query parameter against ``model`` (400 on unknown names)."""
+    def dependency(
+        fields: str | None = Query(None, description="Comma-separated fields to return, e.g. id,date,calories"),
+    ) -> tuple[str, ...] | None:
+        try:
+            return parse_fields(fields, model)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return dependency
@@ -1,5 +1,7 @@
 from .user import User  # noqa: F401
 from .record import BodyRecord, Meal, Exercise, Diary, Goal, GoalProgress  # noqa: F401
 from .article import Article, Tag, ArticleTag  # noqa: F401
+from .stats import UserDailyStats, AchievementRateHistory  # noqa: F401
+from .outbox import TaskOutbox  # noqa: F401
 
 
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from datetime import datetime
-from sqlalchemy import String, Text, DateTime, ForeignKey, func, Enum as SAEnum
+from sqlalchemy import String, Text, DateTime, ForeignKey, Index, Computed, func, Enum as SAEnum
 from app.schemas.enums import ArticleCategory
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
 
@@ -14,6 +14,8 @@ class Article(Base):
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     title: Mapped[str] = mapped_column(String(255))
     content: Mapped[str] = mapped_column(Text)
+    # Stored generated column so list views never have to read the full content
+    excerpt: Mapped[str | None] = mapped_column(Text, Computed("left(content, 280)", persisted=True), nullable=True)
     image_url: Mapped[str | None] = mapped_column(String(1024), nullable=True)
     category: Mapped[str] = mapped_column(
         SAEnum(ArticleCategory, name="article_category_enum", native_enum=False), index=True
@@ -22,6 +24,13 @@ class Article(Base):
     created_at: Mapped[datetime] = mapped_column(default=func.now())
     updated_at: Mapped[datetime] = mapped_column(default=func.now(), onupdate=func.now())
 
+    # Read-only; links are written through ArticleTag. Must be loaded explicitly (joinedload/selectinload).
+    tags: Mapped[list["Tag"]] = relationship(secondary="article_tags", viewonly=True, lazy="raise", order_by="Tag.id")
+
+
+# Matches the feed ordering so keyset pages are a single index range scan
+Index("ix_articles_published_at_id", Article.published_at.desc().nullslast(), Article.id.desc())
+
 
 class Tag(Base):
     __tablename__ = "tags"
@@ -32,6 +41,10 @@ class Tag(Base):
 
 class ArticleTag(Base):
     __tablename__ = "article_tags"
+    __table_args__ = (
+        # The PK covers lookups by article; this covers lookups by tag (filtering).
+        Index("ix_article_tags_tag_id_article_id", "tag_id", "article_id"),
+    )
 
     article_id: Mapped[int] = mapped_column(ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
     tag_id: Mapped[int] = mapped_column(ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
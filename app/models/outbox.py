@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Index, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class TaskOutbox(Base):
+    """
+    Celery tasks written in the same transaction as the change that needs them.
+    The outbox.relay beat task sends due rows to the broker and deletes them.
+    """
+
+    __tablename__ = "task_outbox"
+    __table_args__ = (Index("ix_task_outbox_available_at_id", "available_at", "id"),)
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    task_name: Mapped[str] = mapped_column(String(255))
+    args: Mapped[list] = mapped_column(JSONB, default=list)
+    kwargs: Mapped[dict] = mapped_column(JSONB, default=dict)
+    # At most one pending row per key; further enqueues with the same key are dropped
+    dedupe_key: Mapped[str | None] = mapped_column(String(255), nullable=True, unique=True)
+    available_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+
+    created_at: Mapped[datetime] = mapped_column(default=func.now())
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
 from datetime import date, time, datetime
-from sqlalchemy import String, Float, Integer, Date, Time, Text, ForeignKey, func, Enum as SAEnum, Boolean
+from sqlalchemy import String, Float, Integer, Date, Time, Text, ForeignKey, func, Enum as SAEnum, Boolean, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
 from app.schemas.enums import MealType
 
 
+# body_records, meals, exercises and goal_progress are range-partitioned by month
+# on date in the database (migration b5c7d9e1f3a2, app.db.partitions), with an
+# (id, date) key. The models map them as plain tables keyed by id, which comes
+# from a single sequence, so lookups by id keep working.
+
+
 class BodyRecord(Base):
     __tablename__ = "body_records"
 
@@ -38,6 +44,8 @@ class Goal(Base):
 
 class GoalProgress(Base):
     __tablename__ = "goal_progress"
+    # One row per goal and day; writes go through record_repository.upsert_goal_progress.
+    __table_args__ = (UniqueConstraint("goal_id", "date"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     goal_id: Mapped[int] = mapped_column(ForeignKey("goals.id", ondelete="CASCADE"), index=True)
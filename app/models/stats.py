@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from sqlalchemy import Date, Float, ForeignKey, Integer, SmallInteger, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class UserDailyStats(Base):
+    """Per-user, per-day rollup of the record tables, maintained incrementally on writes."""
+
+    __tablename__ = "user_daily_stats"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    date: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    meal_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    meal_calories: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    exercise_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    exercise_minutes: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    exercise_calories: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    body_record_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    weight_sum: Mapped[float] = mapped_column(Float, default=0.0, server_default="0")
+    diary_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+
+    updated_at: Mapped[datetime] = mapped_column(default=func.now(), onupdate=func.now())
+
+
+class AchievementRateHistory(Base):
+    """Daily achievement-rate snapshot per user and window, appended by the nightly job."""
+
+    __tablename__ = "achievement_rate_history"
+
+    # Key order serves the history endpoint: one user and window over a date range
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    window_days: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    date: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    rate: Mapped[float] = mapped_column(Float)
+    completed_goals: Mapped[int] = mapped_column(Integer)
+    total_goals: Mapped[int] = mapped_column(Integer)
@@ -3,3 +3,4 @@ from .record_repository import *  # noqa: F401,F403
 from .article_repository import *  # noqa: F401,F403
 
 
+from .outbox_repository import *  # noqa: F401,F403
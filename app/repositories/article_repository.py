@@ -1,67 +1,139 @@
 from __future__ import annotations
 
-from typing import List
+from datetime import datetime
+from typing import List, Sequence
 
-from sqlalchemy import select, func
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, Select, select, func, exists, tuple_
+from sqlalchemy.orm import Session, joinedload
 
 from app.models.article import Article, Tag, ArticleTag
 
 
-def list_articles(
-    session: Session,
+TAG_MODE_ANY = "any"
+TAG_MODE_ALL = "all"
+
+
+def normalize_tags(tag: str | Sequence[str] | None) -> list[str]:
+    if not tag:
+        return []
+    if isinstance(tag, str):
+        return [tag]
+    # keep order stable and drop duplicates/empties so HAVING counts stay correct
+    return sorted({t for t in tag if t})
+
+
+def _apply_filters(
+    stmt: Select,
     *,
     category: str | None,
-    tag: str | None,
+    tag: str | Sequence[str] | None,
+    tag_mode: str,
     q: str | None,
-    limit: int,
-    offset: int,
-) -> List[Article]:
-    stmt = select(Article)
+) -> Select:
     if category:
         stmt = stmt.where(Article.category == category)
     if q:
         like = f"%{q}%"
         stmt = stmt.where(func.lower(Article.title).like(func.lower(like)))
-    if tag:
-        stmt = (
-            select(Article)
-            .join(ArticleTag, ArticleTag.article_id == Article.id)
-            .join(Tag, Tag.id == ArticleTag.tag_id)
-            .where(Tag.name == tag)
-        )
-        if category:
-            stmt = stmt.where(Article.category == category)
-        if q:
-            like = f"%{q}%"
-            stmt = stmt.where(func.lower(Article.title).like(func.lower(like)))
-
-    stmt = stmt.order_by(Article.published_at.desc().nullslast(), Article.id.desc()).limit(limit).offset(offset)
-    return session.scalars(stmt).all()
+
+    tags = normalize_tags(tag)
+    if tags:
+        # Resolve names to ids once; the (tag_id, article_id) index on article_tags
+        # then serves both modes without joining tags/article_tags into the outer query.
+        tag_ids = select(Tag.id).where(Tag.name.in_(tags))
+        if tag_mode == TAG_MODE_ALL and len(tags) > 1:
+            matching = (
+                select(ArticleTag.article_id)
+                .where(ArticleTag.tag_id.in_(tag_ids))
+                .group_by(ArticleTag.article_id)
+                .having(func.count(ArticleTag.tag_id) == len(tags))
+            )
+            stmt = stmt.where(Article.id.in_(matching))
+        else:
+            stmt = stmt.where(
+                exists().where(ArticleTag.article_id == Article.id, ArticleTag.tag_id.in_(tag_ids))
+            )
+    return stmt
+
+
+_FEED_ORDER = (Article.published_at.desc().nullslast(), Article.id.desc())
+
+
+def _page_statements(
+    stmt: Select, *, limit: int, offset: int, after: tuple[datetime | None, int] | None
+) -> tuple[Select, Select | None]:
+    """
+    The page in ``published_at DESC NULLS LAST, id DESC`` order, continuing after the given
+    row: a statement, plus one for the undated tail to run when the first comes back short.
+    Each is a single range of ix_articles_published_at_id; one OR over both would not be.
+    """
+    if after is None:
+        return stmt.order_by(*_FEED_ORDER).offset(offset).limit(limit), None
+    published_at, article_id = after
+    undated = stmt.where(Article.published_at.is_(None)).order_by(*_FEED_ORDER)
+    if published_at is None:
+        return undated.where(Article.id < article_id).limit(limit), None
+    dated = stmt.where(tuple_(Article.published_at, Article.id) < tuple_(published_at, article_id))
+    return dated.order_by(*_FEED_ORDER).limit(limit), undated
+
+
+def _fetch_page(fetch, stmt: Select, *, limit: int, offset: int, after: tuple[datetime | None, int] | None) -> list:
+    page, tail = _page_statements(stmt, limit=limit, offset=offset, after=after)
+    rows = list(fetch(page))
+    if tail is not None and len(rows) < limit:
+        rows += fetch(tail.limit(limit - len(rows)))
+    return rows
+
+
+def list_articles(
+    session: Session,
+    *,
+    category: str | None,
+    tag: str | Sequence[str] | None,
+    q: str | None,
+    limit: int,
+    offset: int,
+    tag_mode: str = TAG_MODE_ANY,
+    after: tuple[datetime | None, int] | None = None,
+) -> List[Article]:
+    """List articles newest first; ``after`` (published_at, id) switches OFFSET to keyset paging."""
+    stmt = _apply_filters(select(Article), category=category, tag=tag, tag_mode=tag_mode, q=q)
+    return _fetch_page(lambda page: session.scalars(page).all(), stmt, limit=limit, offset=offset, after=after)
+
+
+def list_article_summaries(
+    session: Session,
+    *,
+    category: str | None,
+    tag: str | Sequence[str] | None,
+    q: str | None,
+    limit: int,
+    offset: int,
+    tag_mode: str = TAG_MODE_ANY,
+    after: tuple[datetime | None, int] | None = None,
+) -> list[Row]:
+    """Same listing as ``list_articles`` but selecting only the columns list views render."""
+    stmt = _apply_filters(
+        select(Article.id, Article.title, Article.excerpt, Article.image_url, Article.category, Article.published_at),
+        category=category,
+        tag=tag,
+        tag_mode=tag_mode,
+        q=q,
+    )
+    return _fetch_page(lambda page: session.execute(page).all(), stmt, limit=limit, offset=offset, after=after)
 
 
 def count_articles(
     session: Session,
     *,
     category: str | None,
-    tag: str | None,
+    tag: str | Sequence[str] | None,
     q: str | None,
+    tag_mode: str = TAG_MODE_ANY,
 ) -> int:
-    if tag:
-        stmt = (
-            select(func.count())
-            .select_from(Article)
-            .join(ArticleTag, ArticleTag.article_id == Article.id)
-            .join(Tag, Tag.id == ArticleTag.tag_id)
-            .where(Tag.name == tag)
-        )
-    else:
-        stmt = select(func.count()).select_from(Article)
-    if category:
-        stmt = stmt.where(Article.category == category)
-    if q:
-        like = f"%{q}%"
-        stmt = stmt.where(func.lower(Article.title).like(func.lower(like)))
+    stmt = _apply_filters(
+        select(func.count()).select_from(Article), category=category, tag=tag, tag_mode=tag_mode, q=q
+    )
     return session.execute(stmt).scalar_one()
 
 
@@ -75,6 +147,12 @@ def get_article(session: Session, article_id: int) -> Article | None:
     return session.get(Article, article_id)
 
 
+def get_article_with_tags(session: Session, article_id: int) -> Article | None:
+    """Load an article and its tags in a single round trip."""
+    stmt = select(Article).options(joinedload(Article.tags)).where(Article.id == article_id)
+    return session.execute(stmt).unique().scalar_one_or_none()
+
+
 def list_tags_by_article(session: Session, article_id: int) -> list[Tag]:
     return (
         session.execute(select(Tag).join(ArticleTag, ArticleTag.tag_id == Tag.id).where(ArticleTag.article_id == article_id))
@@ -83,3 +161,15 @@ def list_tags_by_article(session: Session, article_id: int) -> list[Tag]:
     )
 
 
+def count_articles_by_category(session: Session) -> list[tuple[str, int]]:
+    return session.execute(select(Article.category, func.count()).group_by(Article.category)).all()
+
+
+def count_articles_by_category_and_tag(session: Session) -> list[tuple[str, str, int]]:
+    return session.execute(
+        select(Article.category, Tag.name, func.count())
+        .select_from(ArticleTag)
+        .join(Article, Article.id == ArticleTag.article_id)
+        .join(Tag, Tag.id == ArticleTag.tag_id)
+        .group_by(Article.category, Tag.name)
+    ).all()
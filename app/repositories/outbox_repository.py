@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import Row, delete, extract, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.outbox import TaskOutbox
+
+
+def add_outbox_task(
+    session: Session,
+    *,
+    task_name: str,
+    args: list,
+    kwargs: dict,
+    delay_seconds: float = 0,
+    dedupe_key: str | None = None,
+) -> bool:
+    """
+    Queue a task row; returns False when a pending row with ``dedupe_key``
+    already exists, whose ``available_at`` is then pushed out to this one's.
+    """
+    available_at = func.now() + timedelta(seconds=delay_seconds)
+    stmt = pg_insert(TaskOutbox).values(
+        task_name=task_name, args=args, kwargs=kwargs, dedupe_key=dedupe_key, available_at=available_at
+    )
+    if dedupe_key is None:
+        session.execute(stmt)
+        return True
+    stmt = stmt.on_conflict_do_nothing(index_elements=[TaskOutbox.dedupe_key]).returning(TaskOutbox.id)
+    postpone = (
+        update(TaskOutbox)
+        .where(TaskOutbox.dedupe_key == dedupe_key)
+        .values(available_at=func.greatest(TaskOutbox.available_at, available_at))
+        .returning(TaskOutbox.id)
+    )
+    while True:
+        # No row comes back when the conflict skipped the insert
+        if session.execute(stmt).first() is not None:
+            return True
+        # Waits while the relay has the row claimed; no row comes back once it was sent and deleted
+        if session.execute(postpone).first() is not None:
+            return False
+
+
+def claim_due_outbox_tasks(session: Session, *, limit: int, lookahead_seconds: float = 0) -> list[Row]:
+    """
+    Lock up to ``limit`` rows due within ``lookahead_seconds``, oldest first,
+    each with the seconds until it is due (0 when overdue). SKIP LOCKED lets
+    several relays run at once without sending a row twice.
+    """
+    stmt = (
+        select(TaskOutbox, func.greatest(extract("epoch", TaskOutbox.available_at - func.now()), 0))
+        .where(TaskOutbox.available_at <= func.now() + timedelta(seconds=lookahead_seconds))
+        .order_by(TaskOutbox.available_at, TaskOutbox.id)
+        .limit(limit)
+        .with_for_update(of=TaskOutbox, skip_locked=True)
+    )
+    return session.execute(stmt).all()
+
+
+def delete_outbox_tasks(session: Session, sent: list[tuple[int, datetime]]) -> int:
+    """Delete the sent ``(id, available_at)`` rows, skipping any whose ``available_at`` moved since."""
+    if not sent:
+        return 0
+    result = session.execute(
+        delete(TaskOutbox).where(tuple_(TaskOutbox.id, TaskOutbox.available_at).in_(sent))
+    )
+    return result.rowcount
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+from datetime import date
 from typing import List
 
-from sqlalchemy import select, func
-from sqlalchemy.orm import Session
+from sqlalchemy import Date, cast, delete, insert, literal, literal_column, null, select, func, true, tuple_, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, aliased, load_only
 
 from app.models.record import BodyRecord, Meal, Exercise, Diary, Goal, GoalProgress
-from app.schemas.enums import MealType
+from app.models.stats import AchievementRateHistory, UserDailyStats
+from app.models.user import User
+from app.schemas.enums import SummaryGranularity
+
+
+def _load_only(model, columns, *always):
+    # Restrict the SELECT to the requested columns; the primary key is always loaded
+    return load_only(*(getattr(model, name) for name in dict.fromkeys((*columns, *always))))
 
 
 # BodyRecord
@@ -18,16 +27,30 @@ def list_body_records_by_user(
     offset: int = 0,
     date_from=None,
     date_to=None,
+    columns=None,
 ) -> List[BodyRecord]:
     stmt = select(BodyRecord).where(BodyRecord.user_id == user_id)
     if date_from is not None:
         stmt = stmt.where(BodyRecord.date >= date_from)
     if date_to is not None:
         stmt = stmt.where(BodyRecord.date <= date_to)
-    stmt = stmt.order_by(BodyRecord.date.desc()).limit(limit).offset(offset)
+    stmt = stmt.order_by(BodyRecord.date.desc(), BodyRecord.id.desc()).limit(limit).offset(offset)
+    if columns:
+        stmt = stmt.options(_load_only(BodyRecord, columns))
     return session.scalars(stmt).all()
 
 
+def list_body_record_series(session: Session, user_id: int, *, date_from=None, date_to=None) -> list[tuple]:
+    """(date, weight, body_fat_percentage) rows in chronological order, without ORM hydration."""
+    stmt = select(BodyRecord.date, BodyRecord.weight, BodyRecord.body_fat_percentage).where(BodyRecord.user_id == user_id)
+    if date_from is not None:
+        stmt = stmt.where(BodyRecord.date >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(BodyRecord.date <= date_to)
+    stmt = stmt.order_by(BodyRecord.date.asc(), BodyRecord.id.asc())
+    return session.execute(stmt).all()
+
+
 def count_body_records_by_user(session: Session, user_id: int, *, date_from=None, date_to=None) -> int:
     stmt = select(func.count()).select_from(BodyRecord).where(BodyRecord.user_id == user_id)
     if date_from is not None:
@@ -44,8 +67,9 @@ def create_body_record(session: Session, *, user_id: int, data: dict) -> BodyRec
     return record
 
 
-def get_body_record_by_id(session: Session, user_id: int, record_id: int) -> BodyRecord | None:
-    obj = session.get(BodyRecord, record_id)
+def get_body_record_by_id(session: Session, user_id: int, record_id: int, *, columns=None) -> BodyRecord | None:
+    options = [_load_only(BodyRecord, columns, "user_id")] if columns else None
+    obj = session.get(BodyRecord, record_id, options=options)
     return obj if obj and obj.user_id == user_id else None
 
 
@@ -68,14 +92,70 @@ def list_goals_by_user(
     limit: int | None = None,
     offset: int = 0,
     is_active: bool | None = None,
+    columns=None,
 ) -> List[Goal]:
     stmt = select(Goal).where(Goal.user_id == user_id)
     if is_active is not None:
         stmt = stmt.where(Goal.is_active == is_active)
     stmt = stmt.order_by(Goal.created_at.desc()).limit(limit).offset(offset)
+    if columns:
+        stmt = stmt.options(_load_only(Goal, columns))
     return session.scalars(stmt).all()
 
 
+def list_goals_with_progress(
+    session: Session,
+    user_id: int,
+    *,
+    limit: int | None = None,
+    offset: int = 0,
+    is_active: bool | None = None,
+    columns=None,
+    latest: bool = False,
+    stats_from=None,
+    stats_to=None,
+) -> list[tuple]:
+    """
+    (goal, latest progress or None, logged days, completed days) per goal in one
+    query: each goal's newest progress row and its counts over [stats_from,
+    stats_to] come from LATERAL subqueries. Parts not requested are None.
+    """
+    stmt = select(Goal).where(Goal.user_id == user_id)
+    if is_active is not None:
+        stmt = stmt.where(Goal.is_active == is_active)
+    if columns:
+        stmt = stmt.options(_load_only(Goal, columns))
+
+    if latest:
+        newest = (
+            select(GoalProgress)
+            .where(GoalProgress.goal_id == Goal.id)
+            .order_by(GoalProgress.date.desc())
+            .limit(1)
+            .lateral("latest_progress")
+        )
+        latest_progress = aliased(GoalProgress, newest)
+        stmt = stmt.add_columns(latest_progress).outerjoin_from(Goal, latest_progress, true())
+    else:
+        stmt = stmt.add_columns(null())
+
+    if stats_from is not None:
+        counts = (
+            select(
+                func.count().label("logged_days"),
+                func.count().filter(GoalProgress.is_completed.is_(True)).label("completed_days"),
+            )
+            .where(GoalProgress.goal_id == Goal.id, GoalProgress.date >= stats_from, GoalProgress.date <= stats_to)
+            .lateral("progress_stats")
+        )
+        stmt = stmt.add_columns(counts.c.logged_days, counts.c.completed_days).join_from(Goal, counts, true())
+    else:
+        stmt = stmt.add_columns(null(), null())
+
+    stmt = stmt.order_by(Goal.created_at.desc()).limit(limit).offset(offset)
+    return [tuple(row) for row in session.execute(stmt)]
+
+
 def count_goals_by_user(session: Session, user_id: int, *, is_active: bool | None = None) -> int:
     stmt = select(func.count()).select_from(Goal).where(Goal.user_id == user_id)
     if is_active is not None:
@@ -90,8 +170,9 @@ def create_goal(session: Session, *, user_id: int, data: dict) -> Goal:
     return goal
 
 
-def get_goal_by_id(session: Session, user_id: int, goal_id: int) -> Goal | None:
-    obj = session.get(Goal, goal_id)
+def get_goal_by_id(session: Session, user_id: int, goal_id: int, *, columns=None) -> Goal | None:
+    options = [_load_only(Goal, columns, "user_id")] if columns else None
+    obj = session.get(Goal, goal_id, options=options)
     return obj if obj and obj.user_id == user_id else None
 
 
@@ -115,6 +196,7 @@ def list_goal_progress_by_goal(
     offset: int = 0,
     date_from=None,
     date_to=None,
+    columns=None,
 ) -> List[GoalProgress]:
     stmt = select(GoalProgress).where(GoalProgress.goal_id == goal_id)
     if date_from is not None:
@@ -122,6 +204,8 @@ def list_goal_progress_by_goal(
     if date_to is not None:
         stmt = stmt.where(GoalProgress.date <= date_to)
     stmt = stmt.order_by(GoalProgress.date.desc()).limit(limit).offset(offset)
+    if columns:
+        stmt = stmt.options(_load_only(GoalProgress, columns))
     return session.scalars(stmt).all()
 
 
@@ -141,8 +225,37 @@ def create_goal_progress(session: Session, *, goal_id: int, data: dict) -> GoalP
     return progress
 
 
-def get_goal_progress_by_id(session: Session, goal_id: int, progress_id: int) -> GoalProgress | None:
-    obj = session.get(GoalProgress, progress_id)
+def upsert_goal_progress(session: Session, goal_id: int, items: list[dict]) -> list[GoalProgress]:
+    """
+    Insert or overwrite one progress row per item date with a single
+    INSERT ... ON CONFLICT (goal_id, date) DO UPDATE. Rows whose values do not
+    change are left untouched and are not returned.
+    """
+    stmt = pg_insert(GoalProgress).values([{**item, "goal_id": goal_id} for item in items])
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[GoalProgress.goal_id, GoalProgress.date],
+        set_={
+            "current_value": excluded.current_value,
+            "is_completed": excluded.is_completed,
+            "notes": excluded.notes,
+            "updated_at": func.now(),
+        },
+        where=tuple_(GoalProgress.current_value, GoalProgress.is_completed, GoalProgress.notes).is_distinct_from(
+            tuple_(excluded.current_value, excluded.is_completed, excluded.notes)
+        ),
+    ).returning(GoalProgress)
+    return list(session.scalars(stmt, execution_options={"populate_existing": True}))
+
+
+def list_goal_progress_by_dates(session: Session, goal_id: int, dates) -> List[GoalProgress]:
+    stmt = select(GoalProgress).where(GoalProgress.goal_id == goal_id, GoalProgress.date.in_(list(dates)))
+    return session.scalars(stmt.order_by(GoalProgress.date)).all()
+
+
+def get_goal_progress_by_id(session: Session, goal_id: int, progress_id: int, *, columns=None) -> GoalProgress | None:
+    options = [_load_only(GoalProgress, columns, "goal_id")] if columns else None
+    obj = session.get(GoalProgress, progress_id, options=options)
     return obj if obj and obj.goal_id == goal_id else None
 
 
@@ -179,6 +292,138 @@ def count_total_goals_by_user(session: Session, user_id: int) -> int:
     return session.execute(stmt).scalar_one()
 
 
+def get_goal_owner(session: Session, goal_id: int) -> int | None:
+    # Usually an identity-map hit: routes load the goal to check ownership first
+    goal = session.get(Goal, goal_id)
+    return goal.user_id if goal else None
+
+
+def list_completed_goal_days(session: Session, user_id: int, *, date_from=None, date_to=None, goal_id=None) -> list[tuple]:
+    """(date, goal_id) of every completed progress row of the user's goals within the range"""
+    stmt = (
+        select(GoalProgress.date, GoalProgress.goal_id)
+        .join(Goal, Goal.id == GoalProgress.goal_id)
+        .where(Goal.user_id == user_id, GoalProgress.is_completed == True)
+    )
+    if date_from is not None:
+        stmt = stmt.where(GoalProgress.date >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(GoalProgress.date <= date_to)
+    if goal_id is not None:
+        stmt = stmt.where(GoalProgress.goal_id == goal_id)
+    return [tuple(row) for row in session.execute(stmt)]
+
+
+def list_users_with_goals(session: Session, *, after_id: int = 0, max_id: int | None = None) -> List[int]:
+    stmt = select(Goal.user_id).where(Goal.user_id > after_id).distinct()
+    if max_id is not None:
+        stmt = stmt.where(Goal.user_id <= max_id)
+    return list(session.scalars(stmt))
+
+
+def get_user_id_bounds(session: Session) -> tuple[int, int] | None:
+    """Lowest and highest user id, or None without users"""
+    low, high = session.execute(select(func.min(User.id), func.max(User.id))).one()
+    return None if low is None else (low, high)
+
+
+def get_user_id_ranges(session: Session, size: int) -> list[tuple[int, int]]:
+    """(after_id, max_id) ranges of ``size`` ids covering every user id, in order"""
+    bounds = get_user_id_bounds(session)
+    if bounds is None:
+        return []
+    low, high = bounds
+    return [(start - 1, min(start + size - 1, high)) for start in range(low, high + 1, size)]
+
+
+def list_goal_counts_for_users(
+    session: Session, *, after_id: int = 0, max_id: int | None = None, limit: int = 1000, date_froms=(), date_to=None
+) -> list[tuple]:
+    """
+    (user_id, active goals, completed goals since each of ``date_froms``...)
+    for the next ``limit`` users with id above ``after_id`` (and at most
+    ``max_id``), in id order. Same
+    counts as count_total_goals_by_user / count_completed_goals_by_user, for
+    every window in one grouped query with a FILTER per window.
+    """
+    users = select(User.id).where(User.id > after_id)
+    if max_id is not None:
+        users = users.where(User.id <= max_id)
+    users = users.order_by(User.id).limit(limit).cte("batch_users")
+    completed = (
+        select(
+            Goal.user_id,
+            *(
+                func.count(func.distinct(Goal.id)).filter(GoalProgress.date >= date_from).label(f"completed_{i}")
+                for i, date_from in enumerate(date_froms)
+            ),
+        )
+        .join(GoalProgress, GoalProgress.goal_id == Goal.id)
+        .where(Goal.user_id.in_(select(users.c.id)), GoalProgress.is_completed == True)
+    )
+    if date_froms:
+        completed = completed.where(GoalProgress.date >= min(date_froms))
+    if date_to is not None:
+        completed = completed.where(GoalProgress.date <= date_to)
+    completed = completed.group_by(Goal.user_id).subquery("completed_goals")
+    active = (
+        select(Goal.user_id, func.count().label("total"))
+        .where(Goal.user_id.in_(select(users.c.id)), Goal.is_active == True)
+        .group_by(Goal.user_id)
+        .subquery("active_goals")
+    )
+    stmt = (
+        select(
+            users.c.id,
+            func.coalesce(active.c.total, 0),
+            *(func.coalesce(completed.c[f"completed_{i}"], 0) for i in range(len(date_froms))),
+        )
+        .outerjoin(completed, completed.c.user_id == users.c.id)
+        .outerjoin(active, active.c.user_id == users.c.id)
+        .order_by(users.c.id)
+    )
+    return [tuple(row) for row in session.execute(stmt)]
+
+
+def upsert_achievement_rate_history(session: Session, rows: list[dict]) -> int:
+    """
+    Insert snapshot rows with multi-row INSERTs; a rerun on the same day
+    overwrites that day's values.
+    """
+    # 6 parameters per row keeps each statement well under Postgres' 65535 limit
+    for start in range(0, len(rows), 5000):
+        stmt = pg_insert(AchievementRateHistory).values(rows[start:start + 5000])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AchievementRateHistory.user_id, AchievementRateHistory.window_days, AchievementRateHistory.date],
+            set_={name: stmt.excluded[name] for name in ("rate", "completed_goals", "total_goals")},
+        )
+        session.execute(stmt)
+    return len(rows)
+
+
+def delete_achievement_rate_history_before(session: Session, *, after_id: int, max_id: int, before) -> int:
+    """Drop snapshots older than ``before`` for users with after_id < id <= max_id (a key range scan)."""
+    stmt = delete(AchievementRateHistory).where(
+        AchievementRateHistory.user_id > after_id,
+        AchievementRateHistory.user_id <= max_id,
+        AchievementRateHistory.date < before,
+    )
+    return session.execute(stmt).rowcount or 0
+
+
+def list_achievement_rate_history(
+    session: Session, user_id: int, window_days: int, *, date_from=None, date_to=None
+) -> List[AchievementRateHistory]:
+    stmt = select(AchievementRateHistory).where(
+        AchievementRateHistory.user_id == user_id, AchievementRateHistory.window_days == window_days
+    )
+    if date_from is not None:
+        stmt = stmt.where(AchievementRateHistory.date >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(AchievementRateHistory.date <= date_to)
+    return session.scalars(stmt.order_by(AchievementRateHistory.date)).all()
+
+
 # Meal
 def list_meals_by_user(
     session: Session,
@@ -189,6 +434,7 @@ def list_meals_by_user(
     date_from=None,
     date_to=None,
     meal_type: str | None = None,
+    columns=None,
 ) -> List[Meal]:
     stmt = select(Meal).where(Meal.user_id == user_id)
     if date_from is not None:
@@ -198,6 +444,8 @@ def list_meals_by_user(
     if meal_type is not None:
         stmt = stmt.where(Meal.meal_type == meal_type)
     stmt = stmt.order_by(Meal.date.desc(), Meal.id.desc()).limit(limit).offset(offset)
+    if columns:
+        stmt = stmt.options(_load_only(Meal, columns))
     return session.scalars(stmt).all()
 
 
@@ -219,8 +467,9 @@ def create_meal(session: Session, *, user_id: int, data: dict) -> Meal:
     return item
 
 
-def get_meal_by_id(session: Session, user_id: int, meal_id: int) -> Meal | None:
-    obj = session.get(Meal, meal_id)
+def get_meal_by_id(session: Session, user_id: int, meal_id: int, *, columns=None) -> Meal | None:
+    options = [_load_only(Meal, columns, "user_id")] if columns else None
+    obj = session.get(Meal, meal_id, options=options)
     return obj if obj and obj.user_id == user_id else None
 
 
@@ -244,6 +493,7 @@ def list_exercises_by_user(
     offset: int = 0,
     date_from=None,
     date_to=None,
+    columns=None,
 ) -> List[Exercise]:
     stmt = select(Exercise).where(Exercise.user_id == user_id)
     if date_from is not None:
@@ -251,6 +501,8 @@ def list_exercises_by_user(
     if date_to is not None:
         stmt = stmt.where(Exercise.date <= date_to)
     stmt = stmt.order_by(Exercise.date.desc(), Exercise.id.desc()).limit(limit).offset(offset)
+    if columns:
+        stmt = stmt.options(_load_only(Exercise, columns))
     return session.scalars(stmt).all()
 
 
@@ -270,8 +522,9 @@ def create_exercise(session: Session, *, user_id: int, data: dict) -> Exercise:
     return item
 
 
-def get_exercise_by_id(session: Session, user_id: int, exercise_id: int) -> Exercise | None:
-    obj = session.get(Exercise, exercise_id)
+def get_exercise_by_id(session: Session, user_id: int, exercise_id: int, *, columns=None) -> Exercise | None:
+    options = [_load_only(Exercise, columns, "user_id")] if columns else None
+    obj = session.get(Exercise, exercise_id, options=options)
     return obj if obj and obj.user_id == user_id else None
 
 
@@ -295,6 +548,7 @@ def list_diaries_by_user(
     offset: int = 0,
     date_from=None,
     date_to=None,
+    columns=None,
 ) -> List[Diary]:
     stmt = select(Diary).where(Diary.user_id == user_id)
     if date_from is not None:
@@ -302,6 +556,8 @@ def list_diaries_by_user(
     if date_to is not None:
         stmt = stmt.where(Diary.date <= date_to)
     stmt = stmt.order_by(Diary.date.desc(), Diary.id.desc()).limit(limit).offset(offset)
+    if columns:
+        stmt = stmt.options(_load_only(Diary, columns))
     return session.scalars(stmt).all()
 
 
@@ -321,8 +577,9 @@ def create_diary(session: Session, *, user_id: int, data: dict) -> Diary:
     return item
 
 
-def get_diary_by_id(session: Session, user_id: int, diary_id: int) -> Diary | None:
-    obj = session.get(Diary, diary_id)
+def get_diary_by_id(session: Session, user_id: int, diary_id: int, *, columns=None) -> Diary | None:
+    options = [_load_only(Diary, columns, "user_id")] if columns else None
+    obj = session.get(Diary, diary_id, options=options)
     return obj if obj and obj.user_id == user_id else None
 
 
@@ -338,37 +595,169 @@ def delete_diary(session: Session, obj: Diary) -> None:
 
 
 def count_record_days_in_range(session: Session, user_id: int, start_date, end_date) -> int:
-    # Count distinct dates in any of the record tables for the user within the range
-    from sqlalchemy import union
-    
-    # Get all distinct dates from all record types
-    body_dates = select(BodyRecord.date).where(
-        BodyRecord.user_id == user_id,
-        BodyRecord.date >= start_date,
-        BodyRecord.date <= end_date,
+    # Days with at least one record of any type, read from the daily rollup
+    stmt = select(func.count()).select_from(UserDailyStats).where(
+        UserDailyStats.user_id == user_id,
+        UserDailyStats.date >= start_date,
+        UserDailyStats.date <= end_date,
+        _has_records(),
+    )
+    return session.execute(stmt).scalar_one() or 0
+
+
+# Daily stats rollup
+DAILY_STATS_COUNTERS = (
+    "meal_count", "meal_calories",
+    "exercise_count", "exercise_minutes", "exercise_calories",
+    "body_record_count", "weight_sum",
+    "diary_count",
+)
+
+
+def _has_records():
+    return (
+        UserDailyStats.meal_count + UserDailyStats.exercise_count
+        + UserDailyStats.body_record_count + UserDailyStats.diary_count
+    ) > 0
+
+
+# Advisory lock namespace for user_daily_stats, keyed by user id. Deltas hold
+# their user's key shared until commit; a rebuild holds its users' keys
+# exclusively, so no delta lands between its DELETE and INSERT.
+_DAILY_STATS_LOCK = 7321
+
+
+def apply_daily_stats_delta(session: Session, user_id: int, day, deltas: dict) -> int:
+    """
+    Atomically add ``deltas`` (counter -> signed amount) to the user's row for ``day``.
+    Returns how many records the day holds afterwards.
+    """
+    session.execute(select(func.pg_advisory_xact_lock_shared(_DAILY_STATS_LOCK, user_id)))
+    stmt = pg_insert(UserDailyStats).values(user_id=user_id, date=day, **deltas)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserDailyStats.user_id, UserDailyStats.date],
+        set_={
+            **{name: getattr(UserDailyStats, name) + stmt.excluded[name] for name in deltas},
+            "updated_at": func.now(),
+        },
+    ).returning(
+        UserDailyStats.meal_count + UserDailyStats.exercise_count
+        + UserDailyStats.body_record_count + UserDailyStats.diary_count
+    )
+    return session.execute(stmt).scalar_one()
+
+
+def rebuild_daily_stats(
+    session: Session, *, user_id: int | None = None, after_id: int | None = None, max_id: int | None = None, date_from=None
+) -> int:
+    """
+    Recompute rollup rows from the record tables for one user, or for the
+    users with after_id < id <= max_id. Blocks those users' writes until the
+    caller commits, so callers keep ranges small and commit per range.
+    """
+    if user_id is not None:
+        after_id, max_id = user_id - 1, user_id
+    elif after_id is None or max_id is None:
+        raise ValueError("rebuild_daily_stats needs user_id or after_id and max_id")
+
+    def scoped(stmt, model):
+        stmt = stmt.where(model.user_id > after_id, model.user_id <= max_id)
+        if date_from is not None:
+            stmt = stmt.where(model.date >= date_from)
+        return stmt
+
+    def per_day(model, **sums):
+        columns = [model.user_id.label("user_id"), model.date.label("date")]
+        for name in DAILY_STATS_COUNTERS:
+            columns.append((sums[name] if name in sums else literal(0)).label(name))
+        return scoped(select(*columns), model).group_by(model.user_id, model.date)
+
+    combined = union_all(
+        per_day(Meal, meal_count=func.count(), meal_calories=func.coalesce(func.sum(Meal.calories), 0)),
+        per_day(
+            Exercise,
+            exercise_count=func.count(),
+            exercise_minutes=func.coalesce(func.sum(Exercise.duration_min), 0),
+            exercise_calories=func.coalesce(func.sum(Exercise.calories), 0),
+        ),
+        per_day(BodyRecord, body_record_count=func.count(), weight_sum=func.sum(BodyRecord.weight)),
+        per_day(Diary, diary_count=func.count()),
+    ).subquery()
+    rollup = select(
+        combined.c.user_id,
+        combined.c.date,
+        *[func.sum(combined.c[name]) for name in DAILY_STATS_COUNTERS],
+    ).group_by(combined.c.user_id, combined.c.date)
+
+    # In id order, so overlapping rebuilds cannot deadlock
+    user_ids = select(User.id).where(User.id > after_id, User.id <= max_id).order_by(User.id).subquery()
+    session.execute(select(func.pg_advisory_xact_lock(_DAILY_STATS_LOCK, user_ids.c.id)))
+    session.execute(scoped(delete(UserDailyStats), UserDailyStats))
+    result = session.execute(
+        insert(UserDailyStats).from_select(["user_id", "date", *DAILY_STATS_COUNTERS], rollup)
     )
-    
-    meal_dates = select(Meal.date).where(
-        Meal.user_id == user_id,
-        Meal.date >= start_date,
-        Meal.date <= end_date,
+    return result.rowcount or 0
+
+
+def sum_daily_stats_by_period(session: Session, user_id: int, *, granularity, date_from, date_to) -> list[tuple]:
+    """(period_start, meal_calories, exercise_calories, exercise_minutes, weight_sum, body_record_count) per period"""
+    period = _period(UserDailyStats.date, granularity)
+    stmt = (
+        select(
+            period,
+            func.sum(UserDailyStats.meal_calories),
+            func.sum(UserDailyStats.exercise_calories),
+            func.sum(UserDailyStats.exercise_minutes),
+            func.sum(UserDailyStats.weight_sum),
+            func.sum(UserDailyStats.body_record_count),
+        )
+        .where(UserDailyStats.user_id == user_id, UserDailyStats.date >= date_from, UserDailyStats.date <= date_to)
+        .group_by(period)
     )
-    
-    exercise_dates = select(Exercise.date).where(
-        Exercise.user_id == user_id,
-        Exercise.date >= start_date,
-        Exercise.date <= end_date,
+    return session.execute(stmt).all()
+
+
+# Summaries
+def _period(column, granularity: SummaryGranularity):
+    # inlined (not a bound param) so the SELECT and GROUP BY expressions are identical
+    return cast(func.date_trunc(literal_column(f"'{SummaryGranularity(granularity).value}'"), column), Date)
+
+
+def list_active_days(session: Session, user_id: int) -> List[date]:
+    stmt = (
+        select(UserDailyStats.date)
+        .where(UserDailyStats.user_id == user_id, _has_records())
+        .order_by(UserDailyStats.date)
     )
-    
-    diary_dates = select(Diary.date).where(
-        Diary.user_id == user_id,
-        Diary.date >= start_date,
-        Diary.date <= end_date,
+    return list(session.scalars(stmt))
+
+
+def list_users_with_daily_stats(session: Session, *, after_id: int = 0, max_id: int | None = None) -> List[int]:
+    stmt = select(UserDailyStats.user_id).where(_has_records(), UserDailyStats.user_id > after_id).distinct()
+    if max_id is not None:
+        stmt = stmt.where(UserDailyStats.user_id <= max_id)
+    return list(session.scalars(stmt))
+
+
+# Archival (any user-owned record model)
+def list_record_months_before(session: Session, model, before) -> list[tuple]:
+    """(user_id, month_start) pairs with rows of ``model`` dated before ``before``"""
+    month = _period(model.date, SummaryGranularity.month)
+    stmt = (
+        select(model.user_id, month)
+        .where(model.date < before)
+        .group_by(model.user_id, month)
+        .order_by(model.user_id, month)
     )
-    
-    # Union all dates and count distinct
-    all_dates = union(body_dates, meal_dates, exercise_dates, diary_dates).subquery()
-    result = session.execute(select(func.count()).select_from(all_dates)).scalar_one()
-    return result or 0
+    return session.execute(stmt).all()
+
+
+def list_records_in_range(session: Session, model, user_id: int, date_from, date_before) -> list:
+    stmt = select(model).where(model.user_id == user_id, model.date >= date_from, model.date < date_before)
+    return session.scalars(stmt).all()
 
 
+def delete_records_by_ids(session: Session, model, ids, *, date_from, date_before) -> int:
+    # The date bounds let Postgres prune to the month's partition
+    stmt = delete(model).where(model.id.in_(ids), model.date >= date_from, model.date < date_before)
+    return session.execute(stmt).rowcount or 0
@@ -1,13 +1,12 @@
 from __future__ import annotations
 
-from typing import List
+from typing import List, Literal, Union
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.dependencies import get_db
-from app.schemas.articles import ArticleRead
-from app.schemas.enums import ArticleCategory
+from app.schemas.articles import ArticleFacets, ArticleRead, ArticleSummary
 from app.schemas.common import Pagination
 from app.services import article_service
 
@@ -15,30 +14,43 @@ from app.services import article_service
 router = APIRouter()
 
 
-@router.get("/articles", response_model=Pagination[ArticleRead])
+@router.get("/articles", response_model=Union[Pagination[ArticleRead], Pagination[ArticleSummary]])
 def list_articles(
     session: Session = Depends(get_db),
     category: str | None = Query(None),
-    tag: str | None = Query(None),
+    tag: List[str] | None = Query(None, description="Repeat to filter by several tags, e.g. tag=a&tag=b"),
+    tag_mode: Literal["any", "all"] = Query("any", description="any: match at least one tag, all: match every tag"),
     q: str | None = Query(None),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    view: Literal["full", "summary"] = Query("full", description="summary: omit content, include a short excerpt"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page; replaces offset"),
 ):
-    return article_service.list_articles(
-        session,
-        category=category,
-        tag=tag,
-        q=q,
-        limit=limit,
-        offset=offset,
-    )
+    try:
+        return article_service.list_articles(
+            session,
+            category=category,
+            tag=tag,
+            tag_mode=tag_mode,
+            q=q,
+            limit=limit,
+            offset=offset,
+            view=view,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/articles/facets", response_model=ArticleFacets)
+def get_article_facets(session: Session = Depends(get_db)):
+    """Article counts per category, per tag and per category x tag."""
+    return article_service.get_article_facets(session)
 
 
 @router.get("/articles/{article_id}", response_model=ArticleRead)
 def get_article(article_id: int, session: Session = Depends(get_db)):
     result = article_service.get_article(session, article_id)
     if result is None:
-        return ArticleRead(id=0, title="", content="", image_url=None, category=ArticleCategory.Recommended, published_at=None, tags=[])
+        raise HTTPException(status_code=404, detail="Article not found")
     return result
-
-
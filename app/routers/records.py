@@ -1,34 +1,98 @@
 from __future__ import annotations
 
+from datetime import date
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_db, get_current_user
+from app.dependencies import get_db, get_current_user, sparse_fields
 from app.models.user import User
 from app.schemas.records import (
     BodyRecordCreate, BodyRecordRead, BodyRecordUpdate,
     MealCreate, MealRead, MealUpdate,
     ExerciseCreate, ExerciseRead, ExerciseUpdate,
     DiaryCreate, DiaryRead, DiaryUpdate,
-    GoalCreate, GoalRead, GoalUpdate,
-    GoalProgressCreate, GoalProgressRead, GoalProgressUpdate,
+    GoalCreate, GoalRead, GoalUpdate, GoalWithProgressRead,
+    GoalProgressCreate, GoalProgressRead, GoalProgressUpdate, GoalProgressUpsert,
+    RecordSummary, WeightTrend, ActivityCalendar, ActivityStreak, RecordDashboard,
 )
+from app.schemas.enums import SummaryGranularity
 from app.schemas.common import Pagination
 from app.services.record_service import (
     body_record_service, meal_service, exercise_service, diary_service,
     goal_service, goal_progress_service
 )
+from app.services import activity_service, dashboard_service, summary_service, trend_service
+from app.services.sparse_fields import sparse_response
 
 router = APIRouter(prefix="/records", tags=["records"])
 
 
+# Summary
+@router.get("/summary", response_model=RecordSummary)
+def get_records_summary(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    date_from: str | None = Query(None, description="YYYY-MM-DD, defaults to 30 days before date_to"),
+    date_to: str | None = Query(None, description="YYYY-MM-DD, defaults to today"),
+    granularity: SummaryGranularity = Query(SummaryGranularity.day),
+):
+    """Calories in/out, exercise minutes and average weight per day, week or month"""
+    from datetime import datetime
+    date_from_obj = datetime.strptime(date_from, "%Y-%m-%d").date() if date_from else None
+    date_to_obj = datetime.strptime(date_to, "%Y-%m-%d").date() if date_to else None
+
+    try:
+        return summary_service.get_records_summary(
+            db, current_user.id, date_from=date_from_obj, date_to=date_to_obj, granularity=granularity
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# Dashboard
+@router.get("/dashboard", response_model=RecordDashboard)
+def get_dashboard(
+    current_user: User = Depends(get_current_user),
+    limit: int = Query(5, ge=1, le=20, description="Latest records per type"),
+    window_days: int = Query(30, ge=1, le=365, description="Achievement rate window"),
+):
+    """Latest body records, meals, exercises and diaries plus the achievement rate in one call"""
+    return dashboard_service.get_dashboard(current_user.id, limit=limit, window_days=window_days)
+
+
+# Activity
+@router.get("/calendar", response_model=ActivityCalendar)
+def get_activity_calendar(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    month: str | None = Query(None, description="YYYY-MM, defaults to the current month"),
+):
+    """Days of the month with at least one record"""
+    from datetime import date, datetime
+    try:
+        first = datetime.strptime(month, "%Y-%m").date() if month else date.today().replace(day=1)
+        return activity_service.get_activity_calendar(db, current_user.id, year=first.year, month=first.month)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/streak", response_model=ActivityStreak)
+def get_activity_streak(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Current and longest run of consecutive days with records"""
+    return activity_service.get_activity_streak(db, current_user.id)
+
+
 # Body Records
 @router.get("/body-records", response_model=Pagination[BodyRecordRead])
 def list_body_records(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    fields: tuple[str, ...] | None = Depends(sparse_fields(BodyRecordRead)),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
     date_from: str | None = Query(None, description="YYYY-MM-DD"),
@@ -39,9 +103,28 @@ def list_body_records(
     date_from_obj = datetime.strptime(date_from, "%Y-%m-%d").date() if date_from else None
     date_to_obj = datetime.strptime(date_to, "%Y-%m-%d").date() if date_to else None
     
-    return body_record_service.list_records(
+    page = body_record_service.list_records(
         db, current_user.id, limit=limit, offset=offset,
-        date_from=date_from_obj, date_to=date_to_obj
+        date_from=date_from_obj, date_to=date_to_obj, columns=fields
+    )
+    return sparse_response(page, BodyRecordRead, fields)
+
+
+@router.get("/body-records/trend", response_model=WeightTrend)
+def get_body_record_trend(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    points: int = Query(200, ge=3, le=2000, description="Maximum number of points to return"),
+    date_from: str | None = Query(None, description="YYYY-MM-DD"),
+    date_to: str | None = Query(None, description="YYYY-MM-DD"),
+):
+    """Downsampled weight series with 7/30-day moving averages for long-range charts"""
+    from datetime import datetime
+    date_from_obj = datetime.strptime(date_from, "%Y-%m-%d").date() if date_from else None
+    date_to_obj = datetime.strptime(date_to, "%Y-%m-%d").date() if date_to else None
+
+    return trend_service.get_weight_trend(
+        db, current_user.id, points=points, date_from=date_from_obj, date_to=date_to_obj
     )
 
 
@@ -60,12 +143,13 @@ def get_body_record(
     record_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    fields: tuple[str, ...] | None = Depends(sparse_fields(BodyRecordRead)),
 ):
     """Get a specific body record"""
-    record = body_record_service.get_record(db, current_user.id, record_id)
+    record = body_record_service.get_record(db, current_user.id, record_id, columns=fields)
     if not record:
         raise HTTPException(status_code=404, detail="Body record not found")
-    return record
+    return sparse_response(record, BodyRecordRead, fields)
 
 
 @router.patch("/body-records/{record_id}", response_model=BodyRecordRead)
@@ -101,14 +185,28 @@ def delete_body_record(
 def list_goals(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    fields: tuple[str, ...] | None = Depends(sparse_fields(GoalRead)),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
     is_active: bool | None = Query(None),
+    include: str | None = Query(None, description="Comma-separated extras per goal: latest_progress, stats"),
+    stats_window_days: int = Query(30, ge=1, le=365, description="Window for include=stats"),
 ):
     """List goals for current user with pagination and active filter"""
-    return goal_service.list_records(
-        db, current_user.id, limit=limit, offset=offset, is_active=is_active
+    if include:
+        extras = tuple(dict.fromkeys(name.strip() for name in include.split(",") if name.strip()))
+        try:
+            page = goal_service.list_records_with_progress(
+                db, current_user.id, include=list(extras), limit=limit, offset=offset,
+                columns=fields, stats_window_days=stats_window_days, is_active=is_active
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return sparse_response(page, GoalWithProgressRead, (fields or tuple(GoalRead.model_fields)) + extras)
+    page = goal_service.list_records(
+        db, current_user.id, limit=limit, offset=offset, is_active=is_active, columns=fields
     )
+    return sparse_response(page, GoalRead, fields)
 
 
 @router.post("/goals", response_model=GoalRead, status_code=201)
@@ -126,12 +224,13 @@ def get_goal(
     goal_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    fields: tuple[str, ...] | None = Depends(sparse_fields(GoalRead)),
 ):
     """Get a specific goal"""
-    goal = goal_service.get_record(db, current_user.id, goal_id)
+    goal = goal_service.get_record(db, current_user.id, goal_id, columns=fields)
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
-    return goal
+    return sparse_response(goal, GoalRead, fields)
 
 
 @router.patch("/goals/{goal_id}", response_model=GoalRead)
@@ -168,6 +267,7 @@ def list_goal_progress(
     goal_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    fields: tuple[str, ...] | None = Depends(sparse_fields(GoalProgressRead)),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
     date_from: str | None = Query(None, description="YYYY-MM-DD"),
@@ -183,10 +283,11 @@ def list_goal_progress(
     date_from_obj = datetime.strptime(date_from, "%Y-%m-%d").date() if date_from else None
     date_to_obj = datetime.strptime(date_to, "%Y-%m-%d").date() if date_to else None
     
-    return goal_progress_service.list_records(
+    page = goal_progress_service.list_records(
         db, goal_id, limit=limit, offset=offset,
-        date_from=date_from_obj, date_to=date_to_obj
+        date_from=date_from_obj, date_to=date_to_obj, columns=fields
     )
+    return sparse_response(page, GoalProgressRead, fields)
 
 
 @router.post("/goals/{goal_id}/progress", response_model=GoalProgressRead, status_code=201)
@@ -202,13 +303,61 @@ def create_goal_progress(
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
     
-    result = goal_progress_service.create_record(db, goal_id, progress.model_dump())
-    
-    # Trigger achievement rate calculation when goal progress is created
-    from app.tasks.stats_tasks import compute_achievement_rate_task
-    compute_achievement_rate_task.delay(current_user.id)
-    
-    return result
+    # Same (goal, date) again overwrites that day's row instead of adding another
+    rows, changed = goal_progress_service.upsert_records(db, goal_id, [progress.model_dump()])
+    if changed:
+        _recompute_achievement_rate(db, current_user.id)
+    return rows[0]
+
+
+@router.put("/goals/{goal_id}/progress", response_model=List[GoalProgressRead])
+def upsert_goal_progress_batch(
+    goal_id: int,
+    progress: List[GoalProgressCreate],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Create or overwrite progress for several dates of a goal at once"""
+    goal = goal_service.get_record(db, current_user.id, goal_id)
+    if not goal:
+        raise HTTPException(status_code=404, detail="Goal not found")
+
+    try:
+        rows, changed = goal_progress_service.upsert_records(db, goal_id, [p.model_dump() for p in progress])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if changed:
+        _recompute_achievement_rate(db, current_user.id)
+    return rows
+
+
+@router.put("/goals/{goal_id}/progress/{progress_date}", response_model=GoalProgressRead)
+def upsert_goal_progress(
+    goal_id: int,
+    progress_date: date,
+    progress: GoalProgressUpsert,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Create or overwrite the progress of a goal for one date (idempotent)"""
+    goal = goal_service.get_record(db, current_user.id, goal_id)
+    if not goal:
+        raise HTTPException(status_code=404, detail="Goal not found")
+
+    rows, changed = goal_progress_service.upsert_records(
+        db, goal_id, [{**progress.model_dump(), "date": progress_date}]
+    )
+    if changed:
+        _recompute_achievement_rate(db, current_user.id)
+    return rows[0]
+
+
+def _recompute_achievement_rate(db: Session, user_id: int) -> None:
+    # Only when progress actually changed; identical resends enqueue nothing, and
+    # a burst of writes shares one debounced task. Queued in the request's
+    # transaction, so the worker always sees the committed progress.
+    from app.tasks.stats_tasks import schedule_achievement_rate_recompute
+    schedule_achievement_rate_recompute(db, user_id)
 
 
 @router.get("/goals/{goal_id}/progress/{progress_id}", response_model=GoalProgressRead)
@@ -217,6 +366,7 @@ def get_goal_progress(
     progress_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    fields: tuple[str, ...] | None = Depends(sparse_fields(GoalProgressRead)),
 ):
     """Get a specific goal progress"""
     # Verify goal belongs to user
@@ -224,10 +374,10 @@ def get_goal_progress(
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
     
-    progress = goal_progress_service.get_record(db, goal_id, progress_id)
+    progress = goal_progress_service.get_record(db, goal_id, progress_id, columns=fields)
     if not progress:
         raise HTTPException(status_code=404, detail="Goal progress not found")
-    return progress
+    return sparse_response(progress, GoalProgressRead, fields)
 
 
 @router.patch("/goals/{goal_id}/progress/{progress_id}", response_model=GoalProgressRead)
@@ -244,9 +394,12 @@ def update_goal_progress(
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
     
-    progress = goal_progress_service.update_record(
-        db, goal_id, progress_id, progress_update.model_dump(exclude_unset=True)
-    )
+    try:
+        progress = goal_progress_service.update_record(
+            db, goal_id, progress_id, progress_update.model_dump(exclude_unset=True)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     if not progress:
         raise HTTPException(status_code=404, detail="Goal progress not found")
     return progress
@@ -275,6 +428,7 @@ def delete_goal_progress(
 def list_meals(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    fields: tuple[str, ...] | None = Depends(sparse_fields(MealRead)),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
     date_from: str | None = Query(None, description="YYYY-MM-DD"),
@@ -286,10 +440,11 @@ def list_meals(
     date_from_obj = datetime.strptime(date_from, "%Y-%m-%d").date() if date_from else None
     date_to_obj = datetime.strptime(date_to, "%Y-%m-%d").date() if date_to else None
     
-    return meal_service.list_records(
+    page = meal_service.list_records(
         db, current_user.id, limit=limit, offset=offset,
-        date_from=date_from_obj, date_to=date_to_obj, meal_type=meal_type
+        date_from=date_from_obj, date_to=date_to_obj, meal_type=meal_type, columns=fields
     )
+    return sparse_response(page, MealRead, fields)
 
 
 @router.post("/meals", response_model=MealRead, status_code=201)
@@ -307,12 +462,13 @@ def get_meal(
     meal_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    fields: tuple[str, ...] | None = Depends(sparse_fields(MealRead)),
 ):
     """Get a specific meal"""
-    meal = meal_service.get_record(db, current_user.id, meal_id)
+    meal = meal_service.get_record(db, current_user.id, meal_id, columns=fields)
     if not meal:
         raise HTTPException(status_code=404, detail="Meal not found")
-    return meal
+    return sparse_response(meal, MealRead, fields)
 
 
 @router.patch("/meals/{meal_id}", response_model=MealRead)
@@ -348,6 +504,7 @@ def delete_meal(
 def list_exercises(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    fields: tuple[str, ...] | None = Depends(sparse_fields(ExerciseRead)),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
     date_from: str | None = Query(None, description="YYYY-MM-DD"),
@@ -358,10 +515,11 @@ def list_exercises(
     date_from_obj = datetime.strptime(date_from, "%Y-%m-%d").date() if date_from else None
     date_to_obj = datetime.strptime(date_to, "%Y-%m-%d").date() if date_to else None
     
-    return exercise_service.list_records(
+    page = exercise_service.list_records(
         db, current_user.id, limit=limit, offset=offset,
-        date_from=date_from_obj, date_to=date_to_obj
+        date_from=date_from_obj, date_to=date_to_obj, columns=fields
     )
+    return sparse_response(page, ExerciseRead, fields)
 
 
 @router.post("/exercises", response_model=ExerciseRead, status_code=201)
@@ -379,12 +537,13 @@ def get_exercise(
     exercise_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    fields: tuple[str, ...] | None = Depends(sparse_fields(ExerciseRead)),
 ):
     """Get a specific exercise"""
-    exercise = exercise_service.get_record(db, current_user.id, exercise_id)
+    exercise = exercise_service.get_record(db, current_user.id, exercise_id, columns=fields)
     if not exercise:
         raise HTTPException(status_code=404, detail="Exercise not found")
-    return exercise
+    return sparse_response(exercise, ExerciseRead, fields)
 
 
 @router.patch("/exercises/{exercise_id}", response_model=ExerciseRead)
@@ -420,6 +579,7 @@ def delete_exercise(
 def list_diaries(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    fields: tuple[str, ...] | None = Depends(sparse_fields(DiaryRead)),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
     date_from: str | None = Query(None, description="YYYY-MM-DD"),
@@ -430,10 +590,11 @@ def list_diaries(
     date_from_obj = datetime.strptime(date_from, "%Y-%m-%d").date() if date_from else None
     date_to_obj = datetime.strptime(date_to, "%Y-%m-%d").date() if date_to else None
     
-    return diary_service.list_records(
+    page = diary_service.list_records(
         db, current_user.id, limit=limit, offset=offset,
-        date_from=date_from_obj, date_to=date_to_obj
+        date_from=date_from_obj, date_to=date_to_obj, columns=fields
     )
+    return sparse_response(page, DiaryRead, fields)
 
 
 @router.post("/diaries", response_model=DiaryRead, status_code=201)
@@ -451,12 +612,13 @@ def get_diary(
     diary_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    fields: tuple[str, ...] | None = Depends(sparse_fields(DiaryRead)),
 ):
     """Get a specific diary entry"""
-    diary = diary_service.get_record(db, current_user.id, diary_id)
+    diary = diary_service.get_record(db, current_user.id, diary_id, columns=fields)
     if not diary:
         raise HTTPException(status_code=404, detail="Diary not found")
-    return diary
+    return sparse_response(diary, DiaryRead, fields)
 
 
 @router.patch("/diaries/{diary_id}", response_model=DiaryRead)
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+from datetime import date, timedelta
+
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.dependencies import get_db, get_current_user
 from app.models.user import User
-from app.services.stats_service import compute_achievement_rate, get_cached_achievement_rate
+from app.repositories import user_repository
+from app.services import leaderboard_service, stats_service
+from app.services.stats_service import get_achievement_rate_summary
 from app.tasks.stats_tasks import compute_achievement_rate_task
 
 router = APIRouter(prefix="/stats", tags=["stats"])
@@ -24,30 +28,7 @@ def get_achievement_rate(
     
     The achievement rate shows how well the user is progressing toward their health goals.
     """
-    # Try to get from cache first
-    cached = get_cached_achievement_rate(current_user.id)
-    if cached and cached.get("window_days") == window_days:
-        return {
-            "achievement_rate": cached["value"],
-            "window_days": window_days,
-            "completed_goals": cached.get("completed_goals", 0),
-            "total_goals": cached.get("total_goals", 0),
-            "cached": True
-        }
-    
-    # Calculate fresh
-    rate = compute_achievement_rate(db, current_user.id, window_days)
-    
-    # Get the cached data that was just set
-    cached = get_cached_achievement_rate(current_user.id)
-    
-    return {
-        "achievement_rate": rate,
-        "window_days": window_days,
-        "completed_goals": cached.get("completed_goals", 0) if cached else 0,
-        "total_goals": cached.get("total_goals", 0) if cached else 0,
-        "cached": False
-    }
+    return get_achievement_rate_summary(db, current_user.id, window_days)
 
 
 @router.get("/achievement-rate/user/{user_id}")
@@ -64,33 +45,75 @@ def get_achievement_rate_for_user(
     """
     # For now, allow any authenticated user to view others' stats
     # In production, you might want to add role-based access control
-    
-    # Try to get from cache first
-    cached = get_cached_achievement_rate(user_id)
-    if cached and cached.get("window_days") == window_days:
-        return {
-            "user_id": user_id,
-            "achievement_rate": cached["value"],
-            "window_days": window_days,
-            "completed_goals": cached.get("completed_goals", 0),
-            "total_goals": cached.get("total_goals", 0),
-            "cached": True
-        }
-    
-    # Calculate fresh
-    rate = compute_achievement_rate(db, user_id, window_days)
-    
-    # Get the cached data that was just set
-    cached = get_cached_achievement_rate(user_id)
-    
-    return {
-        "user_id": user_id,
-        "achievement_rate": rate,
-        "window_days": window_days,
-        "completed_goals": cached.get("completed_goals", 0) if cached else 0,
-        "total_goals": cached.get("total_goals", 0) if cached else 0,
-        "cached": False
-    }
+    if user_repository.get_by_id(db, user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"user_id": user_id, **get_achievement_rate_summary(db, user_id, window_days)}
+
+
+@router.get("/achievement-rate/history")
+def get_achievement_rate_history(
+    window_days: int = Query(30, description="One of 7, 30, 90, 365"),
+    date_from: date | None = Query(None, description="Defaults to 90 days ago"),
+    date_to: date | None = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Current user's daily achievement-rate snapshots for trend charts."""
+    if date_from is None:
+        date_from = (date_to or date.today()) - timedelta(days=89)
+    try:
+        history = stats_service.get_achievement_rate_history(
+            db, current_user.id, window_days, date_from=date_from, date_to=date_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"window_days": window_days, "data": history}
+
+
+@router.get("/achievement-rate/leaderboard")
+def get_achievement_leaderboard(
+    window_days: int = Query(30, description="One of 7, 30, 90, 365"),
+    limit: int = Query(10, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+):
+    """Users with the highest achievement rates; equal rates share a rank."""
+    try:
+        return {"window_days": window_days, "data": leaderboard_service.get_top(window_days, limit)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/achievement-rate/rank")
+def get_achievement_rank(
+    window_days: int = Query(30, description="One of 7, 30, 90, 365"),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Current user's rank and how far up the ranking they are (``top_percent``).
+    Users are ranked by the nightly job once they have active goals.
+    """
+    try:
+        rank = leaderboard_service.get_rank(current_user.id, window_days)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if rank is None:
+        raise HTTPException(status_code=404, detail="Not ranked yet")
+    return rank
+
+
+@router.get("/achievement-rate/histogram")
+def get_achievement_histogram(
+    window_days: int = Query(30, description="One of 7, 30, 90, 365"),
+    current_user: User = Depends(get_current_user),
+):
+    """Distribution of achievement rates across users in 10-point buckets, from the nightly job."""
+    try:
+        histogram = leaderboard_service.get_histogram(window_days)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if histogram is None:
+        raise HTTPException(status_code=404, detail="Histogram not computed yet")
+    return {"window_days": window_days, **histogram}
 
 
 @router.post("/achievement-rate/trigger")
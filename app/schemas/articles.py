@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List
+from typing import Dict, List
 
 from pydantic import BaseModel, ConfigDict
 from app.schemas.enums import ArticleCategory
@@ -27,3 +27,19 @@ class ArticleRead(ArticleBase):
     tags: List[TagRead] = []
 
 
+class ArticleSummary(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    title: str
+    excerpt: str | None = None
+    image_url: str | None = None
+    category: ArticleCategory
+    published_at: datetime | None = None
+    tags: List[TagRead] = []
+
+
+class ArticleFacets(BaseModel):
+    total: int
+    categories: Dict[str, int] = {}
+    tags: Dict[str, int] = {}
+    category_tags: Dict[str, Dict[str, int]] = {}
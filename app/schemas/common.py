@@ -26,5 +26,6 @@ class Pagination(BaseModel, Generic[T]):
     previous: str
     next: str
     count: int
+    next_cursor: str | None = None
 
 
@@ -17,3 +17,7 @@ class ArticleCategory(str, Enum):
     Health = "Health"
 
 
+class SummaryGranularity(str, Enum):
+    day = "day"
+    week = "week"
+    month = "month"
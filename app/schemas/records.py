@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from datetime import date, time, datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, ConfigDict, HttpUrl, field_validator
-from app.schemas.enums import MealType
+from app.schemas.enums import MealType, SummaryGranularity
 
 
 class BodyRecordBase(BaseModel):
@@ -64,6 +64,13 @@ class GoalRead(GoalBase):
     updated_at: datetime
 
 
+class GoalStats(BaseModel):
+    window_days: int
+    logged_days: int
+    completed_days: int
+    completion_rate: float
+
+
 class GoalProgressBase(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -83,6 +90,19 @@ class GoalProgressCreate(BaseModel):
     notes: Optional[str] = None
 
 
+class GoalWithProgressRead(GoalRead):
+    latest_progress: Optional[GoalProgressRead] = None
+    stats: Optional[GoalStats] = None
+
+
+class GoalProgressUpsert(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    current_value: Optional[float] = None
+    is_completed: bool = False
+    notes: Optional[str] = None
+
+
 class GoalProgressUpdate(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -195,3 +215,58 @@ class DiaryRead(DiaryBase):
     updated_at: datetime
 
 
+class RecordSummaryBucket(BaseModel):
+    period_start: date
+    calories_in: int = 0
+    calories_out: int = 0
+    exercise_minutes: int = 0
+    weight: Optional[float] = None
+
+
+class RecordSummary(BaseModel):
+    date_from: date
+    date_to: date
+    granularity: SummaryGranularity
+    buckets: List[RecordSummaryBucket]
+
+
+class WeightTrendPoint(BaseModel):
+    date: date
+    weight: float
+    body_fat_percentage: Optional[float] = None
+    weight_ma7: float
+    weight_ma30: float
+
+
+class WeightTrend(BaseModel):
+    total_records: int
+    points: List[WeightTrendPoint]
+
+
+class ActivityCalendar(BaseModel):
+    month: str
+    active_days: int
+    days: List[date]
+
+
+class ActivityStreak(BaseModel):
+    current: int
+    longest: int
+    total_active_days: int
+    last_active_date: Optional[date] = None
+
+
+class DashboardAchievementRate(BaseModel):
+    achievement_rate: float
+    window_days: int
+    completed_goals: int
+    total_goals: int
+    cached: bool
+
+
+class RecordDashboard(BaseModel):
+    body_records: List[BodyRecordRead]
+    meals: List[MealRead]
+    exercises: List[ExerciseRead]
+    diaries: List[DiaryRead]
+    achievement_rate: DashboardAchievementRate
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import calendar
+from datetime import date, timedelta
+
+import numpy as np
+from redis.exceptions import WatchError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.repositories import record_repository
+from app.schemas.records import ActivityCalendar, ActivityStreak
+from app.services.cache import get_redis_binary_client
+
+
+# Bit N of a user's bitmap is set when the user has at least one record on EPOCH + N days
+EPOCH = date(2000, 1, 1)
+
+# {(user_id, day): active} written in a session, applied to the bitmaps once it commits
+_PENDING_MARKS = "activity.pending"
+
+# Rebuilds retry when a write lands between their SQL read and their Redis write
+_REBUILD_ATTEMPTS = 5
+
+
+def _bitmap_key(user_id: int) -> str:
+    return f"user:{user_id}:activity_days"
+
+
+def _writes_key(user_id: int) -> str:
+    # Bumped by every applied write, built bitmap or not; rebuilds WATCH it
+    return f"user:{user_id}:activity_days:writes"
+
+
+def _offset(day: date) -> int:
+    return (day - EPOCH).days
+
+
+def mark_activity(session: Session, user_id: int, day: date, active: bool = True) -> None:
+    """
+    Set or clear the bit for ``day`` once ``session`` commits. A missing
+    bitmap is left alone so that a partial one is never mistaken for a built
+    one; it is rebuilt on read.
+    """
+    if day >= EPOCH:
+        session.info.setdefault(_PENDING_MARKS, {})[user_id, day] = active
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_after_commit(session: Session) -> None:
+    marks = session.info.pop(_PENDING_MARKS, None)
+    if not marks:
+        return
+    redis = get_redis_binary_client()
+    for (user_id, day), active in marks.items():
+        key = _bitmap_key(user_id)
+        pipe = redis.pipeline()
+        pipe.incr(_writes_key(user_id))
+        pipe.expire(_writes_key(user_id), 24 * 3600)
+        if redis.exists(key):
+            pipe.setbit(key, _offset(day), 1 if active else 0)
+        pipe.execute()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_MARKS, None)
+
+
+def rebuild_activity_bitmap(session: Session, user_id: int) -> int:
+    """
+    Rebuild the user's bitmap from user_daily_stats; returns the number of
+    active days. The read is retried when a committed write is applied
+    meanwhile, so the rebuild cannot overwrite it with older data.
+    """
+    with get_redis_binary_client().pipeline() as pipe:
+        for _ in range(_REBUILD_ATTEMPTS - 1):
+            try:
+                return _rebuild(session, pipe, user_id, watch=True)
+            except WatchError:
+                pipe.reset()
+        # Still racing with writes: accept it, the nightly rebuild corrects the bitmap
+        return _rebuild(session, pipe, user_id, watch=False)
+
+
+def _rebuild(session: Session, pipe, user_id: int, *, watch: bool) -> int:
+    if watch:
+        pipe.watch(_writes_key(user_id))
+    offsets = [_offset(d) for d in record_repository.list_active_days(session, user_id) if d >= EPOCH]
+    bits = np.zeros(max(offsets, default=0) + 1, dtype=np.uint8)
+    bits[offsets] = 1
+    pipe.multi()
+    # Always at least one byte so that an empty history still counts as built
+    pipe.set(_bitmap_key(user_id), np.packbits(bits).tobytes())
+    pipe.execute()
+    return len(offsets)
+
+
+def _ensure_bitmap(session: Session, user_id: int) -> str:
+    key = _bitmap_key(user_id)
+    if not get_redis_binary_client().exists(key):
+        rebuild_activity_bitmap(session, user_id)
+    return key
+
+
+def get_activity_calendar(session: Session, user_id: int, *, year: int, month: int) -> ActivityCalendar:
+    """Days of ``month`` with at least one record, from a single BITFIELD read."""
+    first = date(year, month, 1)
+    if first < EPOCH:
+        raise ValueError(f"month must be {EPOCH:%Y-%m} or later")
+    days_in_month = calendar.monthrange(year, month)[1]
+    key = _ensure_bitmap(session, user_id)
+    # BITFIELD reads the month as one unsigned integer, most significant bit = day 1
+    (packed,) = get_redis_binary_client().bitfield(key).get(f"u{days_in_month}", _offset(first)).execute()
+    active = [
+        first + timedelta(days=i)
+        for i in range(days_in_month)
+        if packed >> (days_in_month - 1 - i) & 1
+    ]
+    return ActivityCalendar(month=f"{first:%Y-%m}", active_days=len(active), days=active)
+
+
+def get_activity_streak(session: Session, user_id: int, *, today: date | None = None) -> ActivityStreak:
+    """
+    Current and longest run of consecutive active days. The current streak
+    still counts when today has no record yet but yesterday does.
+    """
+    today = today or date.today()
+    key = _ensure_bitmap(session, user_id)
+    redis = get_redis_binary_client()
+    first_bit = redis.bitpos(key, 1)
+    if first_bit < 0:
+        return ActivityStreak(current=0, longest=0, total_active_days=0, last_active_date=None)
+
+    # Skip the leading all-zero bytes; only the span from the first active day is unpacked
+    start_byte = first_bit // 8
+    raw = redis.getrange(key, start_byte, -1)
+    bits = np.unpackbits(np.frombuffer(raw, dtype=np.uint8))
+    base = start_byte * 8
+    today_index = _offset(today) - base
+    bits = bits[: max(today_index + 1, 0)]
+    if not bits.any():
+        return ActivityStreak(current=0, longest=0, total_active_days=0, last_active_date=None)
+
+    active = np.flatnonzero(bits)
+    last_active = int(active[-1])
+    # Runs of ones: boundaries where the padded sequence flips
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], bits, [0])).astype(np.int8)))
+    runs = edges[1::2] - edges[0::2]
+    current = int(runs[-1]) if last_active >= today_index - 1 else 0
+    return ActivityStreak(
+        current=current,
+        longest=int(runs.max()),
+        total_active_days=len(active),
+        last_active_date=EPOCH + timedelta(days=base + last_active),
+    )
@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import json
+import os
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from enum import Enum
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Iterator
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.record import BodyRecord, Diary, Exercise, Meal
+from app.repositories import record_repository
+
+
+# Record tables whose cold months are moved to archive files, one compressed
+# columnar .npz per user and month: <root>/<table>/user_<id>/<YYYY-MM>.npz
+ARCHIVED_MODELS = {model.__tablename__: model for model in (BodyRecord, Meal, Exercise, Diary)}
+
+_NULL_SUFFIX = ".null"
+
+# Per user and table, <user dir>/index.json holds row counts per month, day
+# and value of the columns the list endpoints filter on, so totals are
+# counted without decoding the archive files
+_INDEX_FILE = "index.json"
+INDEXED_FILTERS = {"meals": ("meal_type",)}
+
+# Holds the start of the first month that has not been archived. Records (and
+# the user_daily_stats rows derived from them) before it may only exist in
+# archive files, so rollup rebuilds must not reach back past it.
+_BOUNDARY_FILE = "archived_before"
+
+
+def _user_dir(table: str, user_id: int) -> str:
+    return os.path.join(settings.records_archive_root, table, f"user_{user_id}")
+
+
+def _index_path(table: str, user_id: int) -> str:
+    return os.path.join(_user_dir(table, user_id), _INDEX_FILE)
+
+
+def _month_path(table: str, user_id: int, month: date) -> str:
+    return os.path.join(_user_dir(table, user_id), f"{month:%Y-%m}.npz")
+
+
+def _next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def archived_months(table: str, user_id: int) -> list[date]:
+    try:
+        names = os.listdir(_user_dir(table, user_id))
+    except FileNotFoundError:
+        return []
+    return sorted(datetime.strptime(name[:-4], "%Y-%m").date() for name in names if name.endswith(".npz"))
+
+
+def archived_before() -> date | None:
+    """Start of the first month not archived by any run, or None if nothing was archived."""
+    try:
+        with open(os.path.join(settings.records_archive_root, _BOUNDARY_FILE)) as fh:
+            return date.fromisoformat(fh.read().strip())
+    except FileNotFoundError:
+        pass
+    # Archives written before the boundary file existed
+    newest = [
+        month
+        for table in ARCHIVED_MODELS
+        for user_dir in _list_dir(os.path.join(settings.records_archive_root, table))
+        for month in archived_months(table, int(user_dir.removeprefix("user_")))
+    ]
+    return _next_month(max(newest)) if newest else None
+
+
+def _list_dir(path: str) -> list[str]:
+    try:
+        return os.listdir(path)
+    except FileNotFoundError:
+        return []
+
+
+def _raise_boundary(before: date) -> None:
+    current = archived_before()
+    if current is not None and current >= before:
+        return
+    os.makedirs(settings.records_archive_root, exist_ok=True)
+    path = os.path.join(settings.records_archive_root, _BOUNDARY_FILE)
+    with open(path + ".tmp", "w") as fh:
+        fh.write(before.isoformat())
+    os.replace(path + ".tmp", path)
+
+
+def _encode(values: list, python_type: type) -> tuple[np.ndarray, np.ndarray]:
+    nulls = np.array([v is None for v in values], dtype=bool)
+    if python_type is time:
+        # Times are stored as microseconds since midnight
+        values = [None if v is None else (v.hour * 3600 + v.minute * 60 + v.second) * 1_000_000 + v.microsecond for v in values]
+        python_type = int
+    if python_type is datetime:
+        column = np.array([v or datetime.min for v in values], dtype="datetime64[us]")
+    elif python_type is date:
+        column = np.array([v or date.min for v in values], dtype="datetime64[D]")
+    elif python_type is str:
+        column = np.array([str(getattr(v, "value", v) or "") for v in values], dtype=np.str_)
+    else:
+        column = np.array([v or 0 for v in values], dtype=np.dtype(python_type))
+    return column, nulls
+
+
+def _decode(column: np.ndarray, nulls: np.ndarray, python_type: type) -> list:
+    values = column.tolist()
+    if python_type is time:
+        values = [(datetime.min + timedelta(microseconds=v)).time() for v in values]
+    return [None if null else value for value, null in zip(values, nulls.tolist())]
+
+
+def _columns(table: str) -> list[tuple[str, type]]:
+    columns = []
+    for column in ARCHIVED_MODELS[table].__table__.columns:
+        python_type = column.type.python_type
+        # Enums (meal_type) are stored by value
+        columns.append((column.name, str if issubclass(python_type, Enum) else python_type))
+    return columns
+
+
+def _write_month(table: str, user_id: int, month: date, rows: list[dict[str, Any]]) -> None:
+    """Write ``rows`` (merged with any existing file for the month) atomically."""
+    _month_index(table, user_id)  # makes sure the other months are indexed
+    path = _month_path(table, user_id, month)
+    merged = {row["id"]: row for row in _load_month(path, _mtime(path))} if os.path.exists(path) else {}
+    merged.update((row["id"], row) for row in rows)
+    ordered = sorted(merged.values(), key=lambda row: (row["date"], row["id"]))
+    arrays = {}
+    for name, python_type in _columns(table):
+        arrays[name], arrays[name + _NULL_SUFFIX] = _encode([row[name] for row in ordered], python_type)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp.npz"
+    np.savez_compressed(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+    _update_index(table, user_id, {month: _month_groups(table, ordered)})
+
+
+def _mtime(path: str) -> float:
+    return os.stat(path).st_mtime
+
+
+@lru_cache(maxsize=512)
+def _load_month(path: str, mtime: float) -> tuple[dict[str, Any], ...]:
+    # mtime is part of the cache key so a rewritten month is read again
+    table = os.path.basename(os.path.dirname(os.path.dirname(path)))
+    with np.load(path, allow_pickle=False) as data:
+        columns = {
+            name: _decode(data[name], data[name + _NULL_SUFFIX], python_type)
+            for name, python_type in _columns(table)
+        }
+    return tuple(dict(zip(columns, values)) for values in zip(*columns.values()))
+
+
+def _month_groups(table: str, rows) -> list[list]:
+    """[day, *indexed filter values, count] for each distinct combination in ``rows``"""
+    counts = Counter(
+        (row["date"].isoformat(), *(getattr(row[name], "value", row[name]) for name in INDEXED_FILTERS.get(table, ())))
+        for row in rows
+    )
+    return [[*key, count] for key, count in sorted(counts.items())]
+
+
+def _update_index(table: str, user_id: int, months: dict[date, list[list]]) -> None:
+    path = _index_path(table, user_id)
+    index = dict(_load_index(path, _mtime(path))) if os.path.exists(path) else {}
+    index.update((f"{month:%Y-%m}", groups) for month, groups in months.items())
+    with open(path + ".tmp", "w") as fh:
+        json.dump(index, fh)
+    os.replace(path + ".tmp", path)
+
+
+@lru_cache(maxsize=512)
+def _load_index(path: str, mtime: float) -> dict[str, list[list]]:
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def _month_index(table: str, user_id: int) -> dict[date, list[list]]:
+    path = _index_path(table, user_id)
+    if not os.path.exists(path):
+        months = archived_months(table, user_id)
+        if not months:
+            return {}
+        # Archived before the index existed: build it once from the files
+        paths = {month: _month_path(table, user_id, month) for month in months}
+        _update_index(table, user_id, {
+            month: _month_groups(table, _load_month(month_path, _mtime(month_path))) for month, month_path in paths.items()
+        })
+    return {datetime.strptime(month, "%Y-%m").date(): groups for month, groups in _load_index(path, _mtime(path)).items()}
+
+
+def _in_range(month: date, date_from: date | None, date_to: date | None) -> bool:
+    return (date_to is None or month <= date_to) and (date_from is None or _next_month(month) > date_from)
+
+
+def _group_matches(table: str, group: list, date_from: date | None, date_to: date | None, filters: dict) -> bool:
+    day = date.fromisoformat(group[0])
+    if (date_from is not None and day < date_from) or (date_to is not None and day > date_to):
+        return False
+    values = dict(zip(INDEXED_FILTERS.get(table, ()), group[1:-1]))
+    return all(value is None or values[name] == getattr(value, "value", value) for name, value in filters.items())
+
+
+def count_archived(
+    table: str, user_id: int, *, date_from: date | None = None, date_to: date | None = None, **filters: Any
+) -> int:
+    """Number of archived rows ``iter_archived`` yields for the same arguments, from the month index."""
+    unindexed = [name for name, value in filters.items() if value is not None and name not in INDEXED_FILTERS.get(table, ())]
+    if unindexed:
+        return sum(1 for _ in iter_archived(table, user_id, date_from=date_from, date_to=date_to, **filters))
+    return sum(
+        group[-1]
+        for month, groups in _month_index(table, user_id).items()
+        if _in_range(month, date_from, date_to)
+        for group in groups
+        if _group_matches(table, group, date_from, date_to, filters)
+    )
+
+
+def iter_archived(
+    table: str,
+    user_id: int,
+    *,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    **filters: Any,
+) -> Iterator[SimpleNamespace]:
+    """
+    Archived rows of ``table`` for the user within the date range, matching
+    ``filters`` (column -> value), newest first like the list endpoints.
+    Months are decoded lazily, so a consumer that stops early only reads the
+    newest months it reached.
+    """
+    for month in sorted(_month_index(table, user_id), reverse=True):
+        if not _in_range(month, date_from, date_to):
+            continue
+        path = _month_path(table, user_id, month)
+        # Files are stored in (date, id) order
+        for row in reversed(_load_month(path, _mtime(path))):
+            if date_from is not None and row["date"] < date_from:
+                continue
+            if date_to is not None and row["date"] > date_to:
+                continue
+            if any(value is not None and row[name] != getattr(value, "value", value) for name, value in filters.items()):
+                continue
+            yield SimpleNamespace(**row)
+
+
+def archive_cold_records(session: Session, *, before: date) -> dict[str, int]:
+    """
+    Move every whole month before ``before`` out of the record tables into
+    archive files, one user and month at a time. Each file is written before
+    its rows are deleted and the delete is committed right after, so a failure
+    leaves the rows in the database. Returns rows archived per table.
+    """
+    before = before.replace(day=1)
+    # Recorded before any row is deleted, so rebuilds never drop archived days
+    _raise_boundary(before)
+    archived = {}
+    for table, model in ARCHIVED_MODELS.items():
+        archived[table] = 0
+        for user_id, month in record_repository.list_record_months_before(session, model, before):
+            rows = record_repository.list_records_in_range(session, model, user_id, month, _next_month(month))
+            _write_month(table, user_id, month, [
+                {c.name: getattr(row, c.name) for c in model.__table__.columns} for row in rows
+            ])
+            # Delete exactly what was written; rows added meanwhile wait for the next run
+            archived[table] += record_repository.delete_records_by_ids(
+                session, model, [row.id for row in rows], date_from=month, date_before=_next_month(month)
+            )
+            session.commit()
+    return archived
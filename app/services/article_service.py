@@ -1,91 +1,315 @@
 from __future__ import annotations
 
-from typing import List
-from sqlalchemy.orm import Session
+import base64
+from datetime import datetime
 
+import orjson
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.models.article import Article, ArticleTag, Tag
 from app.repositories import article_repository
-from app.schemas.articles import ArticleRead, TagRead
+from app.schemas.articles import ArticleFacets, ArticleRead, ArticleSummary, TagRead
 from app.schemas.common import Pagination
-from app.services.cache import cache_get, cache_set
+from app.services.cache import (
+    cache_add, cache_get, cache_set, cache_delete, cache_hgetall, cache_hmget, cache_hset_all,
+    cache_ttl, cache_zincrby, cache_ztop, cache_zdecay,
+)
+
+
+FACETS_CACHE_KEY = "articles:facets"
+# Refreshed every 15 minutes by celery beat and dropped once a write changes the counts;
+# the TTL is well above the beat interval so readers only find it expired if beat stops.
+FACETS_TTL_SECONDS = 6 * 3600
+# Held by the one request rebuilding a missing store; the others count directly meanwhile
+FACETS_REBUILD_LOCK_KEY = "articles:facets:rebuilding"
+FACETS_REBUILD_LOCK_SECONDS = 30
+_PENDING_FACETS_INVALIDATION = "invalidate_article_facets"
+_ANY = "*"
+
+LIST_CACHE_TTL_SECONDS = 60
+DETAIL_CACHE_TTL_SECONDS = 300
+MISSING_DETAIL_TTL_SECONDS = 60
+_PENDING_INVALIDATIONS = "invalidate_article_ids"
+# Sorted set of listing params (as canonical JSON) scored by decayed request frequency;
+# only plain listings (no search text, no cursor) are tracked
+HOT_LISTS_KEY = "articles:hot"
+HOT_LISTS_MAX = 1000
+
+VIEW_FULL = "full"
+VIEW_SUMMARY = "summary"
+_VIEW_MODELS = {VIEW_FULL: ArticleRead, VIEW_SUMMARY: ArticleSummary}
 
 
 def list_articles(
     session: Session,
     *,
     category: str | None,
-    tag: str | None,
+    tag: str | list[str] | None,
     q: str | None,
     limit: int,
     offset: int,
-) -> List[ArticleRead] | Pagination[ArticleRead]:
-    cache_key = f"articles:list:{category}:{tag}:{q}:{limit}:{offset}"
-    cached = cache_get(cache_key)
-    if cached is not None:
-        # cached payload is the pagination shape
-        return Pagination[ArticleRead](**cached)  # type: ignore[arg-type]
+    tag_mode: str = article_repository.TAG_MODE_ANY,
+    view: str = VIEW_FULL,
+    cursor: str | None = None,
+    refresh: bool = False,
+) -> Pagination[ArticleRead] | Pagination[ArticleSummary]:
+    """
+    List articles through the cache. ``refresh`` skips the cache read (used by warming).
 
-    articles = article_repository.list_articles(
+    With ``cursor`` (taken from a previous page's ``next_cursor``) the page continues after
+    that article using keyset paging and ``offset`` is ignored. Raises ValueError for a bad cursor.
+    """
+    model = _VIEW_MODELS[view]
+    after = decode_cursor(cursor) if cursor else None
+    if after is not None:
+        offset = 0
+    tags = article_repository.normalize_tags(tag)
+    if len(tags) <= 1:
+        tag_mode = article_repository.TAG_MODE_ANY  # both modes are the same query
+    params = {
+        "category": category, "tag": tags, "tag_mode": tag_mode, "q": q,
+        "limit": limit, "offset": offset, "view": view, "cursor": cursor,
+    }
+    cache_key = list_cache_key(params)
+    if not refresh:
+        # Searches and cursor pages are mostly one-offs; tracking them would fill the hot set with noise
+        if q is None and cursor is None:
+            cache_zincrby(HOT_LISTS_KEY, orjson.dumps(params, option=orjson.OPT_SORT_KEYS).decode(), max_size=HOT_LISTS_MAX)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            # cached payload is the pagination shape
+            return Pagination[model](**cached)  # type: ignore[arg-type, valid-type]
+
+    list_fn = article_repository.list_article_summaries if view == VIEW_SUMMARY else article_repository.list_articles
+    articles = list_fn(
         session,
         category=category,
-        tag=tag,
+        tag=tags,
+        tag_mode=tag_mode,
         q=q,
-        limit=limit,
+        limit=limit + 1,
         offset=offset,
+        after=after,
     )
-    results: list[ArticleRead] = []
+    has_more = len(articles) > limit
+    articles = articles[:limit]
+    results: list[ArticleRead | ArticleSummary] = []
     if articles:
         article_ids = [a.id for a in articles]
         tag_rows = article_repository.list_tags_for_articles(session, article_ids)
         map_tags: dict[int, list[TagRead]] = {}
         for article_id, tag_obj in tag_rows:
             map_tags.setdefault(article_id, []).append(TagRead.model_validate(tag_obj))
+        columns = [name for name in model.model_fields if name != "tags"]
         for a in articles:
-            results.append(
-                ArticleRead(
-                    id=a.id,
-                    title=a.title,
-                    content=a.content,
-                    image_url=a.image_url,
-                    category=a.category,
-                    published_at=a.published_at,
-                    tags=map_tags.get(a.id, []),
-                )
-            )
-
-    total = article_repository.count_articles(session, category=category, tag=tag, q=q)
+            results.append(model(**{name: getattr(a, name) for name in columns}, tags=map_tags.get(a.id, [])))
+
+    if q is None and len(tags) <= 1:
+        total = get_facet_count(session, category=category, tag=tags[0] if tags else None)
+    else:
+        total = article_repository.count_articles(session, category=category, tag=tags, tag_mode=tag_mode, q=q)
     # Build prev/next as simple placeholders; can compute properly if needed
     prev_offset = max(0, (offset or 0) - (limit or 0 or 10))
     next_offset = (offset or 0) + (limit or 0 or 10)
     previous = ""
     next_ = ""
-    if offset and offset > 0:
-        previous = f"?limit={limit or 10}&offset={prev_offset}"
-    if next_offset < total:
-        next_ = f"?limit={limit or 10}&offset={next_offset}"
+    next_cursor = encode_cursor(results[-1].published_at, results[-1].id) if has_more else None
+    if after is not None:
+        if next_cursor:
+            next_ = f"?limit={limit}&cursor={next_cursor}"
+    else:
+        if offset and offset > 0:
+            previous = f"?limit={limit or 10}&offset={prev_offset}"
+        if next_offset < total:
+            next_ = f"?limit={limit or 10}&offset={next_offset}"
 
     payload = {
         "data": [r.model_dump() for r in results],
         "previous": previous,
         "next": next_,
         "count": total,
+        "next_cursor": next_cursor,
     }
-    cache_set(cache_key, payload, ttl_seconds=60)
-    return Pagination[ArticleRead](**payload)  # type: ignore[arg-type]
+    cache_set(cache_key, payload, ttl_seconds=LIST_CACHE_TTL_SECONDS)
+    return Pagination[model](**payload)  # type: ignore[arg-type, valid-type]
+
+
+def list_cache_key(params: dict) -> str:
+    tags = params["tag"]
+    tag_key = ",".join(tags) if tags else None
+    if len(tags) > 1:
+        tag_key = f"{params['tag_mode']}:{tag_key}"
+    # cursor pages are keyed by position rather than offset, so they are reused by every client
+    page_key = f"c{params['cursor']}" if params.get("cursor") else params["offset"]
+    return f"articles:list:{params['view']}:{params['category']}:{tag_key}:{params['q']}:{params['limit']}:{page_key}"
+
+
+def encode_cursor(published_at: datetime | None, article_id: int) -> str:
+    raw = orjson.dumps([published_at.isoformat() if published_at else None, article_id])
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime | None, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        published_at, article_id = orjson.loads(raw)
+        return (datetime.fromisoformat(published_at) if published_at else None, int(article_id))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def hot_list_params(top_k: int, *, decay: float | None = None) -> list[dict]:
+    """Most requested listing params, hottest first; optionally decay all scores afterwards."""
+    members = cache_ztop(HOT_LISTS_KEY, top_k)
+    if decay is not None:
+        cache_zdecay(HOT_LISTS_KEY, decay, HOT_LISTS_MAX)
+    return [orjson.loads(m) for m in members]
+
+
+def list_cache_expires_within(params: dict, seconds: int) -> bool:
+    return cache_ttl(list_cache_key(params)) < seconds
 
 
 def get_article(session: Session, article_id: int) -> ArticleRead | None:
-    a = article_repository.get_article(session, article_id)
+    cache_key = _detail_cache_key(article_id)
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return None if cached.get("missing") else ArticleRead(**cached)
+
+    a = article_repository.get_article_with_tags(session, article_id)
     if not a:
+        # negative entry so repeated lookups of unknown ids don't reach the database
+        cache_set(cache_key, {"missing": True}, ttl_seconds=MISSING_DETAIL_TTL_SECONDS)
         return None
-    tags = [TagRead.model_validate(t) for t in article_repository.list_tags_by_article(session, article_id)]
-    return ArticleRead(
+    result = ArticleRead(
         id=a.id,
         title=a.title,
         content=a.content,
         image_url=a.image_url,
         category=a.category,
         published_at=a.published_at,
-        tags=tags,
+        tags=[TagRead.model_validate(t) for t in a.tags],
     )
+    cache_set(cache_key, result.model_dump(), ttl_seconds=DETAIL_CACHE_TTL_SECONDS)
+    return result
+
+
+def invalidate_article_cache(*article_ids: int) -> None:
+    cache_delete(*[_detail_cache_key(article_id) for article_id in article_ids])
+
+
+def _detail_cache_key(article_id: int) -> str:
+    return f"articles:detail:{article_id}"
+
+
+# Drop detail entries for articles written through the ORM. Ids are collected at flush
+# time and invalidated after commit, so a concurrent read can't re-cache the old row.
+@event.listens_for(Article, "after_insert")
+@event.listens_for(Article, "after_update")
+@event.listens_for(Article, "after_delete")
+def _track_article_write(mapper, connection, target: Article) -> None:
+    object_session(target).info.setdefault(_PENDING_INVALIDATIONS, set()).add(target.id)
+
+
+@event.listens_for(ArticleTag, "after_insert")
+@event.listens_for(ArticleTag, "after_delete")
+def _track_article_tag_write(mapper, connection, target: ArticleTag) -> None:
+    object_session(target).info.setdefault(_PENDING_INVALIDATIONS, set()).add(target.article_id)
+
+
+# Writes that change facet counts drop the whole facets hash after commit; the next
+# read rebuilds it. A field can't be dropped alone: a missing field means a count of 0.
+@event.listens_for(Article, "after_insert")
+@event.listens_for(Article, "after_delete")
+@event.listens_for(ArticleTag, "after_insert")
+@event.listens_for(ArticleTag, "after_delete")
+@event.listens_for(Tag, "after_delete")
+def _track_facets_write(mapper, connection, target) -> None:
+    object_session(target).info[_PENDING_FACETS_INVALIDATION] = True
+
+
+@event.listens_for(Article, "after_update")
+@event.listens_for(Tag, "after_update")
+def _track_facets_rename(mapper, connection, target) -> None:
+    attribute = "category" if isinstance(target, Article) else "name"
+    if inspect(target).attrs[attribute].history.has_changes():
+        object_session(target).info[_PENDING_FACETS_INVALIDATION] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    article_ids = session.info.pop(_PENDING_INVALIDATIONS, None)
+    if article_ids:
+        invalidate_article_cache(*article_ids)
+    if session.info.pop(_PENDING_FACETS_INVALIDATION, False):
+        cache_delete(FACETS_CACHE_KEY)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS, None)
+    session.info.pop(_PENDING_FACETS_INVALIDATION, None)
+
+
+def _facet_field(category: str | None, tag: str | None) -> str:
+    return f"{category or _ANY}|{tag or _ANY}"
+
+
+def _count_facets(session: Session) -> dict[str, int]:
+    """Article counts per category, tag and category x tag, keyed by facet field."""
+    counts: dict[str, int] = {_facet_field(None, None): 0}
+    for category, n in article_repository.count_articles_by_category(session):
+        category = getattr(category, "value", category)
+        counts[_facet_field(category, None)] = n
+        counts[_facet_field(None, None)] += n
+    for category, tag_name, n in article_repository.count_articles_by_category_and_tag(session):
+        category = getattr(category, "value", category)
+        counts[_facet_field(category, tag_name)] = n
+        # an article has exactly one category, so per-category counts sum to the tag total
+        counts[_facet_field(None, tag_name)] = counts.get(_facet_field(None, tag_name), 0) + n
+    return counts
+
+
+def refresh_article_facets(session: Session) -> dict[str, int]:
+    """Recompute the facet counts into a Redis hash."""
+    counts = _count_facets(session)
+    cache_hset_all(FACETS_CACHE_KEY, counts, ttl_seconds=FACETS_TTL_SECONDS)
+    return counts
+
+
+def _rebuild_facets_once(session: Session) -> dict[str, int] | None:
+    # Only one request rebuilds a missing store; the others get None and count themselves
+    if not cache_add(FACETS_REBUILD_LOCK_KEY, 1, ttl_seconds=FACETS_REBUILD_LOCK_SECONDS):
+        return None
+    try:
+        return refresh_article_facets(session)
+    finally:
+        cache_delete(FACETS_REBUILD_LOCK_KEY)
+
+
+def get_facet_count(session: Session, *, category: str | None, tag: str | None) -> int:
+    field = _facet_field(category, tag)
+    value, total = cache_hmget(FACETS_CACHE_KEY, [field, _facet_field(None, None)])
+    if total is None:
+        # store missing or expired: rebuild it, or count just this field while another request does
+        counts = _rebuild_facets_once(session)
+        if counts is None:
+            return article_repository.count_articles(session, category=category, tag=tag, q=None)
+        return counts.get(field, 0)
+    # the overall total is always stored, so a missing field means no matching articles
+    return value or 0
 
 
+def get_article_facets(session: Session) -> ArticleFacets:
+    counts = cache_hgetall(FACETS_CACHE_KEY) or _rebuild_facets_once(session) or _count_facets(session)
+    facets = ArticleFacets(total=counts.get(_facet_field(None, None), 0))
+    for field, n in counts.items():
+        category, tag_name = field.split("|", 1)
+        if category == _ANY and tag_name != _ANY:
+            facets.tags[tag_name] = n
+        elif category != _ANY and tag_name == _ANY:
+            facets.categories[category] = n
+        elif category != _ANY:
+            facets.category_tags.setdefault(category, {})[tag_name] = n
+    return facets
@@ -10,6 +10,7 @@ from app.config import settings
 
 
 _redis_client: Redis | None = None
+_redis_binary_client: Redis | None = None
 
 
 def get_redis_client() -> Redis:
@@ -19,11 +20,25 @@ def get_redis_client() -> Redis:
     return _redis_client
 
 
+def get_redis_binary_client() -> Redis:
+    """Client returning raw bytes, for values that are not text (e.g. bitmaps)."""
+    global _redis_binary_client
+    if _redis_binary_client is None:
+        _redis_binary_client = Redis.from_url(settings.redis_url, decode_responses=False)
+    return _redis_binary_client
+
+
 def cache_set(key: str, value: Any, ttl_seconds: int = 60) -> None:
     data = orjson.dumps(value).decode()
     get_redis_client().setex(key, ttl_seconds, data)
 
 
+def cache_add(key: str, value: Any, ttl_seconds: int = 60) -> bool:
+    """Set ``key`` only if it does not exist yet (SET NX); returns whether it was set."""
+    data = orjson.dumps(value).decode()
+    return bool(get_redis_client().set(key, data, ex=ttl_seconds, nx=True))
+
+
 def cache_get(key: str) -> Any | None:
     raw = get_redis_client().get(key)
     if raw is None:
@@ -31,3 +46,69 @@ def cache_get(key: str) -> Any | None:
     return json.loads(raw)
 
 
+def cache_delete(*keys: str) -> None:
+    if keys:
+        get_redis_client().delete(*keys)
+
+
+def cache_hset_all(key: str, mapping: dict[str, Any], ttl_seconds: int = 60) -> None:
+    """Replace the whole hash at ``key`` atomically."""
+    pipe = get_redis_client().pipeline()
+    pipe.delete(key)
+    if mapping:
+        pipe.hset(key, mapping={field: orjson.dumps(value).decode() for field, value in mapping.items()})
+    pipe.expire(key, ttl_seconds)
+    pipe.execute()
+
+
+def cache_hset_all_many(hashes: dict[str, dict[str, Any]], ttl_seconds: int = 60) -> None:
+    """cache_hset_all for many keys in one MULTI/EXEC round trip."""
+    pipe = get_redis_client().pipeline()
+    for key, mapping in hashes.items():
+        pipe.delete(key)
+        if mapping:
+            pipe.hset(key, mapping={field: orjson.dumps(value).decode() for field, value in mapping.items()})
+        pipe.expire(key, ttl_seconds)
+    pipe.execute()
+
+
+def cache_hget(key: str, field: str) -> Any | None:
+    raw = get_redis_client().hget(key, field)
+    return None if raw is None else json.loads(raw)
+
+
+def cache_hmget(key: str, fields: list[str]) -> list[Any | None]:
+    raws = get_redis_client().hmget(key, fields)
+    return [None if raw is None else json.loads(raw) for raw in raws]
+
+
+def cache_hgetall(key: str) -> dict[str, Any]:
+    return {field: json.loads(raw) for field, raw in get_redis_client().hgetall(key).items()}
+
+
+def cache_ttl(key: str) -> int:
+    """Remaining TTL in seconds; negative when the key is missing or has no expiry."""
+    return get_redis_client().ttl(key)
+
+
+def cache_zincrby(key: str, member: str, amount: float = 1.0, *, max_size: int | None = None) -> None:
+    """ZINCRBY ``member``; with ``max_size``, also drop the lowest-scored members beyond it."""
+    if max_size is None:
+        get_redis_client().zincrby(key, amount, member)
+        return
+    pipe = get_redis_client().pipeline(transaction=False)
+    pipe.zincrby(key, amount, member)
+    pipe.zremrangebyrank(key, 0, -(max_size + 1))
+    pipe.execute()
+
+
+def cache_ztop(key: str, k: int) -> list[str]:
+    return get_redis_client().zrevrange(key, 0, k - 1)
+
+
+def cache_zdecay(key: str, factor: float, max_size: int) -> None:
+    """Multiply every score by ``factor`` and keep only the ``max_size`` highest members."""
+    pipe = get_redis_client().pipeline()
+    pipe.zunionstore(key, {key: factor})
+    pipe.zremrangebyrank(key, 0, -(max_size + 1))
+    pipe.execute()
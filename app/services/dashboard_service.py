@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.session import SessionLocal
+from app.repositories import record_repository
+from app.schemas.records import (
+    BodyRecordRead, MealRead, ExerciseRead, DiaryRead,
+    DashboardAchievementRate, RecordDashboard,
+)
+from app.services.stats_service import get_achievement_rate_summary
+
+
+# Shared across requests so a dashboard call never pays for thread start-up
+_executor = ThreadPoolExecutor(max_workers=settings.records_dashboard_workers, thread_name_prefix="dashboard")
+
+_LATEST = {
+    "body_records": (record_repository.list_body_records_by_user, BodyRecordRead),
+    "meals": (record_repository.list_meals_by_user, MealRead),
+    "exercises": (record_repository.list_exercises_by_user, ExerciseRead),
+    "diaries": (record_repository.list_diaries_by_user, DiaryRead),
+}
+
+
+def _in_own_session(fn: Callable[[Session], object]) -> object:
+    # SessionLocal is thread-scoped, so each pool thread checks out its own connection
+    session: Session = SessionLocal()
+    try:
+        return fn(session)
+    finally:
+        SessionLocal.remove()
+
+
+def _latest(list_fn, model: type[BaseModel], user_id: int, limit: int) -> list[BaseModel]:
+    # Serialize inside the worker, while the rows are still bound to its session
+    return _in_own_session(
+        lambda session: [model.model_validate(r) for r in list_fn(session, user_id, limit=limit, offset=0)]
+    )
+
+
+def get_dashboard(user_id: int, *, limit: int = 5, window_days: int = 30) -> RecordDashboard:
+    """
+    Latest ``limit`` records of each type plus the achievement rate. The five
+    reads run concurrently on separate connections, so the response takes as
+    long as the slowest one.
+    """
+    futures = {
+        name: _executor.submit(_latest, list_fn, model, user_id, limit)
+        for name, (list_fn, model) in _LATEST.items()
+    }
+    rate = _executor.submit(
+        _in_own_session, lambda session: get_achievement_rate_summary(session, user_id, window_days)
+    )
+    return RecordDashboard(
+        **{name: future.result() for name, future in futures.items()},
+        achievement_rate=DashboardAchievementRate(**rate.result()),
+    )
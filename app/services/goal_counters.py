@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from redis.exceptions import WatchError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.repositories import record_repository
+from app.services.cache import get_redis_client
+
+
+# Achievement-rate windows are at most a year; older per-day sets are never read
+MAX_WINDOW_DAYS = 365
+
+_ACTIVE_FIELD = "active_goals"
+
+# Counter changes made in a session, applied once it commits:
+# (user_id, goal_id, day, completed), or (user_id, None, None, delta) for active goals
+_PENDING_CHANGES = "goal_counters.pending"
+
+# Rebuilds retry when a write lands between their SQL read and their Redis write
+_REBUILD_ATTEMPTS = 5
+
+
+def _counters_key(user_id: int) -> str:
+    # Hash of per-user goal counters; its presence also marks the day sets as built
+    return f"user:{user_id}:goal_counters"
+
+
+def _completed_key(user_id: int, day: date) -> str:
+    # Ids of the user's goals with a completed progress row on ``day``
+    return f"user:{user_id}:completed_goals:{day.isoformat()}"
+
+
+def _writes_key(user_id: int) -> str:
+    # Bumped by every applied write; rebuilds WATCH it
+    return f"user:{user_id}:goal_counters:writes"
+
+
+def _span(today: date) -> tuple[date, date]:
+    # Days kept: the longest window back from today, and as far ahead for
+    # future-dated progress. Days beyond that are picked up by a later rebuild.
+    return today - timedelta(days=MAX_WINDOW_DAYS - 1), today + timedelta(days=MAX_WINDOW_DAYS)
+
+
+def _expire_at(day: date) -> datetime:
+    return datetime.combine(day + timedelta(days=MAX_WINDOW_DAYS + 1), time.min)
+
+
+def adjust_active_goals(session: Session, user_id: int, delta: int) -> None:
+    """
+    HINCRBY the user's active-goal count once ``session`` commits. Missing
+    counters are left alone and rebuilt from the database on the next read.
+    """
+    if delta:
+        session.info.setdefault(_PENDING_CHANGES, []).append((user_id, None, None, delta))
+
+
+def mark_goal_completed(session: Session, user_id: int, goal_id: int, day: date, completed: bool) -> None:
+    """Add ``goal_id`` to (or remove it from) the completed set of ``day`` once ``session`` commits."""
+    session.info.setdefault(_PENDING_CHANGES, []).append((user_id, goal_id, day, completed))
+
+
+def _apply_changes(changes: list[tuple]) -> None:
+    first, last = _span(date.today())
+    redis = get_redis_client()
+    by_user: dict[int, list[tuple]] = defaultdict(list)
+    for user_id, *change in changes:
+        by_user[user_id].append(change)
+    for user_id, user_changes in by_user.items():
+        built = redis.exists(_counters_key(user_id))
+        pipe = redis.pipeline()
+        pipe.incr(_writes_key(user_id))
+        pipe.expire(_writes_key(user_id), 24 * 3600)
+        for goal_id, day, value in user_changes if built else ():
+            if goal_id is None:
+                pipe.hincrby(_counters_key(user_id), _ACTIVE_FIELD, value)
+            elif not first <= day <= last:
+                continue
+            elif value:
+                pipe.sadd(_completed_key(user_id, day), goal_id)
+                pipe.expireat(_completed_key(user_id, day), _expire_at(day))
+            else:
+                pipe.srem(_completed_key(user_id, day), goal_id)
+        pipe.execute()
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session: Session) -> None:
+    changes = session.info.pop(_PENDING_CHANGES, None)
+    if changes:
+        _apply_changes(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_CHANGES, None)
+
+
+def rebuild_goal_counters(session: Session, user_id: int, *, today: date | None = None) -> int:
+    """
+    Rebuild the user's counters from goals and goal_progress in one MULTI/EXEC;
+    returns the number of completed (goal, day) pairs kept. The read is
+    retried when a committed write is applied to the counters meanwhile, so
+    the rebuild cannot overwrite it with older data.
+    """
+    first, last = _span(today or date.today())
+    with get_redis_client().pipeline() as pipe:
+        for _ in range(_REBUILD_ATTEMPTS - 1):
+            try:
+                return _rebuild(session, pipe, user_id, first, last, watch=True)
+            except WatchError:
+                pipe.reset()
+        # Still racing with writes: accept it, the nightly rebuild corrects the counters
+        return _rebuild(session, pipe, user_id, first, last, watch=False)
+
+
+def _rebuild(session: Session, pipe, user_id: int, first: date, last: date, *, watch: bool) -> int:
+    if watch:
+        pipe.watch(_writes_key(user_id))
+    active = record_repository.count_total_goals_by_user(session, user_id)
+    days: dict[date, set[int]] = defaultdict(set)
+    for day, goal_id in record_repository.list_completed_goal_days(session, user_id, date_from=first, date_to=last):
+        days[day].add(goal_id)
+
+    pipe.multi()
+    pipe.delete(*(_completed_key(user_id, first + timedelta(days=i)) for i in range((last - first).days + 1)))
+    for day, goal_ids in days.items():
+        key = _completed_key(user_id, day)
+        pipe.sadd(key, *goal_ids)
+        pipe.expireat(key, _expire_at(day))
+    pipe.hset(_counters_key(user_id), mapping={_ACTIVE_FIELD: active})
+    pipe.execute()
+    return sum(len(goal_ids) for goal_ids in days.values())
+
+
+def get_goal_counts(session: Session, user_id: int, window_days: int = 30, *, today: date | None = None) -> tuple[int, int]:
+    """
+    (goals completed within the last ``window_days`` days, active goals), the
+    same numbers as the COUNT queries, from the counters without touching goal_progress.
+    """
+    return get_goal_counts_for_windows(session, user_id, [window_days], today=today)[window_days]
+
+
+def get_goal_counts_for_windows(
+    session: Session, user_id: int, windows, *, today: date | None = None
+) -> dict[int, tuple[int, int]]:
+    """get_goal_counts for several windows in one pipelined round trip."""
+    windows = sorted(set(windows))
+    if not windows or not 1 <= windows[0] <= windows[-1] <= MAX_WINDOW_DAYS:
+        raise ValueError(f"window_days must be between 1 and {MAX_WINDOW_DAYS}")
+    today = today or date.today()
+    redis = get_redis_client()
+    if not redis.exists(_counters_key(user_id)):
+        rebuild_goal_counters(session, user_id, today=today)
+    pipe = redis.pipeline(transaction=False)
+    pipe.hget(_counters_key(user_id), _ACTIVE_FIELD)
+    for window_days in windows:
+        pipe.sunion([_completed_key(user_id, today - timedelta(days=i)) for i in range(window_days)])
+    active, *completed = pipe.execute()
+    return {window_days: (len(goal_ids), int(active or 0)) for window_days, goal_ids in zip(windows, completed)}
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.services.cache import cache_hget, cache_hset_all, get_redis_client
+
+
+# The windows stats_service computes together; only these are ranked, so the
+# number of sorted sets stays fixed
+LEADERBOARD_WINDOWS = (7, 30, 90, 365)
+
+# Histogram buckets of 10 points; the last one also holds 100%
+HISTOGRAM_EDGES = np.linspace(0.0, 100.0, 11)
+
+_HISTOGRAM_KEY = "achievement_rate:histogram"
+_HISTOGRAM_TTL_SECONDS = 2 * 24 * 3600
+
+
+def _leaderboard_key(window_days: int) -> str:
+    return f"achievement_rate:leaderboard:{window_days}"
+
+
+def _check_window(window_days: int) -> None:
+    if window_days not in LEADERBOARD_WINDOWS:
+        raise ValueError(f"window_days must be one of {', '.join(map(str, LEADERBOARD_WINDOWS))}")
+
+
+def record_rates(rates: dict[int, dict[int, float]]) -> None:
+    """ZADD ``{window_days: {user_id: rate}}`` into the leaderboards in one round trip."""
+    pipe = get_redis_client().pipeline(transaction=False)
+    for window_days, by_user in rates.items():
+        if window_days in LEADERBOARD_WINDOWS and by_user:
+            pipe.zadd(_leaderboard_key(window_days), {str(user_id): rate for user_id, rate in by_user.items()})
+    pipe.execute()
+
+
+def remove_users(user_ids) -> None:
+    """ZREM ``user_ids`` from every leaderboard, e.g. users left without active goals."""
+    members = [str(user_id) for user_id in user_ids]
+    if not members:
+        return
+    pipe = get_redis_client().pipeline(transaction=False)
+    for window_days in LEADERBOARD_WINDOWS:
+        pipe.zrem(_leaderboard_key(window_days), *members)
+    pipe.execute()
+
+
+def get_top(window_days: int, k: int = 10) -> list[dict]:
+    """Highest ``k`` rates; users with equal rates share a rank."""
+    _check_window(window_days)
+    entries = get_redis_client().zrevrange(_leaderboard_key(window_days), 0, k - 1, withscores=True)
+    top = []
+    for position, (member, score) in enumerate(entries):
+        rank = top[-1]["rank"] if top and score == top[-1]["achievement_rate"] else position + 1
+        top.append({"rank": rank, "user_id": int(member), "achievement_rate": score})
+    return top
+
+
+def get_rank(user_id: int, window_days: int) -> dict | None:
+    """
+    The user's rank (1 = best, ties share a rank) and the share of ranked users
+    at or above it, or None when the user has not been ranked yet.
+    """
+    _check_window(window_days)
+    key = _leaderboard_key(window_days)
+    redis = get_redis_client()
+    score = redis.zscore(key, str(user_id))
+    if score is None:
+        return None
+    pipe = redis.pipeline(transaction=False)
+    pipe.zcount(key, f"({score}", "+inf")
+    pipe.zcard(key)
+    above, total = pipe.execute()
+    return {
+        "user_id": user_id,
+        "window_days": window_days,
+        "achievement_rate": score,
+        "rank": above + 1,
+        "total_users": total,
+        "top_percent": round((above + 1) / total * 100.0, 2),
+    }
+
+
+def histogram_counts(rates) -> list[int]:
+    """Counts of ``rates`` per HISTOGRAM_EDGES bucket."""
+    counts, _ = np.histogram(np.asarray(rates, dtype=np.float64), bins=HISTOGRAM_EDGES)
+    return counts.tolist()
+
+
+def store_histograms(counts: dict[int, list[int]]) -> None:
+    """Save the batch job's per-window bucket counts, replacing the previous run's."""
+    computed_at = datetime.now(timezone.utc).isoformat()
+    cache_hset_all(_HISTOGRAM_KEY, {
+        str(window_days): {
+            "edges": HISTOGRAM_EDGES.tolist(),
+            "counts": window_counts,
+            "total_users": int(sum(window_counts)),
+            "computed_at": computed_at,
+        }
+        for window_days, window_counts in counts.items()
+    }, ttl_seconds=_HISTOGRAM_TTL_SECONDS)
+
+
+def get_histogram(window_days: int) -> dict | None:
+    _check_window(window_days)
+    return cache_hget(_HISTOGRAM_KEY, str(window_days))
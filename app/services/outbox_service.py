@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app.repositories import outbox_repository
+
+
+def enqueue_task(
+    session: Session,
+    task_name: str,
+    *args: Any,
+    countdown: float = 0,
+    dedupe_key: str | None = None,
+    **kwargs: Any,
+) -> bool:
+    """
+    Schedule ``task_name`` to be sent once ``session`` commits, and not
+    before ``countdown`` seconds from now. Nothing is sent if the transaction
+    rolls back, and the request never waits on the broker. With a
+    ``dedupe_key``, a still-pending task with that key absorbs this one
+    (returns False) and is put off until this one's due time.
+    """
+    return outbox_repository.add_outbox_task(
+        session, task_name=task_name, args=list(args), kwargs=kwargs, delay_seconds=countdown, dedupe_key=dedupe_key
+    )
+
+
+def relay_outbox(session: Session, *, batch_size: int = 500, lookahead_seconds: float = 0) -> int:
+    """
+    Send up to ``batch_size`` tasks due within ``lookahead_seconds`` to the
+    broker over one connection, each with a countdown to its due time, and
+    delete them; the caller commits. A crash before the commit sends them
+    again, so outbox tasks must be idempotent.
+    """
+    from app.celery_app import celery_app
+
+    rows = outbox_repository.claim_due_outbox_tasks(session, limit=batch_size, lookahead_seconds=lookahead_seconds)
+    if not rows:
+        return 0
+    with celery_app.producer_or_acquire() as producer:
+        for row, due_in in rows:
+            celery_app.send_task(
+                row.task_name, args=row.args, kwargs=row.kwargs, countdown=float(due_in), producer=producer
+            )
+    outbox_repository.delete_outbox_tasks(session, [(row.id, row.available_at) for row, _ in rows])
+    return len(rows)
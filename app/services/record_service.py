@@ -1,11 +1,28 @@
 from __future__ import annotations
 
+import heapq
+from datetime import date, timedelta
+from itertools import islice
+from operator import attrgetter
+from types import SimpleNamespace
 from typing import List, Optional
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.repositories import record_repository
 from app.schemas.common import Pagination
+from app.schemas.records import GoalRead, GoalStats
+from app.services import archive_service, goal_counters
+from app.services.activity_service import mark_activity
+from app.services.summary_service import invalidate_records_summary
+
+
+# Upper bound for one batch progress upsert (a year of daily entries)
+MAX_PROGRESS_BATCH = 366
+
+# Optional parts of the goals listing (?include=)
+GOAL_INCLUDES = ("latest_progress", "stats")
 
 
 class BaseRecordService:
@@ -19,10 +36,11 @@ class BaseRecordService:
         *,
         limit: int = 10,
         offset: int = 0,
+        columns=None,
         **filters
     ) -> Pagination:
         records = self.repository.list_records_by_user(
-            session, user_id, limit=limit, offset=offset, **filters
+            session, user_id, limit=limit, offset=offset, columns=columns, **filters
         )
         total = self.repository.count_records_by_user(session, user_id, **filters)
         
@@ -33,11 +51,65 @@ class BaseRecordService:
             next=f"?limit={limit}&offset={offset + limit}" if offset + limit < total else ""
         )
 
+    def daily_stats_delta(self, record) -> dict:
+        """Counters a record contributes to its day in the user_daily_stats rollup."""
+        return {}
+
+    # Table whose cold months may have been moved to archive files (archive_service)
+    archive_table: str | None = None
+
+    def _list_with_archive(
+        self, session: Session, user_id: int, list_fn, count_fn, *, limit: int, offset: int, columns, filters: dict
+    ) -> Pagination | None:
+        """
+        Page over hot rows and archived rows together when the requested range
+        reaches archived months; None when it does not, so the caller pages
+        over the table alone.
+        """
+        if self.archive_table is None:
+            return None
+        archived_total = archive_service.count_archived(self.archive_table, user_id, **filters)
+        if not archived_total:
+            return None
+        # Both inputs are newest first; rows before the page are merged past, not fetched by offset.
+        # Archive months are decoded lazily, only as far back as the page reaches.
+        hot = list_fn(session, user_id, limit=offset + limit, offset=0, columns=columns, **filters)
+        archived = archive_service.iter_archived(self.archive_table, user_id, **filters)
+        merged = heapq.merge(hot, archived, key=attrgetter("date", "id"), reverse=True)
+        records = list(islice(merged, offset, offset + limit))
+        total = count_fn(session, user_id, **filters) + archived_total
+        return Pagination(
+            data=records,
+            count=total,
+            previous=f"?limit={limit}&offset={max(0, offset - limit)}" if offset > 0 else "",
+            next=f"?limit={limit}&offset={offset + limit}" if offset + limit < total else ""
+        )
+
+    def _snapshot(self, record) -> tuple:
+        return record.date, self.daily_stats_delta(record)
+
+    def _track_write(self, session: Session, user_id: int, before: tuple | None = None, after: tuple | None = None) -> None:
+        """Move a record's rollup contribution from ``before`` to ``after`` (``_snapshot`` tuples)."""
+        changes: dict = {}
+        for snapshot, sign in ((before, -1), (after, 1)):
+            if snapshot is None:
+                continue
+            day, delta = snapshot
+            bucket = changes.setdefault(day, {})
+            for name, value in delta.items():
+                bucket[name] = bucket.get(name, 0) + sign * value
+        for day, deltas in changes.items():
+            deltas = {name: value for name, value in deltas.items() if value}
+            if deltas:
+                remaining = record_repository.apply_daily_stats_delta(session, user_id, day, deltas)
+                mark_activity(session, user_id, day, active=remaining > 0)
+        invalidate_records_summary(session, user_id)
+
     def create_record(self, session: Session, user_id: int, data: dict):
         return self.repository.create_record(session, user_id=user_id, data=data)
 
-    def get_record(self, session: Session, user_id: int, record_id: int):
-        return self.repository.get_record_by_id(session, user_id, record_id)
+    def get_record(self, session: Session, user_id: int, record_id: int, *, columns=None):
+        return self.repository.get_record_by_id(session, user_id, record_id, columns=columns)
 
     def update_record(self, session: Session, user_id: int, record_id: int, data: dict):
         record = self.repository.get_record_by_id(session, user_id, record_id)
@@ -64,10 +136,11 @@ class GoalService(BaseRecordService):
         *,
         limit: int = 10,
         offset: int = 0,
+        columns=None,
         **filters
     ) -> Pagination:
         records = record_repository.list_goals_by_user(
-            session, user_id, limit=limit, offset=offset, **filters
+            session, user_id, limit=limit, offset=offset, columns=columns, **filters
         )
         total = record_repository.count_goals_by_user(session, user_id, **filters)
         
@@ -78,23 +151,84 @@ class GoalService(BaseRecordService):
             next=f"?limit={limit}&offset={offset + limit}" if offset + limit < total else ""
         )
 
+    def list_records_with_progress(
+        self,
+        session: Session,
+        user_id: int,
+        *,
+        include: List[str],
+        limit: int = 10,
+        offset: int = 0,
+        columns=None,
+        stats_window_days: int = 30,
+        **filters
+    ) -> Pagination:
+        """
+        Goals with their latest progress row and/or completion stats over the
+        last ``stats_window_days`` days, from a single query. Each item carries
+        the goal's fields (``columns`` when given) plus the included parts.
+        Raises ValueError for unknown include names.
+        """
+        unknown = sorted(set(include) - set(GOAL_INCLUDES))
+        if unknown:
+            raise ValueError(f"Unknown include: {', '.join(unknown)}")
+        today = date.today()
+        rows = record_repository.list_goals_with_progress(
+            session, user_id, limit=limit, offset=offset, columns=columns,
+            latest="latest_progress" in include,
+            stats_from=today - timedelta(days=stats_window_days - 1) if "stats" in include else None,
+            stats_to=today,
+            **filters
+        )
+        goal_fields = columns or tuple(GoalRead.model_fields)
+        items = []
+        for goal, latest, logged, completed in rows:
+            item = {name: getattr(goal, name) for name in goal_fields}
+            if "latest_progress" in include:
+                item["latest_progress"] = latest
+            if "stats" in include:
+                item["stats"] = GoalStats(
+                    window_days=stats_window_days,
+                    logged_days=logged,
+                    completed_days=completed,
+                    completion_rate=round(completed / logged * 100.0, 2) if logged else 0.0,
+                )
+            items.append(SimpleNamespace(**item))
+        total = record_repository.count_goals_by_user(session, user_id, **filters)
+        return Pagination(
+            data=items,
+            count=total,
+            previous=f"?limit={limit}&offset={max(0, offset - limit)}" if offset > 0 else "",
+            next=f"?limit={limit}&offset={offset + limit}" if offset + limit < total else ""
+        )
+
     def create_record(self, session: Session, user_id: int, data: dict):
-        return record_repository.create_goal(session, user_id=user_id, data=data)
+        goal = record_repository.create_goal(session, user_id=user_id, data=data)
+        goal_counters.adjust_active_goals(session, user_id, int(goal.is_active))
+        return goal
 
-    def get_record(self, session: Session, user_id: int, record_id: int):
-        return record_repository.get_goal_by_id(session, user_id, record_id)
+    def get_record(self, session: Session, user_id: int, record_id: int, *, columns=None):
+        return record_repository.get_goal_by_id(session, user_id, record_id, columns=columns)
 
     def update_record(self, session: Session, user_id: int, record_id: int, data: dict):
         record = record_repository.get_goal_by_id(session, user_id, record_id)
         if not record:
             return None
-        return record_repository.update_goal(session, record, data)
+        was_active = record.is_active
+        record = record_repository.update_goal(session, record, data)
+        goal_counters.adjust_active_goals(session, user_id, int(record.is_active) - int(was_active))
+        return record
 
     def delete_record(self, session: Session, user_id: int, record_id: int) -> bool:
         record = record_repository.get_goal_by_id(session, user_id, record_id)
         if not record:
             return False
+        # Its progress goes with it (ON DELETE CASCADE), so drop it from the completed sets too
+        completed_days = record_repository.list_completed_goal_days(session, user_id, goal_id=record.id)
         record_repository.delete_goal(session, record)
+        goal_counters.adjust_active_goals(session, user_id, -int(record.is_active))
+        for day, goal_id in completed_days:
+            goal_counters.mark_goal_completed(session, user_id, goal_id, day, False)
         return True
 
 
@@ -109,10 +243,11 @@ class GoalProgressService(BaseRecordService):
         *,
         limit: int = 10,
         offset: int = 0,
+        columns=None,
         **filters
     ) -> Pagination:
         records = record_repository.list_goal_progress_by_goal(
-            session, goal_id, limit=limit, offset=offset, **filters
+            session, goal_id, limit=limit, offset=offset, columns=columns, **filters
         )
         total = record_repository.count_goal_progress_by_goal(session, goal_id, **filters)
         
@@ -123,30 +258,72 @@ class GoalProgressService(BaseRecordService):
             next=f"?limit={limit}&offset={offset + limit}" if offset + limit < total else ""
         )
 
-    def create_record(self, session: Session, goal_id: int, data: dict):
-        return record_repository.create_goal_progress(session, goal_id=goal_id, data=data)
+    def _track_completion(self, session: Session, goal_id: int, day: date, completed: bool) -> None:
+        user_id = record_repository.get_goal_owner(session, goal_id)
+        if user_id is not None:
+            goal_counters.mark_goal_completed(session, user_id, goal_id, day, completed)
 
-    def get_record(self, session: Session, goal_id: int, record_id: int):
-        return record_repository.get_goal_progress_by_id(session, goal_id, record_id)
+    def create_record(self, session: Session, goal_id: int, data: dict):
+        progress = record_repository.create_goal_progress(session, goal_id=goal_id, data=data)
+        self._track_completion(session, goal_id, progress.date, progress.is_completed)
+        return progress
+
+    def upsert_records(self, session: Session, goal_id: int, items: List[dict]) -> tuple[list, bool]:
+        """
+        Set the progress of each item's date, creating or overwriting the row.
+        Returns the rows ordered by date and whether anything actually changed,
+        so an identical resend writes nothing. Raises ValueError for oversized batches.
+        """
+        if len(items) > MAX_PROGRESS_BATCH:
+            raise ValueError(f"At most {MAX_PROGRESS_BATCH} progress entries per request")
+        # ON CONFLICT cannot touch the same row twice in one statement; the last entry per date wins
+        by_date = {item["date"]: item for item in items}
+        if not by_date:
+            return [], False
+        changed = record_repository.upsert_goal_progress(session, goal_id, list(by_date.values()))
+        for row in changed:
+            self._track_completion(session, goal_id, row.date, row.is_completed)
+        if len(changed) == len(by_date):
+            return sorted(changed, key=lambda row: row.date), True
+        return record_repository.list_goal_progress_by_dates(session, goal_id, by_date), bool(changed)
+
+    def get_record(self, session: Session, goal_id: int, record_id: int, *, columns=None):
+        return record_repository.get_goal_progress_by_id(session, goal_id, record_id, columns=columns)
 
     def update_record(self, session: Session, goal_id: int, record_id: int, data: dict):
+        """Raises ValueError when moving the row onto a date that already has progress."""
         record = record_repository.get_goal_progress_by_id(session, goal_id, record_id)
         if not record:
             return None
-        return record_repository.update_goal_progress(session, record, data)
+        old_date = record.date
+        try:
+            with session.begin_nested():
+                record = record_repository.update_goal_progress(session, record, data)
+        except IntegrityError:
+            raise ValueError("Progress already exists for that date")
+        if record.date != old_date:
+            self._track_completion(session, goal_id, old_date, False)
+        self._track_completion(session, goal_id, record.date, record.is_completed)
+        return record
 
     def delete_record(self, session: Session, goal_id: int, record_id: int) -> bool:
         record = record_repository.get_goal_progress_by_id(session, goal_id, record_id)
         if not record:
             return False
         record_repository.delete_goal_progress(session, record)
+        self._track_completion(session, goal_id, record.date, False)
         return True
 
 
 class BodyRecordService(BaseRecordService):
+    archive_table = "body_records"
+
     def __init__(self):
         super().__init__(record_repository)
 
+    def daily_stats_delta(self, record) -> dict:
+        return {"body_record_count": 1, "weight_sum": record.weight}
+
     def list_records(
         self,
         session: Session,
@@ -154,10 +331,17 @@ class BodyRecordService(BaseRecordService):
         *,
         limit: int = 10,
         offset: int = 0,
+        columns=None,
         **filters
     ) -> Pagination:
+        merged = self._list_with_archive(
+            session, user_id, record_repository.list_body_records_by_user, record_repository.count_body_records_by_user,
+            limit=limit, offset=offset, columns=columns, filters=filters,
+        )
+        if merged is not None:
+            return merged
         records = record_repository.list_body_records_by_user(
-            session, user_id, limit=limit, offset=offset, **filters
+            session, user_id, limit=limit, offset=offset, columns=columns, **filters
         )
         total = record_repository.count_body_records_by_user(session, user_id, **filters)
         
@@ -169,29 +353,41 @@ class BodyRecordService(BaseRecordService):
         )
 
     def create_record(self, session: Session, user_id: int, data: dict):
-        return record_repository.create_body_record(session, user_id=user_id, data=data)
+        record = record_repository.create_body_record(session, user_id=user_id, data=data)
+        self._track_write(session, user_id, after=self._snapshot(record))
+        return record
 
-    def get_record(self, session: Session, user_id: int, record_id: int):
-        return record_repository.get_body_record_by_id(session, user_id, record_id)
+    def get_record(self, session: Session, user_id: int, record_id: int, *, columns=None):
+        return record_repository.get_body_record_by_id(session, user_id, record_id, columns=columns)
 
     def update_record(self, session: Session, user_id: int, record_id: int, data: dict):
         record = record_repository.get_body_record_by_id(session, user_id, record_id)
         if not record:
             return None
-        return record_repository.update_body_record(session, record, data)
+        before = self._snapshot(record)
+        record = record_repository.update_body_record(session, record, data)
+        self._track_write(session, user_id, before=before, after=self._snapshot(record))
+        return record
 
     def delete_record(self, session: Session, user_id: int, record_id: int) -> bool:
         record = record_repository.get_body_record_by_id(session, user_id, record_id)
         if not record:
             return False
+        before = self._snapshot(record)
         record_repository.delete_body_record(session, record)
+        self._track_write(session, user_id, before=before)
         return True
 
 
 class MealService(BaseRecordService):
+    archive_table = "meals"
+
     def __init__(self):
         super().__init__(record_repository)
 
+    def daily_stats_delta(self, record) -> dict:
+        return {"meal_count": 1, "meal_calories": record.calories or 0}
+
     def list_records(
         self,
         session: Session,
@@ -199,10 +395,17 @@ class MealService(BaseRecordService):
         *,
         limit: int = 10,
         offset: int = 0,
+        columns=None,
         **filters
     ) -> Pagination:
+        merged = self._list_with_archive(
+            session, user_id, record_repository.list_meals_by_user, record_repository.count_meals_by_user,
+            limit=limit, offset=offset, columns=columns, filters=filters,
+        )
+        if merged is not None:
+            return merged
         records = record_repository.list_meals_by_user(
-            session, user_id, limit=limit, offset=offset, **filters
+            session, user_id, limit=limit, offset=offset, columns=columns, **filters
         )
         total = record_repository.count_meals_by_user(session, user_id, **filters)
         
@@ -214,29 +417,45 @@ class MealService(BaseRecordService):
         )
 
     def create_record(self, session: Session, user_id: int, data: dict):
-        return record_repository.create_meal(session, user_id=user_id, data=data)
+        record = record_repository.create_meal(session, user_id=user_id, data=data)
+        self._track_write(session, user_id, after=self._snapshot(record))
+        return record
 
-    def get_record(self, session: Session, user_id: int, record_id: int):
-        return record_repository.get_meal_by_id(session, user_id, record_id)
+    def get_record(self, session: Session, user_id: int, record_id: int, *, columns=None):
+        return record_repository.get_meal_by_id(session, user_id, record_id, columns=columns)
 
     def update_record(self, session: Session, user_id: int, record_id: int, data: dict):
         record = record_repository.get_meal_by_id(session, user_id, record_id)
         if not record:
             return None
-        return record_repository.update_meal(session, record, data)
+        before = self._snapshot(record)
+        record = record_repository.update_meal(session, record, data)
+        self._track_write(session, user_id, before=before, after=self._snapshot(record))
+        return record
 
     def delete_record(self, session: Session, user_id: int, record_id: int) -> bool:
         record = record_repository.get_meal_by_id(session, user_id, record_id)
         if not record:
             return False
+        before = self._snapshot(record)
         record_repository.delete_meal(session, record)
+        self._track_write(session, user_id, before=before)
         return True
 
 
 class ExerciseService(BaseRecordService):
+    archive_table = "exercises"
+
     def __init__(self):
         super().__init__(record_repository)
 
+    def daily_stats_delta(self, record) -> dict:
+        return {
+            "exercise_count": 1,
+            "exercise_minutes": record.duration_min or 0,
+            "exercise_calories": record.calories or 0,
+        }
+
     def list_records(
         self,
         session: Session,
@@ -244,10 +463,17 @@ class ExerciseService(BaseRecordService):
         *,
         limit: int = 10,
         offset: int = 0,
+        columns=None,
         **filters
     ) -> Pagination:
+        merged = self._list_with_archive(
+            session, user_id, record_repository.list_exercises_by_user, record_repository.count_exercises_by_user,
+            limit=limit, offset=offset, columns=columns, filters=filters,
+        )
+        if merged is not None:
+            return merged
         records = record_repository.list_exercises_by_user(
-            session, user_id, limit=limit, offset=offset, **filters
+            session, user_id, limit=limit, offset=offset, columns=columns, **filters
         )
         total = record_repository.count_exercises_by_user(session, user_id, **filters)
         
@@ -259,29 +485,41 @@ class ExerciseService(BaseRecordService):
         )
 
     def create_record(self, session: Session, user_id: int, data: dict):
-        return record_repository.create_exercise(session, user_id=user_id, data=data)
+        record = record_repository.create_exercise(session, user_id=user_id, data=data)
+        self._track_write(session, user_id, after=self._snapshot(record))
+        return record
 
-    def get_record(self, session: Session, user_id: int, record_id: int):
-        return record_repository.get_exercise_by_id(session, user_id, record_id)
+    def get_record(self, session: Session, user_id: int, record_id: int, *, columns=None):
+        return record_repository.get_exercise_by_id(session, user_id, record_id, columns=columns)
 
     def update_record(self, session: Session, user_id: int, record_id: int, data: dict):
         record = record_repository.get_exercise_by_id(session, user_id, record_id)
         if not record:
             return None
-        return record_repository.update_exercise(session, record, data)
+        before = self._snapshot(record)
+        record = record_repository.update_exercise(session, record, data)
+        self._track_write(session, user_id, before=before, after=self._snapshot(record))
+        return record
 
     def delete_record(self, session: Session, user_id: int, record_id: int) -> bool:
         record = record_repository.get_exercise_by_id(session, user_id, record_id)
         if not record:
             return False
+        before = self._snapshot(record)
         record_repository.delete_exercise(session, record)
+        self._track_write(session, user_id, before=before)
         return True
 
 
 class DiaryService(BaseRecordService):
+    archive_table = "diaries"
+
     def __init__(self):
         super().__init__(record_repository)
 
+    def daily_stats_delta(self, record) -> dict:
+        return {"diary_count": 1}
+
     def list_records(
         self,
         session: Session,
@@ -289,10 +527,17 @@ class DiaryService(BaseRecordService):
         *,
         limit: int = 10,
         offset: int = 0,
+        columns=None,
         **filters
     ) -> Pagination:
+        merged = self._list_with_archive(
+            session, user_id, record_repository.list_diaries_by_user, record_repository.count_diaries_by_user,
+            limit=limit, offset=offset, columns=columns, filters=filters,
+        )
+        if merged is not None:
+            return merged
         records = record_repository.list_diaries_by_user(
-            session, user_id, limit=limit, offset=offset, **filters
+            session, user_id, limit=limit, offset=offset, columns=columns, **filters
         )
         total = record_repository.count_diaries_by_user(session, user_id, **filters)
         
@@ -304,22 +549,29 @@ class DiaryService(BaseRecordService):
         )
 
     def create_record(self, session: Session, user_id: int, data: dict):
-        return record_repository.create_diary(session, user_id=user_id, data=data)
+        record = record_repository.create_diary(session, user_id=user_id, data=data)
+        self._track_write(session, user_id, after=self._snapshot(record))
+        return record
 
-    def get_record(self, session: Session, user_id: int, record_id: int):
-        return record_repository.get_diary_by_id(session, user_id, record_id)
+    def get_record(self, session: Session, user_id: int, record_id: int, *, columns=None):
+        return record_repository.get_diary_by_id(session, user_id, record_id, columns=columns)
 
     def update_record(self, session: Session, user_id: int, record_id: int, data: dict):
         record = record_repository.get_diary_by_id(session, user_id, record_id)
         if not record:
             return None
-        return record_repository.update_diary(session, record, data)
+        before = self._snapshot(record)
+        record = record_repository.update_diary(session, record, data)
+        self._track_write(session, user_id, before=before, after=self._snapshot(record))
+        return record
 
     def delete_record(self, session: Session, user_id: int, record_id: int) -> bool:
         record = record_repository.get_diary_by_id(session, user_id, record_id)
         if not record:
             return False
+        before = self._snapshot(record)
         record_repository.delete_diary(session, record)
+        self._track_write(session, user_id, before=before)
         return True
 
 
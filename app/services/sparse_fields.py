@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict, create_model
+
+from app.schemas.common import Pagination
+
+
+def parse_fields(fields: str | None, model: type[BaseModel]) -> tuple[str, ...] | None:
+    """
+    Turn a ``fields=a,b`` query value into the ordered subset of ``model``'s fields.
+    ``id`` is always included. Raises ValueError for unknown names.
+    """
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = sorted(requested - model.model_fields.keys())
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    requested.add("id")
+    # Declaration order, so equal sets share one cached model and one SELECT shape
+    return tuple(name for name in model.model_fields if name in requested)
+
+
+@lru_cache(maxsize=256)
+def slim_model(model: type[BaseModel], fields: tuple[str, ...]) -> type[BaseModel]:
+    """Response model with only ``fields`` of ``model``, built once per field set."""
+    return create_model(
+        f"{model.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        # Resolve string annotations (e.g. nested Optional[...]) in the schema's module
+        __module__=model.__module__,
+        **{name: (model.model_fields[name].annotation, model.model_fields[name]) for name in fields},
+    )
+
+
+def sparse_response(content: Any, model: type[BaseModel], fields: tuple[str, ...] | None) -> Any:
+    """
+    Serialize a record or a Pagination of records with only ``fields``. Returns
+    ``content`` untouched when no field set was requested, so the route's
+    response_model applies as usual.
+    """
+    if fields is None:
+        return content
+    slim = slim_model(model, fields)
+    if isinstance(content, Pagination):
+        body = {
+            "data": [slim.model_validate(item).model_dump(mode="json") for item in content.data],
+            **content.model_dump(mode="json", exclude={"data"}),
+        }
+    else:
+        body = slim.model_validate(content).model_dump(mode="json")
+    return JSONResponse(content=body)
@@ -3,46 +3,163 @@ from __future__ import annotations
 from datetime import date, timedelta
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.repositories import record_repository
-from app.services.cache import cache_set, cache_get
+from app.services import goal_counters, leaderboard_service
+from app.services.cache import cache_hget, cache_hset_all, cache_hset_all_many
 
 
-def compute_achievement_rate(session: Session, user_id: int, window_days: int = 30) -> float:
+# Windows computed together, cached side by side in the user's hash and ranked
+STANDARD_WINDOWS = leaderboard_service.LEADERBOARD_WINDOWS
+
+
+def compute_achievement_rate(session: Session, user_id: int, window_days: int = 30) -> dict:
     """
     Calculate achievement rate based on goals completed vs goals set.
     Formula: (Total Goals Completed / Total Goals Set) × 100%
+
+    Every standard window (plus ``window_days``) is computed in one pass and
+    cached; returns the entry for ``window_days``.
+    """
+    windows = sorted({*STANDARD_WINDOWS, window_days})
+    # Completed goals per window and active goals, from the Redis counters
+    counts = goal_counters.get_goal_counts_for_windows(session, user_id, windows)
+    entries = {
+        window: _cache_entry(_rate(completed, total), window, completed, total)
+        for window, (completed, total) in counts.items()
+    }
+    # Not ranked here: the leaderboards are written by the nightly batch only
+    cache_hset_all(_cache_key(user_id), {str(window): entry for window, entry in entries.items()}, ttl_seconds=3600)
+    return entries[window_days]
+
+
+def compute_achievement_rates_batch(
+    session: Session, *, window_days: int = 30, after_id: int = 0, max_id: int | None = None, limit: int = 1000
+) -> tuple[int, int, dict[int, list[int]]]:
+    """
+    Compute, cache, rank and snapshot the achievement rates of every standard
+    window (plus ``window_days``) for the next ``limit`` users after ``after_id``
+    (up to ``max_id``) with one grouped query, pipelined Redis writes and one
+    history insert. Returns (users computed,
+    last user id, histogram bucket counts per standard window); the count is
+    0 and the id ``after_id`` when no users are left.
     """
+    windows = sorted({*STANDARD_WINDOWS, window_days})
     end = date.today()
-    start = end - timedelta(days=window_days - 1)
-    
-    # Count completed goals within the window
-    completed_goals = record_repository.count_completed_goals_by_user(
-        session, user_id, date_from=start, date_to=end
+    rows = record_repository.list_goal_counts_for_users(
+        session,
+        after_id=after_id,
+        max_id=max_id,
+        limit=limit,
+        date_froms=[end - timedelta(days=window - 1) for window in windows],
+        date_to=end,
+    )
+    if not rows:
+        return 0, after_id, {}
+    entries = {
+        user_id: {
+            window: _cache_entry(_rate(completed, total), window, completed, total)
+            for window, completed in zip(windows, completed_by_window)
+        }
+        for user_id, total, *completed_by_window in rows
+    }
+    cache_hset_all_many({
+        _cache_key(user_id): {str(window): entry for window, entry in by_window.items()}
+        for user_id, by_window in entries.items()
+    }, ttl_seconds=3600)
+    # Only users with active goals are ranked; everyone else in the id range,
+    # including ids no longer in users, is dropped from the leaderboards
+    ranked = {user_id for user_id, total, *_ in rows if total}
+    rates = {
+        window: {user_id: by_window[window]["value"] for user_id, by_window in entries.items() if user_id in ranked}
+        for window in STANDARD_WINDOWS
+    }
+    leaderboard_service.record_rates(rates)
+    leaderboard_service.remove_users(
+        [user_id for user_id in range(after_id + 1, rows[-1][0] + 1) if user_id not in ranked]
+    )
+    # The day's snapshot for trend charts, skipping users without active goals,
+    # and the same users' snapshots past retention; committed by the caller
+    record_repository.upsert_achievement_rate_history(session, [
+        {
+            "user_id": user_id,
+            "window_days": window,
+            "date": end,
+            "rate": entry["value"],
+            "completed_goals": entry["completed_goals"],
+            "total_goals": entry["total_goals"],
+        }
+        for user_id, by_window in entries.items()
+        for window, entry in by_window.items()
+        if entry["total_goals"]
+    ])
+    record_repository.delete_achievement_rate_history_before(
+        session,
+        after_id=after_id,
+        max_id=rows[-1][0],
+        before=end - timedelta(days=settings.achievement_rate_history_retention_days),
     )
-    
-    # Count total active goals
-    total_goals = record_repository.count_total_goals_by_user(session, user_id)
-    
-    # Calculate rate
+    histograms = {window: leaderboard_service.histogram_counts(list(by_user.values())) for window, by_user in rates.items()}
+    return len(rows), rows[-1][0], histograms
+
+
+def _rate(completed_goals: int, total_goals: int) -> float:
     if total_goals == 0:
-        rate = 0.0
-    else:
-        rate = round(min(100.0, max(0.0, (completed_goals / float(total_goals)) * 100.0)), 2)
+        return 0.0
+    return round(min(100.0, max(0.0, (completed_goals / float(total_goals)) * 100.0)), 2)
+
 
-    cache_set(_cache_key(user_id), {
-        "value": rate, 
+def _cache_entry(rate: float, window_days: int, completed_goals: int, total_goals: int) -> dict:
+    return {
+        "value": rate,
         "window_days": window_days,
         "completed_goals": completed_goals,
         "total_goals": total_goals
-    }, ttl_seconds=3600)
-    return rate
+    }
 
 
-def get_cached_achievement_rate(user_id: int) -> dict | None:
-    return cache_get(_cache_key(user_id))
+def get_achievement_rate_summary(session: Session, user_id: int, window_days: int = 30) -> dict:
+    """Achievement rate with its goal counts, from cache when ``window_days`` was computed."""
+    entry = get_cached_achievement_rate(user_id, window_days)
+    cached = entry is not None
+    if not cached:
+        entry = compute_achievement_rate(session, user_id, window_days)
+    return {
+        "achievement_rate": entry["value"],
+        "window_days": window_days,
+        "completed_goals": entry.get("completed_goals", 0),
+        "total_goals": entry.get("total_goals", 0),
+        "cached": cached
+    }
+
+
+def get_cached_achievement_rate(user_id: int, window_days: int = 30) -> dict | None:
+    return cache_hget(_cache_key(user_id), str(window_days))
 
 
 def _cache_key(user_id: int) -> str:
-    return f"user:{user_id}:achievement_rate"
+    # Hash: window_days -> cache entry
+    return f"user:{user_id}:achievement_rates"
 
 
+
+def get_achievement_rate_history(
+    session: Session, user_id: int, window_days: int = 30, *, date_from: date | None = None, date_to: date | None = None
+) -> list[dict]:
+    """Daily snapshots written by the nightly job for a standard window, oldest first."""
+    if window_days not in STANDARD_WINDOWS:
+        raise ValueError(f"window_days must be one of {', '.join(map(str, STANDARD_WINDOWS))}")
+    if date_from is not None and date_to is not None and date_from > date_to:
+        raise ValueError("date_from must not be after date_to")
+    rows = record_repository.list_achievement_rate_history(
+        session, user_id, window_days, date_from=date_from, date_to=date_to
+    )
+    return [
+        {
+            "date": row.date,
+            "achievement_rate": row.rate,
+            "completed_goals": row.completed_goals,
+            "total_goals": row.total_goals,
+        }
+        for row in rows
+    ]
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.repositories import record_repository
+from app.schemas.enums import SummaryGranularity
+from app.schemas.records import RecordSummary, RecordSummaryBucket
+from app.services.cache import cache_get, cache_set, get_redis_client
+
+
+SUMMARY_TTL_SECONDS = 300
+DEFAULT_RANGE_DAYS = 30
+MAX_BUCKETS = 400
+
+# Users whose records were written in a session; their version is bumped once it commits
+_PENDING_INVALIDATIONS = "records_summary.pending"
+
+
+def get_records_summary(
+    session: Session,
+    user_id: int,
+    *,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    granularity: SummaryGranularity = SummaryGranularity.day,
+) -> RecordSummary:
+    """
+    Calories in/out, exercise minutes and average weight per day, week or month,
+    read from the user_daily_stats rollup.
+
+    Raises ValueError for an inverted range or one with too many buckets.
+    """
+    granularity = SummaryGranularity(granularity)
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if date_from > date_to:
+        raise ValueError("date_from must be on or before date_to")
+    periods = _periods(date_from, date_to, granularity)
+    if len(periods) > MAX_BUCKETS:
+        raise ValueError(f"Range too large for granularity '{granularity.value}' (max {MAX_BUCKETS} buckets)")
+
+    cache_key = f"user:{user_id}:records_summary:{records_version(user_id)}:{granularity.value}:{date_from}:{date_to}"
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return RecordSummary(**cached)
+
+    buckets = {p: RecordSummaryBucket(period_start=p) for p in periods}
+    rows = record_repository.sum_daily_stats_by_period(
+        session, user_id, granularity=granularity, date_from=date_from, date_to=date_to
+    )
+    for period, calories_in, calories_out, minutes, weight_sum, weight_count in rows:
+        bucket = buckets[period]
+        bucket.calories_in = int(calories_in or 0)
+        bucket.calories_out = int(calories_out or 0)
+        bucket.exercise_minutes = int(minutes or 0)
+        if weight_count:
+            bucket.weight = round(float(weight_sum) / weight_count, 2)
+
+    summary = RecordSummary(date_from=date_from, date_to=date_to, granularity=granularity, buckets=list(buckets.values()))
+    cache_set(cache_key, summary.model_dump(), ttl_seconds=SUMMARY_TTL_SECONDS)
+    return summary
+
+
+def records_version(user_id: int) -> int:
+    return int(get_redis_client().get(_version_key(user_id)) or 0)
+
+
+def invalidate_records_summary(session: Session, user_id: int) -> None:
+    """
+    Called on record writes; bumping the version orphans every cached summary
+    of the user. The bump waits for ``session`` to commit, so a summary read
+    in between cannot cache pre-commit data under the new version.
+    """
+    session.info.setdefault(_PENDING_INVALIDATIONS, set()).add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    user_ids = session.info.pop(_PENDING_INVALIDATIONS, None)
+    if user_ids:
+        pipe = get_redis_client().pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.incr(_version_key(user_id))
+        pipe.execute()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS, None)
+
+
+def _version_key(user_id: int) -> str:
+    return f"user:{user_id}:records_version"
+
+
+def _periods(date_from: date, date_to: date, granularity: SummaryGranularity) -> list[date]:
+    # Same bucket starts as Postgres date_trunc: ISO weeks start on Monday
+    if granularity == SummaryGranularity.day:
+        start = date_from
+    elif granularity == SummaryGranularity.week:
+        start = date_from - timedelta(days=date_from.weekday())
+    else:
+        start = date_from.replace(day=1)
+
+    periods = []
+    current = start
+    while current <= date_to:
+        periods.append(current)
+        if len(periods) > MAX_BUCKETS:
+            break
+        if granularity == SummaryGranularity.day:
+            current += timedelta(days=1)
+        elif granularity == SummaryGranularity.week:
+            current += timedelta(days=7)
+        else:
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return periods
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from datetime import date
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.repositories import record_repository
+from app.schemas.records import WeightTrend, WeightTrendPoint
+
+
+def get_weight_trend(
+    session: Session,
+    user_id: int,
+    *,
+    points: int = 200,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> WeightTrend:
+    """
+    Body-weight series downsampled to at most ``points`` points (LTTB), with trailing
+    7- and 30-day moving averages computed over the full series before sampling.
+    """
+    rows = record_repository.list_body_record_series(session, user_id, date_from=date_from, date_to=date_to)
+    if not rows:
+        return WeightTrend(total_records=0, points=[])
+
+    days = np.fromiter((r[0].toordinal() for r in rows), dtype=np.int64, count=len(rows))
+    weight = np.fromiter((r[1] for r in rows), dtype=np.float64, count=len(rows))
+    body_fat = np.array([np.nan if r[2] is None else r[2] for r in rows], dtype=np.float64)
+
+    ma7 = _trailing_mean(days, weight, 7)
+    ma30 = _trailing_mean(days, weight, 30)
+    selected = _lttb(days.astype(np.float64), weight, points)
+
+    return WeightTrend(
+        total_records=len(rows),
+        points=[
+            WeightTrendPoint(
+                date=date.fromordinal(int(days[i])),
+                weight=float(weight[i]),
+                body_fat_percentage=None if np.isnan(body_fat[i]) else float(body_fat[i]),
+                weight_ma7=round(float(ma7[i]), 2),
+                weight_ma30=round(float(ma30[i]), 2),
+            )
+            for i in selected
+        ],
+    )
+
+
+def _trailing_mean(days: np.ndarray, values: np.ndarray, window_days: int) -> np.ndarray:
+    """Mean of the values recorded in the ``window_days`` calendar days ending at each point."""
+    # days is sorted, so the window start of each point is a binary search away
+    starts = np.searchsorted(days, days - (window_days - 1), side="left")
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    ends = np.arange(1, len(values) + 1)
+    return (csum[ends] - csum[starts]) / (ends - starts)
+
+
+def _lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of ``threshold`` points preserving the visual shape."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # first and last points are always kept; the rest is split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    prev = 0
+    for b in range(threshold - 2):
+        start, end = edges[b], max(edges[b + 1], edges[b] + 1)
+        # the next bucket's average acts as the third triangle vertex
+        next_start, next_end = edges[b + 1], edges[b + 2] if b + 2 < len(edges) else n
+        next_end = max(next_end, next_start + 1)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev]) - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        prev = start + int(np.argmax(area))
+        selected[b + 1] = prev
+    return selected
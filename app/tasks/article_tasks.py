@@ -1,29 +1,57 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+
 from sqlalchemy.orm import Session
 
 from app.celery_app import celery_app
+from app.config import settings
 from app.db.session import SessionLocal
-from app.services.article_service import list_articles
+from app.services.article_service import (
+    hot_list_params,
+    list_articles,
+    list_cache_expires_within,
+    refresh_article_facets,
+)
 
 
-@celery_app.task(name="articles.warm_articles_cache")
-def warm_articles_cache() -> int:
+# Used until real traffic has populated the hot set (e.g. right after a deploy)
+DEFAULT_WARM_PARAMS = [
+    {"category": None, "tag": [], "tag_mode": "any", "q": None, "limit": 10, "offset": 0, "view": "full"},
+    {"category": "Diet", "tag": [], "tag_mode": "any", "q": None, "limit": 10, "offset": 0, "view": "full"},
+    {"category": "Beauty", "tag": [], "tag_mode": "any", "q": None, "limit": 10, "offset": 0, "view": "full"},
+    {"category": "Health", "tag": [], "tag_mode": "any", "q": None, "limit": 10, "offset": 0, "view": "full"},
+]
+
+
+def _warm_one(params: dict) -> int:
+    # SessionLocal is thread-scoped, so each pool thread gets its own session/connection
     session: Session = SessionLocal()
     try:
-        # Warm a few common combinations
-        combos = [
-            {"category": None, "tag": None, "q": None, "limit": 10, "offset": 0},
-            {"category": "Diet", "tag": None, "q": None, "limit": 10, "offset": 0},
-            {"category": "Beauty", "tag": None, "q": None, "limit": 10, "offset": 0},
-            {"category": "Health", "tag": None, "q": None, "limit": 10, "offset": 0},
-        ]
-        total = 0
-        for c in combos:
-            page = list_articles(session, **c)
-            total += page.count if hasattr(page, "count") else 0
-        return total
+        page = list_articles(session, refresh=True, **params)
+        return page.count
     finally:
-        session.close()
+        SessionLocal.remove()
+
+
+@celery_app.task(name="articles.warm_articles_cache")
+def warm_articles_cache(top_k: int | None = None) -> int:
+    """Refresh the hottest article listings that would expire before the next run."""
+    candidates = hot_list_params(top_k or settings.articles_warm_top_k, decay=settings.articles_hot_decay)
+    candidates = candidates or DEFAULT_WARM_PARAMS
+    # one interval plus some slack, so a key never expires between two runs
+    horizon = settings.articles_warm_interval_seconds + 5
+    due = [p for p in candidates if list_cache_expires_within(p, horizon)]
+    if not due:
+        return 0
+    with ThreadPoolExecutor(max_workers=min(settings.articles_warm_concurrency, len(due))) as pool:
+        return sum(pool.map(_warm_one, due))
 
 
+@celery_app.task(name="articles.refresh_article_facets")
+def refresh_article_facets_task() -> int:
+    session: Session = SessionLocal()
+    try:
+        return len(refresh_article_facets(session))
+    finally:
+        session.close()
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from sqlalchemy.orm import Session
+
+from app.celery_app import celery_app
+from app.config import settings
+from app.db.session import SessionLocal
+from app.services.outbox_service import relay_outbox
+
+
+@celery_app.task(name="outbox.relay")
+def relay_outbox_task(max_batches: int = 20) -> int:
+    """
+    Drain outbox rows due before the next run to the broker, committing after
+    each batch; the broker holds the early ones until they are due.
+    """
+    session: Session = SessionLocal()
+    try:
+        sent = 0
+        for _ in range(max_batches):
+            batch = relay_outbox(
+                session,
+                batch_size=settings.outbox_relay_batch_size,
+                lookahead_seconds=settings.outbox_relay_interval_seconds,
+            )
+            session.commit()
+            sent += batch
+            if batch < settings.outbox_relay_batch_size:
+                break
+        return sent
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from celery import group
+from redis.exceptions import RedisError
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.celery_app import celery_app
+from app.config import settings
+from app.db.partitions import maintain_partitions
+from app.db.session import SessionLocal
+from app.repositories import record_repository
+from app.services.activity_service import rebuild_activity_bitmap
+from app.services.archive_service import archive_cold_records, archived_before
+
+
+@celery_app.task(name="records.rebuild_daily_stats")
+def rebuild_daily_stats_task(user_id: int | None = None, days: int | None = None) -> int:
+    """
+    Rebuild user_daily_stats from the record tables; ``days`` limits it to the
+    recent past. Without ``user_id`` it runs over id ranges of
+    RECORDS_ROLLUP_REBUILD_BATCH_SIZE users, one short transaction each, so a
+    user's writes wait for at most one range. Archived months are left alone:
+    their records are no longer in the tables, so their rollup rows are kept
+    as they are.
+    """
+    date_from = date.today() - timedelta(days=days - 1) if days else None
+    boundary = archived_before()
+    if boundary is not None and (date_from is None or date_from < boundary):
+        date_from = boundary
+    session: Session = SessionLocal()
+    try:
+        if user_id is not None:
+            ranges = [(user_id - 1, user_id)]
+        else:
+            ranges = record_repository.get_user_id_ranges(session, settings.records_rollup_rebuild_batch_size)
+        rows = 0
+        for after_id, max_id in ranges:
+            rows += record_repository.rebuild_daily_stats(session, after_id=after_id, max_id=max_id, date_from=date_from)
+            session.commit()
+        return rows
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+@celery_app.task(name="records.rebuild_activity_bitmaps")
+def rebuild_activity_bitmaps_task(user_id: int | None = None, chunk_size: int | None = None) -> int:
+    """
+    Rebuild activity bitmaps from user_daily_stats for one user, or fan every
+    user out as id ranges of ``chunk_size`` (NIGHTLY_REBUILD_CHUNK_SIZE) to
+    rebuild_activity_bitmaps_chunk tasks on the batch workers. Returns the
+    number of users rebuilt or of chunks dispatched.
+    """
+    session: Session = SessionLocal()
+    try:
+        if user_id is not None:
+            rebuild_activity_bitmap(session, user_id)
+            return 1
+        ranges = record_repository.get_user_id_ranges(session, chunk_size or settings.nightly_rebuild_chunk_size)
+    finally:
+        session.close()
+    if ranges:
+        group(rebuild_activity_bitmaps_chunk.s(after_id, max_id) for after_id, max_id in ranges).apply_async()
+    return len(ranges)
+
+
+@celery_app.task(name="records.rebuild_activity_bitmaps_chunk", bind=True, max_retries=3, default_retry_delay=30)
+def rebuild_activity_bitmaps_chunk(self, after_id: int, max_id: int) -> int:
+    """Bitmaps of the users with records and after_id < id <= max_id; safe to rerun."""
+    session: Session = SessionLocal()
+    try:
+        user_ids = record_repository.list_users_with_daily_stats(session, after_id=after_id, max_id=max_id)
+        for uid in user_ids:
+            rebuild_activity_bitmap(session, uid)
+        return len(user_ids)
+    except (OperationalError, RedisError) as exc:
+        session.rollback()
+        raise self.retry(exc=exc)
+    finally:
+        session.close()
+
+
+@celery_app.task(name="records.maintain_partitions")
+def maintain_partitions_task() -> dict:
+    """Pre-create upcoming monthly record partitions and detach expired ones."""
+    session: Session = SessionLocal()
+    try:
+        result = maintain_partitions(
+            session,
+            months_ahead=settings.records_partition_months_ahead,
+            retention_months=settings.records_partition_retention_months,
+        )
+        session.commit()
+        return result
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+@celery_app.task(name="records.archive_cold_records")
+def archive_cold_records_task(after_days: int | None = None) -> dict:
+    """Move whole months older than ``after_days`` (RECORDS_ARCHIVE_AFTER_DAYS) to archive files."""
+    after_days = settings.records_archive_after_days if after_days is None else after_days
+    if after_days <= 0:
+        return {}
+    session: Session = SessionLocal()
+    try:
+        return archive_cold_records(session, before=date.today() - timedelta(days=after_days))
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
@@ -1,41 +1,173 @@
 from __future__ import annotations
 
+from uuid import uuid4
+
+from celery import chord, group
+from redis.exceptions import RedisError
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
 from app.celery_app import celery_app
+from app.config import settings
 from app.db.session import SessionLocal
-from sqlalchemy import text
-from app.services.stats_service import compute_achievement_rate
+from app.repositories import record_repository
+from app.services.cache import cache_delete, cache_get, cache_set
+from app.services.goal_counters import rebuild_goal_counters
+from app.services.leaderboard_service import store_histograms
+from app.services.outbox_service import enqueue_task
+from app.services.stats_service import compute_achievement_rate, compute_achievement_rates_batch
+
+
+def schedule_achievement_rate_recompute(session: Session, user_id: int) -> bool:
+    """
+    Queue a recompute for the user through the outbox, due
+    ACHIEVEMENT_RATE_DEBOUNCE_SECONDS from now, unless one is already pending;
+    writes in between are picked up by that run. It is sent only if
+    ``session`` commits. Returns whether a new task was queued.
+    """
+    return enqueue_task(
+        session,
+        compute_achievement_rate_task.name,
+        user_id,
+        countdown=settings.achievement_rate_debounce_seconds,
+        dedupe_key=f"{compute_achievement_rate_task.name}:{user_id}",
+    )
 
 
 @celery_app.task(name="stats.compute_achievement_rate")
 def compute_achievement_rate_task(user_id: int, window_days: int = 30) -> float:
     session: Session = SessionLocal()
     try:
-        return compute_achievement_rate(session, user_id=user_id, window_days=window_days)
+        return compute_achievement_rate(session, user_id=user_id, window_days=window_days)["value"]
     finally:
         session.close()
 
 
+# Per-chunk progress of a fan-out run, so a retried chunk resumes where it stopped
+CHECKPOINT_TTL_SECONDS = 24 * 3600
+
+
+def _checkpoint_key(run_id: str, chunk: int) -> str:
+    return f"achievement_rate:run:{run_id}:chunk:{chunk}"
+
+
+def _add_histograms(total: dict[str, list[int]], counts: dict) -> dict[str, list[int]]:
+    # Keys are strings: chunk results and checkpoints round-trip through JSON
+    for window, window_counts in counts.items():
+        previous = total.get(str(window), [0] * len(window_counts))
+        total[str(window)] = [a + b for a, b in zip(previous, window_counts)]
+    return total
+
+
 @celery_app.task(name="stats.compute_achievement_rate_all_users")
-def compute_achievement_rate_all_users(window_days: int = 30) -> int:
+def compute_achievement_rate_all_users(
+    window_days: int = 30, batch_size: int | None = None, chunk_size: int | None = None
+) -> int:
+    """
+    Split users into id ranges of ``chunk_size`` ids and run them as a chord
+    of chunk tasks on any free worker, with finish_achievement_rate_run as the
+    callback. Returns the number of chunks dispatched.
+    """
     session: Session = SessionLocal()
     try:
-        count = 0
-        last_id = 0
-        while True:
-            users = session.execute(
-                text("SELECT id FROM users WHERE id > :last_id ORDER BY id ASC LIMIT 100"),
-                {"last_id": last_id},
-            ).all()
-            if not users:
+        ranges = record_repository.get_user_id_ranges(session, chunk_size or settings.achievement_rate_chunk_size)
+    finally:
+        session.close()
+    if not ranges:
+        return 0
+    run_id = uuid4().hex
+    header = [
+        compute_achievement_rate_chunk.s(run_id, chunk, after_id, max_id, window_days, batch_size)
+        for chunk, (after_id, max_id) in enumerate(ranges)
+    ]
+    chord(header)(finish_achievement_rate_run.s(run_id))
+    return len(header)
+
+
+@celery_app.task(
+    name="stats.compute_achievement_rate_chunk", bind=True, max_retries=3, default_retry_delay=30
+)
+def compute_achievement_rate_chunk(
+    self, run_id: str, chunk: int, after_id: int, max_id: int, window_days: int = 30, batch_size: int | None = None
+) -> dict:
+    """
+    Users with after_id < id <= max_id, a batch at a time. Progress is
+    checkpointed in Redis after each committed batch; a retry after a database
+    or Redis outage continues from it.
+    """
+    key = _checkpoint_key(run_id, chunk)
+    state = cache_get(key) or {"after_id": after_id, "users": 0, "histograms": {}}
+    session: Session = SessionLocal()
+    try:
+        while state["after_id"] < max_id:
+            computed, last_id, histograms = compute_achievement_rates_batch(
+                session,
+                window_days=window_days,
+                after_id=state["after_id"],
+                max_id=max_id,
+                limit=batch_size or settings.achievement_rate_batch_size,
+            )
+            if not computed:
                 break
-            for (uid,) in users:
-                compute_achievement_rate(session, user_id=uid, window_days=window_days)
-                last_id = uid
-                count += 1
-        return count
+            session.commit()
+            state = {
+                "after_id": last_id,
+                "users": state["users"] + computed,
+                "histograms": _add_histograms(state["histograms"], histograms),
+            }
+            cache_set(key, state, ttl_seconds=CHECKPOINT_TTL_SECONDS)
+        return state
+    except (OperationalError, RedisError) as exc:
+        # Only connection-level failures are worth retrying; bugs fail the run at once
+        session.rollback()
+        raise self.retry(exc=exc)
     finally:
         session.close()
 
 
+@celery_app.task(name="stats.finish_achievement_rate_run")
+def finish_achievement_rate_run(results: list[dict], run_id: str) -> int:
+    """Chord callback: merge the chunks' histograms, store them and drop the checkpoints."""
+    histograms: dict[str, list[int]] = {}
+    for result in results:
+        _add_histograms(histograms, result["histograms"])
+    store_histograms({int(window): counts for window, counts in histograms.items()})
+    cache_delete(*(_checkpoint_key(run_id, chunk) for chunk in range(len(results))))
+    return sum(result["users"] for result in results)
+
+
+@celery_app.task(name="stats.rebuild_goal_counters")
+def rebuild_goal_counters_task(user_id: int | None = None, chunk_size: int | None = None) -> int:
+    """
+    Reconcile the Redis goal counters with the database for one user, or fan
+    every user out as id ranges of ``chunk_size`` (NIGHTLY_REBUILD_CHUNK_SIZE)
+    to rebuild_goal_counters_chunk tasks on the batch workers. Returns the
+    number of users rebuilt or of chunks dispatched.
+    """
+    session: Session = SessionLocal()
+    try:
+        if user_id is not None:
+            rebuild_goal_counters(session, user_id)
+            return 1
+        ranges = record_repository.get_user_id_ranges(session, chunk_size or settings.nightly_rebuild_chunk_size)
+    finally:
+        session.close()
+    if ranges:
+        group(rebuild_goal_counters_chunk.s(after_id, max_id) for after_id, max_id in ranges).apply_async()
+    return len(ranges)
+
+
+@celery_app.task(name="stats.rebuild_goal_counters_chunk", bind=True, max_retries=3, default_retry_delay=30)
+def rebuild_goal_counters_chunk(self, after_id: int, max_id: int) -> int:
+    """Counters of the users with goals and after_id < id <= max_id; safe to rerun."""
+    session: Session = SessionLocal()
+    try:
+        user_ids = record_repository.list_users_with_goals(session, after_id=after_id, max_id=max_id)
+        for uid in user_ids:
+            rebuild_goal_counters(session, uid)
+        return len(user_ids)
+    except (OperationalError, RedisError) as exc:
+        session.rollback()
+        raise self.retry(exc=exc)
+    finally:
+        session.close()
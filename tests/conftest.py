@@ -28,3 +28,12 @@ def auth_token(client: TestClient) -> str:
     return r.json()["access_token"]
 
 
+@pytest.fixture()
+def celery_eager():
+    """Run tasks, including chords, inline instead of through the broker."""
+    from app.celery_app import celery_app
+    celery_app.conf.task_always_eager = True
+    try:
+        yield
+    finally:
+        celery_app.conf.task_always_eager = False
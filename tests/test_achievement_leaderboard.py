@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.services import leaderboard_service
+from app.services.cache import get_redis_client
+from app.tasks.stats_tasks import compute_achievement_rate_all_users
+
+
+def test_rank_and_leaderboard(client: TestClient, auth_token: str, celery_eager):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.post("/records/goals", headers=headers, json={"title": "ranked"})
+    compute_achievement_rate_all_users()
+    rank = client.get("/stats/achievement-rate/rank", params={"window_days": 30}, headers=headers)
+    assert rank.status_code == 200, rank.text
+    body = rank.json()
+    assert 1 <= body["rank"] <= body["total_users"]
+    assert 0.0 < body["top_percent"] <= 100.0
+
+    top = client.get("/stats/achievement-rate/leaderboard", params={"window_days": 30, "limit": 100}, headers=headers)
+    assert top.status_code == 200
+    rates = [entry["achievement_rate"] for entry in top.json()["data"]]
+    assert rates == sorted(rates, reverse=True)
+    assert any(entry["user_id"] == body["user_id"] for entry in top.json()["data"]) or len(rates) == 100
+
+
+def test_histogram_after_nightly_job(client: TestClient, auth_token: str, celery_eager):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    compute_achievement_rate_all_users()
+    r = client.get("/stats/achievement-rate/histogram", params={"window_days": 90}, headers=headers)
+    assert r.status_code == 200
+    assert len(r.json()["counts"]) == len(r.json()["edges"]) - 1 == 10
+    assert r.json()["total_users"] >= 1
+
+
+def test_unranked_window_is_rejected(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    r = client.get("/stats/achievement-rate/leaderboard", params={"window_days": 12}, headers=headers)
+    assert r.status_code == 400
+
+
+def test_on_demand_reads_do_not_touch_the_leaderboard(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    before = get_redis_client().zcard(leaderboard_service._leaderboard_key(30))
+    r = client.get("/stats/achievement-rate/user/987654321", headers=headers)
+    assert r.status_code == 404
+    assert client.get("/stats/achievement-rate", params={"window_days": 30}, headers=headers).status_code == 200
+    assert get_redis_client().zcard(leaderboard_service._leaderboard_key(30)) == before
+    assert get_redis_client().zscore(leaderboard_service._leaderboard_key(30), "987654321") is None
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from app.db.session import SessionLocal
+from app.repositories.user_repository import get_by_email
+from app.services import stats_service
+from app.tasks.stats_tasks import compute_achievement_rate_all_users
+
+
+def test_batch_matches_per_user_computation():
+    session = SessionLocal()
+    try:
+        me = get_by_email(session, "demo@example.com")
+        expected = stats_service.compute_achievement_rate(session, me.id, window_days=7)
+
+        computed, last_id, histograms = stats_service.compute_achievement_rates_batch(
+            session, window_days=7, after_id=me.id - 1, limit=1
+        )
+        assert (computed, last_id) == (1, me.id)
+        assert sum(histograms[7]) == 1
+        assert stats_service.get_cached_achievement_rate(me.id, 7) == expected
+    finally:
+        session.close()
+
+
+def test_batch_past_last_user_is_empty():
+    session = SessionLocal()
+    try:
+        assert stats_service.compute_achievement_rates_batch(session, after_id=2**31 - 1) == (0, 2**31 - 1, {})
+    finally:
+        session.close()
+
+
+def test_all_users_job_in_small_batches(celery_eager):
+    assert compute_achievement_rate_all_users(window_days=7, batch_size=2) >= 1
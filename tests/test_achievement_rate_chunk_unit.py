@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import pytest
+
+from app.tasks import stats_tasks
+
+
+class _FakeSession:
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture()
+def fake_run(monkeypatch):
+    """Chunk task and chord callback wired to in-memory stand-ins for Postgres and Redis."""
+    store: dict[str, object] = {}
+    stored_histograms: list[dict] = []
+    batches = iter([(2, 12, {30: [1, 1]}), (1, 15, {30: [0, 1]})])
+
+    monkeypatch.setattr(stats_tasks, "SessionLocal", _FakeSession)
+    monkeypatch.setattr(stats_tasks, "compute_achievement_rates_batch", lambda session, **kwargs: next(batches))
+    monkeypatch.setattr(stats_tasks, "cache_get", store.get)
+    monkeypatch.setattr(stats_tasks, "cache_set", lambda key, value, ttl_seconds: store.__setitem__(key, value))
+    monkeypatch.setattr(stats_tasks, "cache_delete", lambda *keys: [store.pop(key, None) for key in keys])
+    monkeypatch.setattr(stats_tasks, "store_histograms", stored_histograms.append)
+    return store, stored_histograms
+
+
+def test_chunk_and_callback_run_without_backends(fake_run):
+    store, stored_histograms = fake_run
+    result = stats_tasks.compute_achievement_rate_chunk.apply(args=["unit", 0, 10, 15]).get()
+    assert result == {"after_id": 15, "users": 3, "histograms": {"30": [1, 2]}}
+    assert store[stats_tasks._checkpoint_key("unit", 0)] == result
+
+    assert stats_tasks.finish_achievement_rate_run([result, result], "unit") == 6
+    assert stored_histograms == [{30: [2, 4]}]
+    assert store == {}
+
+
+def test_chunk_does_not_retry_programming_errors(monkeypatch, fake_run):
+    calls = []
+
+    def broken(session, **kwargs):
+        calls.append(kwargs)
+        raise NameError("boom")
+
+    monkeypatch.setattr(stats_tasks, "compute_achievement_rates_batch", broken)
+    result = stats_tasks.compute_achievement_rate_chunk.apply(args=["unit", 0, 10, 15])
+    assert isinstance(result.result, NameError)
+    assert len(calls) == 1
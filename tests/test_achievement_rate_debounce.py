@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from datetime import date
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, select
+
+from app.db.session import SessionLocal
+from app.models.outbox import TaskOutbox
+from app.repositories.user_repository import get_by_email
+from app.tasks import stats_tasks
+
+
+def _pending(session, user_id: int) -> list[TaskOutbox]:
+    key = f"{stats_tasks.compute_achievement_rate_task.name}:{user_id}"
+    return session.scalars(select(TaskOutbox).where(TaskOutbox.dedupe_key == key)).all()
+
+
+def test_burst_of_writes_queues_one_recompute(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    session = SessionLocal()
+    try:
+        user_id = get_by_email(session, "demo@example.com").id
+        session.execute(delete(TaskOutbox).where(TaskOutbox.task_name == stats_tasks.compute_achievement_rate_task.name))
+        session.commit()
+
+        goal_id = client.post("/records/goals", headers=headers, json={"title": "burst"}).json()["id"]
+        for value in range(10):
+            r = client.put(
+                f"/records/goals/{goal_id}/progress/{date.today()}", headers=headers, json={"current_value": value}
+            )
+            assert r.status_code == 200
+
+        pending = _pending(session, user_id)
+        assert len(pending) == 1
+        assert pending[0].args == [user_id]
+        assert pending[0].available_at > pending[0].created_at
+    finally:
+        session.rollback()
+        session.close()
+
+
+def test_schedule_is_deduplicated_until_relayed():
+    session = SessionLocal()
+    try:
+        user_id = get_by_email(session, "demo@example.com").id
+        session.execute(delete(TaskOutbox).where(TaskOutbox.task_name == stats_tasks.compute_achievement_rate_task.name))
+        assert stats_tasks.schedule_achievement_rate_recompute(session, user_id) is True
+        assert stats_tasks.schedule_achievement_rate_recompute(session, user_id) is False
+        session.execute(delete(TaskOutbox).where(TaskOutbox.task_name == stats_tasks.compute_achievement_rate_task.name))
+        assert stats_tasks.schedule_achievement_rate_recompute(session, user_id) is True
+    finally:
+        session.rollback()
+        session.close()
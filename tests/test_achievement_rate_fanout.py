@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from app.db.session import SessionLocal
+from app.repositories import record_repository
+from app.services.cache import cache_get, cache_set
+from app.tasks import stats_tasks
+
+
+def _bounds() -> tuple[int, int]:
+    session = SessionLocal()
+    try:
+        return record_repository.get_user_id_bounds(session)
+    finally:
+        session.close()
+
+
+def test_fan_out_one_chunk_per_id_range(celery_eager):
+    low, high = _bounds()
+    chunks = stats_tasks.compute_achievement_rate_all_users(chunk_size=1, batch_size=1)
+    assert chunks == high - low + 1
+
+
+def test_chunks_cover_every_user_once():
+    low, high = _bounds()
+    middle = (low + high) // 2
+    whole = stats_tasks.compute_achievement_rate_chunk.apply(args=["t-whole", 0, low - 1, high]).get()
+    first = stats_tasks.compute_achievement_rate_chunk.apply(args=["t-split", 0, low - 1, middle]).get()
+    second = stats_tasks.compute_achievement_rate_chunk.apply(args=["t-split", 1, middle, high]).get()
+    assert first["users"] + second["users"] == whole["users"]
+
+    assert stats_tasks.finish_achievement_rate_run([first, second], "t-split") == whole["users"]
+    assert cache_get(stats_tasks._checkpoint_key("t-split", 0)) is None
+    stats_tasks.finish_achievement_rate_run([whole], "t-whole")
+
+
+def test_retried_chunk_resumes_from_checkpoint():
+    low, high = _bounds()
+    key = stats_tasks._checkpoint_key("t-resume", 0)
+    # Pretend everything was already processed by an earlier attempt
+    cache_set(key, {"after_id": high, "users": 7, "histograms": {}}, ttl_seconds=60)
+    result = stats_tasks.compute_achievement_rate_chunk.apply(args=["t-resume", 0, low - 1, high]).get()
+    assert result["users"] == 7
+    stats_tasks.finish_achievement_rate_run([result], "t-resume")
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.config import settings
+from app.db.session import SessionLocal
+from app.models.stats import AchievementRateHistory
+from app.repositories import record_repository
+from app.repositories.user_repository import get_by_email
+from app.tasks.stats_tasks import compute_achievement_rate_all_users
+
+
+def test_nightly_job_appends_todays_snapshot(client: TestClient, auth_token: str, celery_eager):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    compute_achievement_rate_all_users()
+    # A rerun on the same day overwrites instead of duplicating
+    compute_achievement_rate_all_users()
+
+    r = client.get("/stats/achievement-rate/history", params={"window_days": 30}, headers=headers)
+    assert r.status_code == 200
+    data = r.json()["data"]
+    assert [row["date"] for row in data].count(str(date.today())) == 1
+    assert [row["date"] for row in data] == sorted(row["date"] for row in data)
+    current = client.get("/stats/achievement-rate", params={"window_days": 30}, headers=headers).json()
+    assert data[-1]["achievement_rate"] == current["achievement_rate"]
+
+
+def test_history_range(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    past = date.today() - timedelta(days=400)
+    r = client.get(
+        "/stats/achievement-rate/history",
+        params={"window_days": 7, "date_from": str(past), "date_to": str(past + timedelta(days=1))},
+        headers=headers,
+    )
+    assert r.status_code == 200 and r.json()["data"] == []
+
+    bad = client.get(
+        "/stats/achievement-rate/history",
+        params={"date_from": str(date.today()), "date_to": str(past)},
+        headers=headers,
+    )
+    assert bad.status_code == 400
+
+    unsnapshotted = client.get("/stats/achievement-rate/history", params={"window_days": 14}, headers=headers)
+    assert unsnapshotted.status_code == 400
+
+
+def test_nightly_job_skips_empty_snapshots_and_prunes_old_ones(celery_eager):
+    session = SessionLocal()
+    try:
+        me = get_by_email(session, "demo@example.com")
+        old = date.today() - timedelta(days=settings.achievement_rate_history_retention_days + 1)
+        record_repository.upsert_achievement_rate_history(session, [
+            {"user_id": me.id, "window_days": 30, "date": old, "rate": 0.0, "completed_goals": 0, "total_goals": 1}
+        ])
+        session.commit()
+
+        compute_achievement_rate_all_users()
+        session.rollback()
+        assert record_repository.list_achievement_rate_history(session, me.id, 30, date_to=old) == []
+        empty = session.scalars(
+            select(AchievementRateHistory).where(
+                AchievementRateHistory.date == date.today(), AchievementRateHistory.total_goals == 0
+            )
+        ).first()
+        assert empty is None
+    finally:
+        session.close()
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.db.session import SessionLocal
+from app.repositories.user_repository import get_by_email
+from app.services import stats_service
+
+
+def test_standard_windows_are_computed_together(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    session = SessionLocal()
+    try:
+        me = get_by_email(session, "demo@example.com")
+        result = stats_service.compute_achievement_rate(session, me.id, window_days=7)
+    finally:
+        session.close()
+
+    for window_days in stats_service.STANDARD_WINDOWS:
+        r = client.get("/stats/achievement-rate", params={"window_days": window_days}, headers=headers)
+        assert r.status_code == 200
+        assert r.json()["cached"] is True
+        assert r.json()["window_days"] == window_days
+    assert stats_service.get_cached_achievement_rate(me.id, 7) == result
+
+
+def test_windows_do_not_overwrite_each_other(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    first = client.get("/stats/achievement-rate", params={"window_days": 12}, headers=headers).json()
+    client.get("/stats/achievement-rate", params={"window_days": 30}, headers=headers)
+    again = client.get("/stats/achievement-rate", params={"window_days": 12}, headers=headers).json()
+    assert again["cached"] is True
+    assert again["achievement_rate"] == first["achievement_rate"]
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from app.db.session import SessionLocal
+from app.repositories import record_repository, user_repository
+from app.services import activity_service
+from app.services.cache import get_redis_binary_client
+from app.tasks.record_tasks import rebuild_activity_bitmaps_task
+
+
+def test_calendar_marks_days_with_records(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    day = date(2031, 7, 14)
+    created = client.post("/records/diaries", headers=headers, json={"date": str(day), "content": "calendar"})
+    assert created.status_code == 201, created.text
+
+    r = client.get("/records/calendar", params={"month": "2031-07"}, headers=headers)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["month"] == "2031-07"
+    assert str(day) in body["days"]
+    assert body["active_days"] == len(body["days"])
+
+    # Removing the day's only record clears its bit
+    client.delete(f"/records/diaries/{created.json()['id']}", headers=headers)
+    r = client.get("/records/calendar", params={"month": "2031-07"}, headers=headers)
+    assert str(day) not in r.json()["days"]
+
+
+def test_calendar_rejects_bad_month(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    assert client.get("/records/calendar", params={"month": "2031-13"}, headers=headers).status_code == 400
+    assert client.get("/records/calendar", params={"month": "1999-12"}, headers=headers).status_code == 400
+
+
+def test_streak_counts_consecutive_days(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    today = date.today()
+    for offset in (1, 0):
+        day = today - timedelta(days=offset)
+        client.post("/records/diaries", headers=headers, json={"date": str(day), "content": "streak"})
+
+    r = client.get("/records/streak", headers=headers)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["current"] >= 2
+    assert body["longest"] >= body["current"]
+    assert body["last_active_date"] == str(today)
+
+
+def test_bitmap_rebuild_matches_incremental_updates(client: TestClient, auth_token: str, celery_eager):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    before = client.get("/records/streak", headers=headers).json()
+
+    session = SessionLocal()
+    try:
+        me = user_repository.get_by_email(session, "demo@example.com")
+        activity_service.rebuild_activity_bitmap(session, me.id)
+    finally:
+        session.close()
+    assert client.get("/records/streak", headers=headers).json() == before
+    assert rebuild_activity_bitmaps_task(chunk_size=1) >= 1
+    assert client.get("/records/streak", headers=headers).json() == before
+
+
+def test_rolled_back_writes_leave_the_bitmap_alone(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    day = date(2031, 9, 9)
+    client.get("/records/calendar", params={"month": "2031-09"}, headers=headers)  # builds the bitmap
+
+    session = SessionLocal()
+    try:
+        me = user_repository.get_by_email(session, "demo@example.com")
+        activity_service.mark_activity(session, me.id, day)
+        session.rollback()
+    finally:
+        session.close()
+    r = client.get("/records/calendar", params={"month": "2031-09"}, headers=headers)
+    assert str(day) not in r.json()["days"]
+
+
+def test_rebuild_retries_when_a_write_lands_during_its_read():
+    day = date(2031, 10, 10)
+    session, writing = SessionLocal(), SessionLocal()
+    try:
+        me = user_repository.get_by_email(session, "demo@example.com")
+        get_redis_binary_client().delete(f"user:{me.id}:activity_days")
+        stale = record_repository.list_active_days(session, me.id)
+        reads = []
+
+        def read_during_write(_session, user_id):
+            reads.append(user_id)
+            if len(reads) == 1:
+                # Committed after the rebuild's read, so the read misses it
+                activity_service.mark_activity(writing, user_id, day)
+                writing.commit()
+                return stale
+            return [*stale, day]
+
+        with mock.patch.object(activity_service.record_repository, "list_active_days", side_effect=read_during_write):
+            activity_service.rebuild_activity_bitmap(session, me.id)
+        assert len(reads) == 2
+        assert get_redis_binary_client().getbit(f"user:{me.id}:activity_days", (day - activity_service.EPOCH).days) == 1
+    finally:
+        activity_service.rebuild_activity_bitmap(session, me.id)
+        writing.close()
+        session.close()
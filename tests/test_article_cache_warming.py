@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.services import article_service
+from app.services.cache import get_redis_client
+from app.tasks.article_tasks import warm_articles_cache
+
+
+def test_listing_requests_feed_hot_set_and_warming(client: TestClient):
+    for _ in range(3):
+        assert client.get("/articles?limit=7&category=Health").status_code == 200
+    hot = article_service.hot_list_params(100)
+    assert any(p["limit"] == 7 and p["category"] == "Health" for p in hot)
+
+    params = next(p for p in hot if p["limit"] == 7 and p["category"] == "Health")
+    get_redis_client().delete(article_service.list_cache_key(params))
+    assert article_service.list_cache_expires_within(params, 5)
+
+    assert isinstance(warm_articles_cache(top_k=100), int)
+    assert not article_service.list_cache_expires_within(params, 5)
+
+
+def test_searches_and_cursor_pages_are_not_tracked(client: TestClient):
+    assert client.get("/articles?limit=9&q=one-off-search").status_code == 200
+    first = client.get("/articles?limit=9").json()
+    if first.get("next_cursor"):
+        client.get(f"/articles?limit=9&cursor={first['next_cursor']}")
+    hot = article_service.hot_list_params(article_service.HOT_LISTS_MAX)
+    assert not any(p["q"] or p.get("cursor") for p in hot)
+    assert get_redis_client().zcard(article_service.HOT_LISTS_KEY) <= article_service.HOT_LISTS_MAX
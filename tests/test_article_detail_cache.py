@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.services import article_service
+from app.services.cache import cache_get
+
+
+def test_article_detail_cached_and_404(client: TestClient):
+    items = client.get("/articles?limit=1").json()["data"]
+    if items:
+        article_id = items[0]["id"]
+        article_service.invalidate_article_cache(article_id)
+        first = client.get(f"/articles/{article_id}")
+        assert first.status_code == 200
+        assert cache_get(f"articles:detail:{article_id}") is not None
+        second = client.get(f"/articles/{article_id}")
+        assert second.json() == first.json()
+
+    missing_id = 987654321
+    r = client.get(f"/articles/{missing_id}")
+    assert r.status_code == 404
+    assert cache_get(f"articles:detail:{missing_id}") == {"missing": True}
+    # served from the negative cache
+    assert client.get(f"/articles/{missing_id}").status_code == 404
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+
+from app.db.session import SessionLocal
+from app.models.article import Article
+from app.repositories import article_repository
+from app.services import article_service
+from app.services.cache import cache_delete, cache_get, cache_hgetall, cache_set
+
+
+def test_article_facets_endpoint(client: TestClient):
+    r = client.get("/articles/facets")
+    assert r.status_code == 200
+    data = r.json()
+    assert data["total"] == sum(data["categories"].values())
+    for category, per_tag in data["category_tags"].items():
+        for n in per_tag.values():
+            assert n <= data["categories"][category]
+
+
+def test_facet_counts_match_count_queries():
+    session = SessionLocal()
+    try:
+        article_service.refresh_article_facets(session)
+        for category, tag in [(None, None), ("Diet", None), (None, "fitness"), ("Diet", "fitness"), ("Diet", "no-such-tag")]:
+            expected = article_repository.count_articles(session, category=category, tag=tag, q=None)
+            assert article_service.get_facet_count(session, category=category, tag=tag) == expected
+    finally:
+        session.close()
+
+
+def test_only_one_request_rebuilds_a_missing_store():
+    session = SessionLocal()
+    try:
+        cache_delete(article_service.FACETS_CACHE_KEY)
+        # Another request holds the rebuild: count directly and leave the store alone
+        cache_set(article_service.FACETS_REBUILD_LOCK_KEY, 1, ttl_seconds=30)
+        expected = article_repository.count_articles(session, category="Diet", tag=None, q=None)
+        assert article_service.get_facet_count(session, category="Diet", tag=None) == expected
+        assert cache_hgetall(article_service.FACETS_CACHE_KEY) == {}
+
+        cache_delete(article_service.FACETS_REBUILD_LOCK_KEY)
+        assert article_service.get_facet_count(session, category="Diet", tag=None) == expected
+        assert cache_hgetall(article_service.FACETS_CACHE_KEY) != {}
+        assert cache_get(article_service.FACETS_REBUILD_LOCK_KEY) is None
+    finally:
+        session.close()
+
+
+def test_article_writes_drop_the_store():
+    session = SessionLocal()
+    try:
+        article_service.refresh_article_facets(session)
+        article = Article(title="facets", content="body", category="Diet")
+        session.add(article)
+        session.flush()
+        session.rollback()
+        assert cache_hgetall(article_service.FACETS_CACHE_KEY) != {}
+
+        session.add(Article(title="facets", content="body", category="Diet"))
+        session.commit()
+        assert cache_hgetall(article_service.FACETS_CACHE_KEY) == {}
+        total = article_repository.count_articles(session, category=None, tag=None, q=None)
+        assert article_service.get_facet_count(session, category=None, tag=None) == total
+    finally:
+        session.execute(delete(Article).where(Article.title == "facets"))
+        session.commit()
+        session.close()
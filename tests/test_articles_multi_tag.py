@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.db.session import SessionLocal
+from app.repositories import article_repository
+
+
+def test_articles_multi_tag_modes(client: TestClient):
+    r_any = client.get("/articles?limit=100&tag=fitness&tag=sleep&tag_mode=any")
+    assert r_any.status_code == 200
+    r_all = client.get("/articles?limit=100&tag=fitness&tag=sleep&tag_mode=all")
+    assert r_all.status_code == 200
+    # every article matching all tags also matches any of them
+    any_ids = {a["id"] for a in r_any.json()["data"]}
+    all_ids = {a["id"] for a in r_all.json()["data"]}
+    assert all_ids <= any_ids
+    for a in r_all.json()["data"]:
+        names = {t["name"] for t in a["tags"]}
+        assert {"fitness", "sleep"} <= names
+
+    r = client.get("/articles?tag_mode=some")
+    assert r.status_code == 422
+
+
+def test_article_repository_tag_counts_match_lists():
+    session = SessionLocal()
+    try:
+        for mode in ("any", "all"):
+            items = article_repository.list_articles(
+                session, category=None, tag=["fitness", "yoga"], tag_mode=mode, q=None, limit=100, offset=0
+            )
+            total = article_repository.count_articles(session, category=None, tag=["fitness", "yoga"], tag_mode=mode, q=None)
+            assert len(items) == total
+    finally:
+        session.close()
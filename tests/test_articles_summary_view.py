@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+
+def test_articles_summary_view_omits_content(client: TestClient):
+    r = client.get("/articles?limit=5&view=summary")
+    assert r.status_code == 200
+    for item in r.json()["data"]:
+        assert "content" not in item
+        assert "excerpt" in item and len(item["excerpt"] or "") <= 280
+
+    full = client.get("/articles?limit=5")
+    assert full.status_code == 200
+    for item in full.json()["data"]:
+        assert "content" in item
+
+    assert client.get("/articles?view=compact").status_code == 422
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+
+def test_body_record_trend_downsamples(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    r = client.get("/records/body-records/trend?points=5", headers=headers)
+    assert r.status_code == 200
+    data = r.json()
+    assert len(data["points"]) == min(5, data["total_records"])
+    dates = [p["date"] for p in data["points"]]
+    assert dates == sorted(dates)
+    for p in data["points"]:
+        assert "weight_ma7" in p and "weight_ma30" in p
+
+    assert client.get("/records/body-records/trend?points=1", headers=headers).status_code == 422
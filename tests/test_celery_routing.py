@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from app.celery_app import celery_app
+from app.tasks import article_tasks, record_tasks, stats_tasks
+
+
+def _queue(name: str) -> str:
+    return celery_app.amqp.router.route({}, name)["queue"].name
+
+
+def test_tasks_are_routed_by_kind():
+    assert _queue("stats.compute_achievement_rate") == "interactive"
+    assert _queue("stats.compute_achievement_rate_all_users") == "batch"
+    assert _queue("stats.compute_achievement_rate_chunk") == "batch"
+    assert _queue("articles.warm_articles_cache") == "interactive"
+    assert _queue("articles.refresh_article_facets") == "interactive"
+    assert _queue("stats.rebuild_goal_counters_chunk") == "batch"
+    assert _queue("records.maintain_partitions") == "maintenance"
+    # Every scheduled task has an explicit queue
+    for entry in celery_app.conf.beat_schedule.values():
+        assert entry["task"] in celery_app.conf.task_routes
+
+
+def test_result_and_ack_settings():
+    assert stats_tasks.compute_achievement_rate_task.ignore_result
+    assert article_tasks.warm_articles_cache.ignore_result
+    assert record_tasks.archive_cold_records_task.acks_late
+    # The chord callback needs its chunks' results
+    assert not stats_tasks.compute_achievement_rate_chunk.ignore_result
+    assert not stats_tasks.compute_achievement_rate_task.acks_late
+
+
+def test_late_acked_tasks_finish_within_the_visibility_timeout():
+    timeout = celery_app.conf.broker_transport_options["visibility_timeout"]
+    assert timeout > 3600
+    assert record_tasks.archive_cold_records_task.time_limit < timeout
+    assert stats_tasks.compute_achievement_rate_chunk.time_limit < timeout
+    assert stats_tasks.compute_achievement_rate_task.time_limit is None
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+
+from app.db.session import SessionLocal
+from app.models.stats import UserDailyStats
+from app.repositories import record_repository, user_repository
+from app.tasks.record_tasks import rebuild_daily_stats_task
+
+
+def _row(user_id: int, day: date) -> UserDailyStats | None:
+    session = SessionLocal()
+    try:
+        return session.scalars(
+            select(UserDailyStats).where(UserDailyStats.user_id == user_id, UserDailyStats.date == day)
+        ).first()
+    finally:
+        session.close()
+
+
+def test_rollup_tracks_create_update_delete(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    day, other_day = date(2032, 5, 1), date(2032, 5, 2)
+    me = client.get("/auth/me", headers=headers).json()
+
+    meal = client.post(
+        "/records/meals", headers=headers, json={"date": str(day), "meal_type": "Dinner", "calories": 400}
+    ).json()
+    row = _row(me["id"], day)
+    assert row.meal_count >= 1 and row.meal_calories >= 400
+    base_count, base_calories = row.meal_count - 1, row.meal_calories - 400
+
+    client.patch(f"/records/meals/{meal['id']}", headers=headers, json={"date": str(other_day), "calories": 250})
+    row = _row(me["id"], day)
+    assert (row.meal_count, row.meal_calories) == (base_count, base_calories)
+    assert _row(me["id"], other_day).meal_calories >= 250
+
+    client.delete(f"/records/meals/{meal['id']}", headers=headers)
+    before = _row(me["id"], other_day)
+    session = SessionLocal()
+    try:
+        record_repository.rebuild_daily_stats(session, user_id=me["id"], date_from=day)
+        session.commit()
+    finally:
+        session.close()
+    after = _row(me["id"], other_day)
+    # Incremental maintenance must agree with a full recompute.
+    assert (after.meal_count if after else 0) == before.meal_count
+    assert (after.meal_calories if after else 0) == before.meal_calories
+
+
+def test_rebuild_daily_stats_task():
+    assert isinstance(rebuild_daily_stats_task(days=7), int)
+    session = SessionLocal()
+    try:
+        me = user_repository.get_by_email(session, "demo@example.com")
+        assert record_repository.count_record_days_in_range(session, me.id, date(2000, 1, 1), date.today()) >= 0
+    finally:
+        session.close()
+
+
+def test_rebuild_blocks_concurrent_deltas():
+    rebuilding, writing = SessionLocal(), SessionLocal()
+    try:
+        me = user_repository.get_by_email(rebuilding, "demo@example.com")
+        record_repository.rebuild_daily_stats(rebuilding, user_id=me.id, date_from=date(2032, 6, 1))
+        writing.execute(text("SET LOCAL lock_timeout = '200ms'"))
+        with pytest.raises(OperationalError):
+            record_repository.apply_daily_stats_delta(writing, me.id, date(2032, 6, 1), {"meal_count": 1})
+    finally:
+        writing.rollback()
+        rebuilding.rollback()
+        writing.close()
+        rebuilding.close()
+
+
+def test_range_rebuild_leaves_other_users_writable():
+    rebuilding, writing = SessionLocal(), SessionLocal()
+    try:
+        me = user_repository.get_by_email(rebuilding, "demo@example.com")
+        record_repository.rebuild_daily_stats(rebuilding, after_id=me.id, max_id=me.id + 100, date_from=date(2032, 6, 1))
+        writing.execute(text("SET LOCAL lock_timeout = '200ms'"))
+        record_repository.apply_daily_stats_delta(writing, me.id, date(2032, 6, 1), {"meal_count": 0})
+    finally:
+        writing.rollback()
+        rebuilding.rollback()
+        writing.close()
+        rebuilding.close()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from app.db.session import SessionLocal
+from app.repositories import record_repository
+from app.repositories.user_repository import get_by_email
+from app.services import goal_counters
+from app.tasks.stats_tasks import rebuild_goal_counters_chunk, rebuild_goal_counters_task
+
+
+def _sql_counts(session, user_id: int, window_days: int) -> tuple[int, int]:
+    today = date.today()
+    completed = record_repository.count_completed_goals_by_user(
+        session, user_id, date_from=today - timedelta(days=window_days - 1), date_to=today
+    )
+    return completed, record_repository.count_total_goals_by_user(session, user_id)
+
+
+def test_counters_follow_goal_and_progress_writes(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    session = SessionLocal()
+    try:
+        me = get_by_email(session, "demo@example.com")
+        goal_counters.rebuild_goal_counters(session, me.id)
+        completed, active = goal_counters.get_goal_counts(session, me.id, 7)
+
+        goal_id = client.post("/records/goals", headers=headers, json={"title": "counted"}).json()["id"]
+        today = str(date.today())
+        with mock.patch("app.tasks.stats_tasks.schedule_achievement_rate_recompute"):
+            client.put(f"/records/goals/{goal_id}/progress/{today}", headers=headers, json={"is_completed": True})
+        assert goal_counters.get_goal_counts(session, me.id, 7) == (completed + 1, active + 1)
+
+        with mock.patch("app.tasks.stats_tasks.schedule_achievement_rate_recompute"):
+            client.put(f"/records/goals/{goal_id}/progress/{today}", headers=headers, json={"is_completed": False})
+        assert goal_counters.get_goal_counts(session, me.id, 7) == (completed, active + 1)
+
+        client.patch(f"/records/goals/{goal_id}", headers=headers, json={"is_active": False})
+        assert goal_counters.get_goal_counts(session, me.id, 7) == (completed, active)
+        session.rollback()  # see the API's commits
+        assert goal_counters.get_goal_counts(session, me.id, 7) == _sql_counts(session, me.id, 7)
+    finally:
+        session.close()
+
+
+def test_deleting_a_goal_drops_its_completions(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    session = SessionLocal()
+    try:
+        me = get_by_email(session, "demo@example.com")
+        goal_id = client.post("/records/goals", headers=headers, json={"title": "dropped"}).json()["id"]
+        with mock.patch("app.tasks.stats_tasks.schedule_achievement_rate_recompute"):
+            client.post(
+                f"/records/goals/{goal_id}/progress", headers=headers,
+                json={"date": str(date.today()), "is_completed": True},
+            )
+        before = goal_counters.get_goal_counts(session, me.id, 30)
+        assert client.delete(f"/records/goals/{goal_id}", headers=headers).status_code == 204
+        assert goal_counters.get_goal_counts(session, me.id, 30) == (before[0] - 1, before[1] - 1)
+        session.rollback()
+        assert goal_counters.get_goal_counts(session, me.id, 30) == _sql_counts(session, me.id, 30)
+    finally:
+        session.close()
+
+
+def test_counter_changes_wait_for_commit():
+    session = SessionLocal()
+    try:
+        me = get_by_email(session, "demo@example.com")
+        goal_counters.rebuild_goal_counters(session, me.id)
+        completed, active = goal_counters.get_goal_counts(session, me.id, 7)
+
+        goal_counters.adjust_active_goals(session, me.id, 1)
+        goal_counters.mark_goal_completed(session, me.id, -1, date.today(), True)
+        assert goal_counters.get_goal_counts(session, me.id, 7) == (completed, active)
+        session.rollback()
+        assert goal_counters.get_goal_counts(session, me.id, 7) == (completed, active)
+
+        me = get_by_email(session, "demo@example.com")
+        goal_counters.adjust_active_goals(session, me.id, 1)
+        session.commit()
+        assert goal_counters.get_goal_counts(session, me.id, 7) == (completed, active + 1)
+        goal_counters.rebuild_goal_counters(session, me.id)
+    finally:
+        session.close()
+
+
+def test_nightly_rebuild_fans_out_per_id_range(celery_eager):
+    session = SessionLocal()
+    try:
+        low, high = record_repository.get_user_id_bounds(session)
+    finally:
+        session.close()
+    assert rebuild_goal_counters_task(chunk_size=1) == high - low + 1
+    assert rebuild_goal_counters_chunk.apply(args=[low - 1, high]).get() >= 1
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+
+def _goal(client: TestClient, headers: dict) -> int:
+    return client.post("/records/goals", headers=headers, json={"title": "upsert"}).json()["id"]
+
+
+def test_put_is_idempotent_per_day(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    goal_id = _goal(client, headers)
+
+    with mock.patch("app.tasks.stats_tasks.schedule_achievement_rate_recompute") as schedule:
+        first = client.put(f"/records/goals/{goal_id}/progress/2034-01-01", headers=headers, json={"current_value": 3})
+        again = client.put(f"/records/goals/{goal_id}/progress/2034-01-01", headers=headers, json={"current_value": 3})
+        assert schedule.call_count == 1  # the identical resend changed nothing
+
+        updated = client.put(
+            f"/records/goals/{goal_id}/progress/2034-01-01", headers=headers, json={"current_value": 5, "is_completed": True}
+        )
+        assert schedule.call_count == 2
+
+    assert first.status_code == again.status_code == updated.status_code == 200
+    assert first.json()["id"] == again.json()["id"] == updated.json()["id"]
+    assert updated.json()["is_completed"] is True
+    listing = client.get(f"/records/goals/{goal_id}/progress", headers=headers).json()
+    assert listing["count"] == 1
+
+
+def test_post_same_day_overwrites(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    goal_id = _goal(client, headers)
+    with mock.patch("app.tasks.stats_tasks.schedule_achievement_rate_recompute"):
+        a = client.post(f"/records/goals/{goal_id}/progress", headers=headers, json={"date": "2034-01-02", "notes": "a"})
+        b = client.post(f"/records/goals/{goal_id}/progress", headers=headers, json={"date": "2034-01-02", "notes": "b"})
+    assert a.status_code == b.status_code == 201
+    assert a.json()["id"] == b.json()["id"] and b.json()["notes"] == "b"
+
+
+def test_batch_upsert(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    goal_id = _goal(client, headers)
+    batch = [
+        {"date": "2034-02-02", "current_value": 1},
+        {"date": "2034-02-01", "current_value": 1},
+        {"date": "2034-02-02", "current_value": 2},  # last entry for a date wins
+    ]
+    with mock.patch("app.tasks.stats_tasks.schedule_achievement_rate_recompute") as schedule:
+        r = client.put(f"/records/goals/{goal_id}/progress", headers=headers, json=batch)
+    assert r.status_code == 200, r.text
+    assert [(p["date"], p["current_value"]) for p in r.json()] == [("2034-02-01", 1.0), ("2034-02-02", 2.0)]
+    assert schedule.call_count == 1
+
+
+def test_patch_onto_existing_date_conflicts(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    goal_id = _goal(client, headers)
+    with mock.patch("app.tasks.stats_tasks.schedule_achievement_rate_recompute"):
+        rows = client.put(
+            f"/records/goals/{goal_id}/progress", headers=headers,
+            json=[{"date": "2034-03-01"}, {"date": "2034-03-02"}],
+        ).json()
+    r = client.patch(f"/records/goals/{goal_id}/progress/{rows[1]['id']}", headers=headers, json={"date": "2034-03-01"})
+    assert r.status_code == 409
+
+
+def test_upsert_on_foreign_goal_is_404(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    r = client.put("/records/goals/999999999/progress/2034-01-01", headers=headers, json={})
+    assert r.status_code == 404
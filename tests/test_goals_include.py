@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+
+def test_goals_include_latest_progress_and_stats(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    goal_id = client.post("/records/goals", headers=headers, json={"title": "include"}).json()["id"]
+    today = date.today()
+    batch = [
+        {"date": str(today - timedelta(days=2)), "current_value": 1, "is_completed": True},
+        {"date": str(today - timedelta(days=1)), "current_value": 2},
+        {"date": str(today), "current_value": 3, "is_completed": True},
+    ]
+    with mock.patch("app.tasks.stats_tasks.schedule_achievement_rate_recompute"):
+        assert client.put(f"/records/goals/{goal_id}/progress", headers=headers, json=batch).status_code == 200
+
+    r = client.get("/records/goals?include=latest_progress,stats&limit=100", headers=headers)
+    assert r.status_code == 200, r.text
+    goal = next(g for g in r.json()["data"] if g["id"] == goal_id)
+    assert goal["title"] == "include"
+    assert goal["latest_progress"]["date"] == str(today)
+    assert goal["latest_progress"]["current_value"] == 3.0
+    assert goal["stats"] == {"window_days": 30, "logged_days": 3, "completed_days": 2, "completion_rate": 66.67}
+
+    narrow = client.get("/records/goals?include=stats&stats_window_days=1&fields=title&limit=100", headers=headers)
+    goal = next(g for g in narrow.json()["data"] if g["id"] == goal_id)
+    assert set(goal) == {"id", "title", "stats"}
+    assert goal["stats"]["logged_days"] == 1
+
+
+def test_goals_without_include_are_unchanged(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    r = client.get("/records/goals", headers=headers)
+    assert r.status_code == 200
+    assert all("latest_progress" not in g and "stats" not in g for g in r.json()["data"])
+
+
+def test_goals_unknown_include_is_rejected(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    r = client.get("/records/goals?include=everything", headers=headers)
+    assert r.status_code == 400
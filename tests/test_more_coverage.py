@@ -32,7 +32,7 @@ def test_article_detail_and_filters(client: TestClient):
         assert r2.status_code == 200
     # not found path
     r3 = client.get("/articles/0")
-    assert r3.status_code == 200
+    assert r3.status_code == 404
 
 
 def test_articles_tag_and_search(client: TestClient):
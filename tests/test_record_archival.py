@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.db.session import SessionLocal
+from app.services import archive_service
+from app.tasks.record_tasks import archive_cold_records_task, rebuild_daily_stats_task
+
+
+@pytest.fixture()
+def archive_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "records_archive_root", str(tmp_path))
+    return tmp_path
+
+
+def test_archived_records_are_read_through(client: TestClient, auth_token: str, archive_root):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    old = client.post("/records/diaries", headers=headers, json={"date": "2001-03-10", "content": "old entry"}).json()
+    recent = client.post("/records/diaries", headers=headers, json={"date": "2001-04-02", "content": "newer"}).json()
+
+    session = SessionLocal()
+    try:
+        archived = archive_service.archive_cold_records(session, before=date(2001, 4, 1))
+    finally:
+        session.close()
+    assert archived["diaries"] >= 1
+    assert list(archive_root.glob("diaries/user_*/2001-03.npz"))
+
+    # Gone from the table...
+    assert client.get(f"/records/diaries/{old['id']}", headers=headers).status_code == 404
+    # ...but still listed, merged in date order with hot rows
+    r = client.get("/records/diaries", params={"date_from": "2001-03-01", "date_to": "2001-04-30"}, headers=headers)
+    assert r.status_code == 200
+    ids = [d["id"] for d in r.json()["data"]]
+    assert ids.index(recent["id"]) < ids.index(old["id"])
+    assert r.json()["count"] == len(ids)
+
+    # Ranges that stop short of archived months are served from the table alone
+    r = client.get("/records/diaries", params={"date_from": "2001-04-01", "date_to": "2001-04-30"}, headers=headers)
+    assert old["id"] not in [d["id"] for d in r.json()["data"]]
+    client.delete(f"/records/diaries/{recent['id']}", headers=headers)
+
+
+def test_archive_task_is_a_noop_when_disabled(archive_root):
+    assert archive_cold_records_task(after_days=0) == {}
+    assert not any(archive_root.iterdir())
+
+
+def test_full_rollup_rebuild_keeps_archived_days(client: TestClient, auth_token: str, archive_root):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.post("/records/meals", headers=headers, json={"date": "2001-05-10", "meal_type": "Lunch", "calories": 111})
+    session = SessionLocal()
+    try:
+        archive_service.archive_cold_records(session, before=date(2001, 6, 1))
+    finally:
+        session.close()
+    assert archive_service.archived_before() == date(2001, 6, 1)
+
+    rebuild_daily_stats_task()
+    r = client.get(
+        "/records/summary", params={"date_from": "2001-05-01", "date_to": "2001-05-31", "granularity": "month"}, headers=headers
+    )
+    assert r.status_code == 200
+    assert sum(b["calories_in"] for b in r.json()["buckets"]) >= 111
+
+
+def test_archive_index_counts_and_reads_newest_months_first(archive_root, monkeypatch):
+    def diary(record_id: int, day: date) -> dict:
+        return {"id": record_id, "user_id": 1, "date": day, "time": None, "content": "x", "created_at": None, "updated_at": None}
+
+    for month in (1, 2, 3):
+        archive_service._write_month("diaries", 1, date(2001, month, 1), [diary(month, date(2001, month, 5))])
+    assert archive_service.count_archived("diaries", 1) == 3
+    assert archive_service.count_archived("diaries", 1, date_from=date(2001, 2, 6)) == 1
+
+    loaded = []
+    load_month = archive_service._load_month
+    monkeypatch.setattr(archive_service, "_load_month", lambda path, mtime: loaded.append(path) or load_month(path, mtime))
+    newest = next(archive_service.iter_archived("diaries", 1))
+    assert newest.id == 3 and len(loaded) == 1
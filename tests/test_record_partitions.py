@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from datetime import date
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.db import partitions
+from app.db.session import SessionLocal
+from app.tasks.record_tasks import maintain_partitions_task
+
+
+def test_month_helpers():
+    assert partitions.add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert partitions.add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert partitions.partition_name("meals", date(2025, 8, 1)) == "meals_p2025_08"
+
+
+def test_maintenance_is_idempotent():
+    maintain_partitions_task()
+    assert maintain_partitions_task()["created"] == []
+
+    session = SessionLocal()
+    try:
+        current = partitions.month_start(date.today())
+        for table in partitions.PARTITIONED_TABLES:
+            assert current in partitions.list_month_partitions(session, table)
+    finally:
+        session.close()
+
+
+def test_new_partition_adopts_rows_from_default(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    month = date(2099, 1, 1)
+    meal = client.post(
+        "/records/meals", headers=headers, json={"date": "2099-01-15", "meal_type": "Lunch", "calories": 10}
+    ).json()
+
+    session = SessionLocal()
+    try:
+        if month not in partitions.list_month_partitions(session, "meals"):
+            partitions.create_month_partition(session, "meals", month)
+            session.commit()
+        located = session.execute(
+            text("SELECT tableoid::regclass::text FROM meals WHERE id = :id"), {"id": meal["id"]}
+        ).scalar_one()
+        assert located == "meals_p2099_01"
+    finally:
+        session.close()
+
+    # Reads are unchanged
+    r = client.get(f"/records/meals/{meal['id']}", headers=headers)
+    assert r.status_code == 200 and r.json()["calories"] == 10
+    client.delete(f"/records/meals/{meal['id']}", headers=headers)
+
+    session = SessionLocal()
+    try:
+        name = partitions.detach_month_partition(session, "meals", month)
+        session.execute(text(f"DROP TABLE {name}"))
+        session.commit()
+    finally:
+        session.close()
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.db.session import engine
+
+
+def test_dashboard_returns_latest_of_each_type(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.post("/records/meals", headers=headers, json={"date": "2033-01-02", "meal_type": "Lunch", "calories": 500})
+
+    r = client.get("/records/dashboard", params={"limit": 3}, headers=headers)
+    assert r.status_code == 200, r.text
+    body = r.json()
+    for key in ("body_records", "meals", "exercises", "diaries"):
+        assert len(body[key]) <= 3
+    # Same ordering as the list endpoint
+    meals = client.get("/records/meals", params={"limit": 3}, headers=headers).json()["data"]
+    assert [m["id"] for m in body["meals"]] == [m["id"] for m in meals]
+
+    rate = body["achievement_rate"]
+    assert rate["window_days"] == 30
+    assert 0.0 <= rate["achievement_rate"] <= 100.0
+
+
+def test_dashboard_reuses_cached_achievement_rate(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.get("/stats/achievement-rate", params={"window_days": 30}, headers=headers)
+    body = client.get("/records/dashboard", headers=headers).json()
+    assert body["achievement_rate"]["cached"] is True
+
+
+def test_dashboard_requires_auth(client: TestClient):
+    assert client.get("/records/dashboard").status_code == 401
+
+
+def test_pool_has_room_for_the_dashboard_threads():
+    headroom = engine.pool.size() + engine.pool._max_overflow - settings.records_dashboard_workers
+    assert headroom >= settings.database_pool_size
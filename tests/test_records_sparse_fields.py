@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+
+def test_list_returns_only_requested_fields(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.post("/records/diaries", headers=headers, json={"date": "2033-02-03", "content": "x" * 500})
+
+    r = client.get("/records/diaries", params={"fields": "date,time", "limit": 5}, headers=headers)
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["count"] >= 1
+    for item in body["data"]:
+        assert set(item) == {"id", "date", "time"}
+
+
+def test_get_returns_only_requested_fields(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    meal = client.post(
+        "/records/meals", headers=headers, json={"date": "2033-02-03", "meal_type": "Snack", "calories": 120}
+    ).json()
+
+    r = client.get(f"/records/meals/{meal['id']}", params={"fields": "calories"}, headers=headers)
+    assert r.status_code == 200
+    assert r.json() == {"id": meal["id"], "calories": 120}
+
+    # Without fields the full model is returned
+    full = client.get(f"/records/meals/{meal['id']}", headers=headers).json()
+    assert {"created_at", "updated_at", "user_id"} <= set(full)
+
+
+def test_goal_progress_fields(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    goal = client.post("/records/goals", headers=headers, json={"title": "sparse"}).json()
+    client.post(f"/records/goals/{goal['id']}/progress", headers=headers, json={"date": "2033-02-03", "is_completed": True})
+
+    r = client.get(f"/records/goals/{goal['id']}/progress", params={"fields": "date,is_completed"}, headers=headers)
+    assert r.status_code == 200
+    assert r.json()["data"] == [{"id": r.json()["data"][0]["id"], "date": "2033-02-03", "is_completed": True}]
+
+
+def test_unknown_field_is_rejected(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    r = client.get("/records/exercises", params={"fields": "name,password_hash"}, headers=headers)
+    assert r.status_code == 400
+    assert "password_hash" in r.json()["detail"]
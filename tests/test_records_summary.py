@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+
+def test_records_summary_reflects_writes(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    params = "date_from=2031-03-01&date_to=2031-03-31&granularity=week"
+    before = client.get(f"/records/summary?{params}", headers=headers)
+    assert before.status_code == 200
+    buckets = before.json()["buckets"]
+    assert buckets[0]["period_start"] == "2031-02-24"  # Monday of the first week
+    calories_before = sum(b["calories_in"] for b in buckets)
+
+    meal = client.post(
+        "/records/meals", headers=headers, json={"date": "2031-03-05", "meal_type": "Lunch", "calories": 321}
+    ).json()
+    after = client.get(f"/records/summary?{params}", headers=headers).json()
+    assert sum(b["calories_in"] for b in after["buckets"]) == calories_before + 321
+
+    assert client.delete(f"/records/meals/{meal['id']}", headers=headers).status_code == 204
+
+
+def test_records_summary_validation(client: TestClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    r = client.get("/records/summary?date_from=2025-02-01&date_to=2025-01-01", headers=headers)
+    assert r.status_code == 400
+    r = client.get("/records/summary?granularity=year", headers=headers)
+    assert r.status_code == 422
+    r = client.get("/records/summary?date_from=2000-01-01&date_to=2025-01-01&granularity=day", headers=headers)
+    assert r.status_code == 400
+
+
+def test_summary_version_is_bumped_after_commit():
+    from app.db.session import SessionLocal
+    from app.repositories.user_repository import get_by_email
+    from app.services import summary_service
+
+    session = SessionLocal()
+    try:
+        me = get_by_email(session, "demo@example.com")
+        version = summary_service.records_version(me.id)
+        summary_service.invalidate_records_summary(session, me.id)
+        assert summary_service.records_version(me.id) == version
+        session.rollback()
+        assert summary_service.records_version(me.id) == version
+
+        summary_service.invalidate_records_summary(session, me.id)
+        session.commit()
+        assert summary_service.records_version(me.id) == version + 1
+    finally:
+        session.close()
@@ -52,10 +52,10 @@ def test_stats_service_compute_cached():
     try:
         me = user_repository.get_by_email(session, "demo@example.com")
         assert me is not None
-        rate = stats_service.compute_achievement_rate(session, me.id, window_days=7)
-        assert 0.0 <= rate <= 100.0
-        cached = stats_service.get_cached_achievement_rate(me.id)
-        assert cached and "value" in cached
+        result = stats_service.compute_achievement_rate(session, me.id, window_days=7)
+        assert 0.0 <= result["value"] <= 100.0
+        cached = stats_service.get_cached_achievement_rate(me.id, 7)
+        assert cached == result
     finally:
         session.close()
 
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from unittest import mock
+
+from sqlalchemy import delete, select, update
+
+from app.celery_app import celery_app
+from app.db.session import SessionLocal
+from app.models.outbox import TaskOutbox
+from app.services.outbox_service import enqueue_task
+from app.tasks.outbox_tasks import relay_outbox_task
+
+
+def _rows(session, name: str) -> list[TaskOutbox]:
+    return session.scalars(select(TaskOutbox).where(TaskOutbox.task_name == name)).all()
+
+
+def test_rolled_back_task_is_never_sent():
+    session = SessionLocal()
+    try:
+        enqueue_task(session, "test.rolled_back", 1)
+        session.rollback()
+        assert _rows(session, "test.rolled_back") == []
+    finally:
+        session.close()
+
+
+def test_relay_sends_due_tasks_once():
+    session = SessionLocal()
+    try:
+        enqueue_task(session, "test.due", 1, flag=True)
+        enqueue_task(session, "test.later", 2, countdown=3600)
+        session.commit()
+
+        with mock.patch.object(celery_app, "send_task") as send_task:
+            assert relay_outbox_task() >= 1
+            assert relay_outbox_task() == 0
+        sent = [c for c in send_task.call_args_list if c.args[0] == "test.due"]
+        assert len(sent) == 1
+        assert sent[0].kwargs["args"] == [1] and sent[0].kwargs["kwargs"] == {"flag": True}
+        assert not any(c.args[0] == "test.later" for c in send_task.call_args_list)
+
+        session.expire_all()
+        assert _rows(session, "test.due") == []
+        assert len(_rows(session, "test.later")) == 1
+
+        session.execute(update(TaskOutbox).where(TaskOutbox.task_name == "test.later").values(available_at=TaskOutbox.created_at))
+        session.commit()
+        with mock.patch.object(celery_app, "send_task") as send_task:
+            relay_outbox_task()
+        assert any(c.args[0] == "test.later" for c in send_task.call_args_list)
+    finally:
+        session.execute(delete(TaskOutbox).where(TaskOutbox.task_name.in_(["test.due", "test.later"])))
+        session.commit()
+        session.close()
+
+
+def test_relay_sends_rows_due_before_next_run_with_countdown():
+    session = SessionLocal()
+    try:
+        enqueue_task(session, "test.soon", 1, countdown=1)
+        enqueue_task(session, "test.dedupe", 1, countdown=1, dedupe_key="test.dedupe")
+        # A second write pushes the pending row out past the relay's lookahead
+        assert enqueue_task(session, "test.dedupe", 1, countdown=3600, dedupe_key="test.dedupe") is False
+        session.commit()
+
+        with mock.patch.object(celery_app, "send_task") as send_task:
+            relay_outbox_task()
+        sent = [c for c in send_task.call_args_list if c.args[0] == "test.soon"]
+        assert len(sent) == 1 and 0 <= sent[0].kwargs["countdown"] <= 1
+        assert not any(c.args[0] == "test.dedupe" for c in send_task.call_args_list)
+    finally:
+        session.execute(delete(TaskOutbox).where(TaskOutbox.task_name.in_(["test.soon", "test.dedupe"])))
+        session.commit()
+        session.close()